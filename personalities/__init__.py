@@ -4,20 +4,28 @@ Hanzo Persona - Unified programmer personality profiles.
 
 from .personality_loader import (
     PersonalityLoader,
+    PersonalityNotFoundError,
     loader,
     get_all_personalities,
     get_personality,
+    get_many_personalities,
+    resolve_personality,
     list_personality_names,
     count_personalities,
 )
+from .shared_corpus import SharedCorpus
 
 __all__ = [
     "PersonalityLoader",
+    "PersonalityNotFoundError",
     "loader",
     "get_all_personalities",
     "get_personality",
+    "get_many_personalities",
+    "resolve_personality",
     "list_personality_names",
     "count_personalities",
+    "SharedCorpus",
 ]
 
 __version__ = "1.0.0"
\ No newline at end of file
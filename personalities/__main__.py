@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Command-line entry point: ``python -m personalities <command> [args]``.
+
+Each command runs the ``main`` of one module, so
+``python -m personalities profile --json`` is the same as
+``python -m personalities.profiling --json``.
+"""
+
+import importlib
+import sys
+from typing import List, Optional
+
+COMMANDS = {
+    "profile": ("profiling", "per-file load time, size, sections and duplicates"),
+    "activate": ("activation", "compile activation bundles and diffs"),
+    "analytics": ("analytics", "corpus-wide psychometric analytics"),
+    "cluster": ("clustering", "OCEAN archetype clustering"),
+    "columnar": ("columnar", "export the corpus as typed columns"),
+    "intern": ("interning", "shared sub-object statistics"),
+    "pack": ("packed", "write and benchmark a compressed pack"),
+    "resource": ("resource", "build or check the packed corpus resource"),
+    "route": ("routing", "route a task to personas"),
+    "serve": ("server", "serve personas over local HTTP"),
+    "shard": ("sharding", "consistent-hash shards"),
+    "snapshot": ("snapshots", "corpus snapshots and deltas"),
+    "json": ("serialization", "benchmark the JSON backends"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: python -m personalities <command> [args]", "", "commands:"]
+    lines.extend(f"  {name:<11} {summary}" for name, (_, summary) in COMMANDS.items())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"unknown command {argv[0]!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(f"{__package__}.{COMMANDS[argv[0]][0]}")
+    return module.main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Precompiled persona activation bundles.
+
+Activating a persona means resolving its ``environment`` block, its
+``tools`` and its Unix tool preferences (``tools/unix_tools.yaml``) into
+one runtime config. ``Activator`` compiles that once per persona into a
+frozen ``ActivationBundle`` and caches it; ``diff`` between two bundles
+is the small patch a long-lived session applies on a persona switch,
+and is cached per pair as well.
+
+Usage:
+    python -m personalities.activation linus [--from guido]
+"""
+
+import argparse
+import json
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, MutableMapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .query import record_tools
+from .routing import UNIX_TOOLS_FILE, load_unix_preferences, match_unix_preferences
+
+
+class ActivationBundle(NamedTuple):
+    """Frozen runtime config of one persona."""
+
+    key: str
+    env: Mapping[str, str]
+    tools: Tuple[str, ...]
+    shell: Optional[str]
+    editor: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, "env": dict(self.env), "tools": list(self.tools),
+                "shell": self.shell, "editor": self.editor}
+
+
+class ActivationDiff(NamedTuple):
+    """What changes when switching from one bundle to another."""
+
+    set_env: Mapping[str, str]
+    unset_env: Tuple[str, ...]
+    add_tools: Tuple[str, ...]
+    remove_tools: Tuple[str, ...]
+    settings: Mapping[str, Optional[str]]  # shell/editor that change, with their new value
+
+    def __bool__(self) -> bool:
+        return bool(self.set_env or self.unset_env or self.add_tools or self.remove_tools or self.settings)
+
+    def apply(self, env: MutableMapping[str, str], tools: Optional[Set[str]] = None) -> None:
+        """Patch an environment mapping (e.g. ``os.environ``) and tool set in place."""
+        for name in self.unset_env:
+            env.pop(name, None)
+        env.update(self.set_env)
+        if tools is not None:
+            tools.difference_update(self.remove_tools)
+            tools.update(self.add_tools)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"set_env": dict(self.set_env), "unset_env": list(self.unset_env),
+                "add_tools": list(self.add_tools), "remove_tools": list(self.remove_tools),
+                "settings": dict(self.settings)}
+
+
+def compile_bundle(key: str, record: Dict[str, Any], unix: Sequence[Dict[str, Any]] = ()) -> ActivationBundle:
+    """Resolve a record and its Unix preference entries into a bundle.
+
+    Environment values are stringified; tools are the record's tools
+    (grouped ``domains`` are topics, not tools, and are left out) followed
+    by the Unix essential tools, without duplicates.
+    """
+    env = record.get("environment")
+    env = {str(name): str(value) for name, value in env.items()} if isinstance(env, dict) else {}
+    grouped = record.get("tools")
+    if isinstance(grouped, dict):
+        record = {"tools": {g: v for g, v in grouped.items() if g != "domains"}}
+    tools = record_tools(record)
+    shell = editor = None
+    for entry in unix:
+        tools.extend(t for t in entry.get("essential_tools") or [] if isinstance(t, str))
+        shell = shell or entry.get("shell")
+        editor = editor or entry.get("editor")
+    return ActivationBundle(key, MappingProxyType(env), tuple(dict.fromkeys(tools)), shell, editor)
+
+
+def diff_bundles(old: ActivationBundle, new: ActivationBundle) -> ActivationDiff:
+    """Patch that turns ``old`` into ``new``."""
+    set_env = {name: value for name, value in new.env.items() if old.env.get(name) != value}
+    unset_env = tuple(name for name in old.env if name not in new.env)
+    old_tools, new_tools = set(old.tools), set(new.tools)
+    settings = {name: getattr(new, name) for name in ("shell", "editor") if getattr(old, name) != getattr(new, name)}
+    return ActivationDiff(
+        MappingProxyType(set_env),
+        unset_env,
+        tuple(t for t in new.tools if t not in old_tools),
+        tuple(t for t in old.tools if t not in new_tools),
+        MappingProxyType(settings),
+    )
+
+
+class Activator:
+    """Per-persona bundle cache over a loader."""
+
+    def __init__(self, loader: Any, unix_tools: Path = UNIX_TOOLS_FILE, diff_cache_size: int = 256):
+        self.loader = loader
+        self.unix_tools = Path(unix_tools)
+        self.diff_cache_size = diff_cache_size
+        self._unix: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._bundles: Dict[str, ActivationBundle] = {}
+        self._diffs: "OrderedDict[Tuple[str, str], ActivationDiff]" = OrderedDict()
+
+    def _unix_map(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._unix is None:
+            prefs = load_unix_preferences(self.unix_tools)
+            self._unix = match_unix_preferences(prefs, self.loader.alias_index()) if prefs else {}
+        return self._unix
+
+    def _unix_entries(self, key: str) -> List[Dict[str, Any]]:
+        return self._unix_map().get(key, [])
+
+    def bundle(self, key: str) -> ActivationBundle:
+        """The compiled bundle of ``key``; raises ``PersonalityNotFoundError``."""
+        bundle = self._bundles.get(key)
+        if bundle is None:
+            record = self.loader.get_many([key])[0]
+            bundle = self._bundles[key] = compile_bundle(key, record, self._unix_entries(key))
+        return bundle
+
+    def compile_all(self) -> int:
+        """Precompile every persona; returns how many bundles are cached."""
+        names = [n for n in self.loader.get_names() if n not in self._bundles]
+        for key, record in zip(names, self.loader.get_many(names)):
+            self._bundles[key] = compile_bundle(key, record, self._unix_entries(key))
+        return len(self._bundles)
+
+    def diff(self, from_id: str, to_id: str) -> ActivationDiff:
+        """Env vars and tools to add or remove when switching personas."""
+        pair = (from_id, to_id)
+        cached = self._diffs.get(pair)
+        if cached is not None:
+            self._diffs.move_to_end(pair)
+            return cached
+        result = self._diffs[pair] = diff_bundles(self.bundle(from_id), self.bundle(to_id))
+        if len(self._diffs) > self.diff_cache_size:
+            self._diffs.popitem(last=False)
+        return result
+
+    def invalidate(self, keys: Optional[Sequence[str]] = None) -> None:
+        """Forget compiled bundles (all, or those of ``keys``) and their diffs.
+
+        Added or renamed personas change which Unix preferences match, so
+        the alias -> preference map is rebuilt too, and a partial
+        invalidation also drops the bundles of every persona whose
+        preferences moved (e.g. to a new persona taking over an alias).
+        """
+        previous, self._unix = self._unix, None
+        if keys is None:
+            self._bundles.clear()
+            self._diffs.clear()
+            return
+        dropped = set(keys)
+        if previous is not None:
+            current = self._unix_map()
+            dropped.update(key for key in previous.keys() | current.keys() if previous.get(key) != current.get(key))
+        for key in dropped:
+            self._bundles.pop(key, None)
+        for pair in [p for p in self._diffs if dropped.intersection(p)]:
+            del self._diffs[pair]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .personality_loader import PersonalityLoader
+
+    parser = argparse.ArgumentParser(description="Show a persona's activation bundle or a switch diff.")
+    parser.add_argument("persona", help="persona to activate")
+    parser.add_argument("--from", dest="from_id", help="show only the diff from this persona")
+    args = parser.parse_args(argv)
+
+    activator = PersonalityLoader.from_corpus().activator()
+    if args.from_id:
+        result = activator.diff(args.from_id, args.persona).to_dict()
+    else:
+        result = activator.bundle(args.persona).to_dict()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
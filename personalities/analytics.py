@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Corpus-wide psychometric analytics.
+
+Computes per-category OCEAN centroids and variances, the OCEAN correlation
+matrix, trait and enum frequency tables and outliers in one pass over the
+feature table. Everything except the outlier scan is kept as additive
+running sums, so replacing or removing a handful of profiles only
+subtracts their old contribution and adds the new one.
+
+Usage:
+    python -m personalities.analytics [-o REPORT.md] [--json]
+"""
+
+import argparse
+import json
+import math
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .features import WIDTH, CorpusFeatures, Row, iter_bits
+from .personality_loader import OCEAN_TRAITS, PersonalityLoader
+
+UNCATEGORIZED = "uncategorized"
+
+
+class _Moments:
+    """Running count, sum and sum of squares per OCEAN trait."""
+
+    __slots__ = ("n", "sums", "squares")
+
+    def __init__(self):
+        self.n = [0] * WIDTH
+        self.sums = [0.0] * WIDTH
+        self.squares = [0.0] * WIDTH
+
+    def add(self, ocean: Tuple[float, ...], sign: int) -> None:
+        for j, value in enumerate(ocean):
+            if not math.isnan(value):
+                self.n[j] += sign
+                self.sums[j] += sign * value
+                self.squares[j] += sign * value * value
+
+    def mean(self) -> List[Optional[float]]:
+        return [s / n if n else None for n, s in zip(self.n, self.sums)]
+
+    def variance(self) -> List[Optional[float]]:
+        """Population variance per trait."""
+        result = []
+        for n, s, sq in zip(self.n, self.sums, self.squares):
+            result.append(max(sq / n - (s / n) ** 2, 0.0) if n else None)
+        return result
+
+
+class CorpusAnalytics:
+    """Incrementally maintained psychometric statistics of a corpus."""
+
+    def __init__(self, features: Optional[CorpusFeatures] = None):
+        self.features = features or CorpusFeatures()
+        self._categories: Dict[str, _Moments] = {}
+        self._category_counts: Counter = Counter()
+        self._overall = _Moments()
+        # Co-moments over rows with all five scores, for the correlation matrix
+        self._complete = 0
+        self._co_sums = [0.0] * WIDTH
+        self._co_products = [[0.0] * WIDTH for _ in range(WIDTH)]
+        self._trait_counts: Counter = Counter()
+        self._enum_counts: Dict[str, Counter] = {}
+        for row in self.features.rows():
+            self._apply(row, 1)
+
+    @classmethod
+    def from_loader(cls, loader: PersonalityLoader) -> "CorpusAnalytics":
+        """Analyze every record of ``loader``."""
+        return cls(CorpusFeatures.from_loader(loader))
+
+    def _apply(self, row: Row, sign: int) -> None:
+        """Add (``sign=1``) or retract (``sign=-1``) one row's contribution."""
+        category = row.category or UNCATEGORIZED
+        moments = self._categories.get(category)
+        if moments is None:
+            moments = self._categories[category] = _Moments()
+        moments.add(row.ocean, sign)
+        self._overall.add(row.ocean, sign)
+        self._category_counts[category] += sign
+        if self._category_counts[category] <= 0:
+            del self._categories[category]
+            del self._category_counts[category]
+
+        if row.complete:
+            self._complete += sign
+            for i, x in enumerate(row.ocean):
+                self._co_sums[i] += sign * x
+                products = self._co_products[i]
+                for j, y in enumerate(row.ocean):
+                    products[j] += sign * x * y
+
+        for bit in iter_bits(row.traits):
+            self._trait_counts[bit] += sign
+        for field, value in row.enums.items():
+            self._enum_counts.setdefault(field, Counter())[value] += sign
+
+    @property
+    def complete_profiles(self) -> int:
+        """Number of profiles with all five OCEAN scores."""
+        return self._complete
+
+    def update(self, records: Mapping[str, Dict[str, Any]]) -> None:
+        """Insert or replace records, adjusting only their contribution."""
+        for key, record in records.items():
+            old = self.features.set(key, record)
+            if old is not None:
+                self._apply(old, -1)
+            self._apply(self.features.row(key), 1)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        """Drop records from the statistics."""
+        for key in keys:
+            old = self.features.remove(key)
+            if old is not None:
+                self._apply(old, -1)
+
+    def category_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-category count, OCEAN centroid and variance."""
+        stats = {}
+        for category in sorted(self._categories):
+            moments = self._categories[category]
+            stats[category] = {
+                "count": self._category_counts[category],
+                "centroid": dict(zip(OCEAN_TRAITS, moments.mean())),
+                "variance": dict(zip(OCEAN_TRAITS, moments.variance())),
+            }
+        return stats
+
+    def correlation_matrix(self) -> List[List[Optional[float]]]:
+        """Pearson correlations between OCEAN traits over complete rows."""
+        n = self._complete
+        matrix: List[List[Optional[float]]] = [[None] * WIDTH for _ in range(WIDTH)]
+        if n < 2:
+            return matrix
+        means = [s / n for s in self._co_sums]
+        cov = [[self._co_products[i][j] / n - means[i] * means[j] for j in range(WIDTH)]
+               for i in range(WIDTH)]
+        for i in range(WIDTH):
+            for j in range(WIDTH):
+                denom = math.sqrt(max(cov[i][i], 0.0) * max(cov[j][j], 0.0))
+                matrix[i][j] = cov[i][j] / denom if denom else None
+        return matrix
+
+    def trait_frequencies(self) -> Dict[str, int]:
+        """How many profiles carry each trait token, most common first."""
+        vocab = self.features.trait_vocab
+        return {vocab[bit]: count for bit, count in self._trait_counts.most_common() if count > 0}
+
+    def enum_frequencies(self) -> Dict[str, Dict[str, int]]:
+        """Value counts for every enum field of the enhanced sections."""
+        return {
+            field: {value: count for value, count in counter.most_common() if count > 0}
+            for field, counter in sorted(self._enum_counts.items())
+        }
+
+    def outliers(self, threshold: float = 2.5, min_category_size: int = 5) -> List[Dict[str, Any]]:
+        """Profiles with an OCEAN score ``threshold`` SDs from their category mean.
+
+        Categories smaller than ``min_category_size`` are compared against
+        the whole corpus instead.
+        """
+        stats = {c: (m.mean(), m.variance(), min(m.n)) for c, m in self._categories.items()}
+        overall = (self._overall.mean(), self._overall.variance(), min(self._overall.n))
+        found = []
+        for row in self.features.rows():
+            category = row.category or UNCATEGORIZED
+            means, variances, size = stats[category]
+            if size < min_category_size:
+                means, variances, size = overall
+            z_scores = {}
+            for trait, value, mean, var in zip(OCEAN_TRAITS, row.ocean, means, variances):
+                if math.isnan(value) or not var:
+                    continue
+                z = (value - mean) / math.sqrt(var)
+                if abs(z) >= threshold:
+                    z_scores[trait] = round(z, 2)
+            if z_scores:
+                found.append({"id": row.key, "category": category, "z_scores": z_scores})
+        found.sort(key=lambda o: -max(abs(z) for z in o["z_scores"].values()))
+        return found
+
+    def to_dict(self) -> Dict[str, Any]:
+        """All statistics as plain JSON-serializable data."""
+        return {
+            "profiles": len(self.features),
+            "complete_ocean": self.complete_profiles,
+            "categories": self.category_stats(),
+            "correlation": {
+                "traits": list(OCEAN_TRAITS),
+                "matrix": self.correlation_matrix(),
+            },
+            "outliers": self.outliers(),
+            "trait_frequencies": self.trait_frequencies(),
+            "enum_frequencies": self.enum_frequencies(),
+        }
+
+
+def _fmt(value: Optional[float], digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def render_report(analytics: CorpusAnalytics, top: int = 15) -> str:
+    """Markdown report of the corpus statistics."""
+    short = [t[0].upper() for t in OCEAN_TRAITS]
+    lines = [
+        "# Psychometric Corpus Statistics",
+        "",
+        f"- Profiles: {len(analytics.features)}",
+        f"- Profiles with complete OCEAN scores: {analytics.complete_profiles}",
+        f"- Categories: {len(analytics._categories)}",
+        "",
+        "## Category Centroids",
+        "",
+        "| Category | Count | " + " | ".join(f"{s} mean (sd)" for s in short) + " |",
+        "|---|---:|" + "---:|" * WIDTH,
+    ]
+    for category, stats in analytics.category_stats().items():
+        cells = []
+        for trait in OCEAN_TRAITS:
+            mean, var = stats["centroid"][trait], stats["variance"][trait]
+            sd = math.sqrt(var) if var is not None else None
+            cells.append(f"{_fmt(mean)} ({_fmt(sd)})")
+        lines.append(f"| {category} | {stats['count']} | " + " | ".join(cells) + " |")
+
+    lines += ["", "## OCEAN Correlation Matrix", "",
+              "| | " + " | ".join(short) + " |", "|---|" + "---:|" * WIDTH]
+    for label, row in zip(short, analytics.correlation_matrix()):
+        lines.append(f"| {label} | " + " | ".join(_fmt(v, 2) for v in row) + " |")
+
+    outliers = analytics.outliers()
+    lines += ["", "## Outliers", "", f"{len(outliers)} profiles deviate from their category.", ""]
+    if outliers:
+        lines += ["| Profile | Category | z-scores |", "|---|---|---|"]
+        for outlier in outliers[:top]:
+            scores = ", ".join(f"{t}={z:+.2f}" for t, z in outlier["z_scores"].items())
+            lines.append(f"| {outlier['id']} | {outlier['category']} | {scores} |")
+
+    lines += ["", "## Most Common Traits", "", "| Trait | Profiles |", "|---|---:|"]
+    for trait, count in list(analytics.trait_frequencies().items())[:top]:
+        lines.append(f"| {trait} | {count} |")
+
+    lines += ["", "## Enum Frequencies", ""]
+    for field, counts in analytics.enum_frequencies().items():
+        values = ", ".join(f"{value} ({count})" for value, count in list(counts.items())[:top])
+        lines.append(f"- **{field}**: {values}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate corpus psychometric statistics.")
+    parser.add_argument("-o", "--output", help="write the report here instead of stdout")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of Markdown")
+    args = parser.parse_args(argv)
+
+    analytics = CorpusAnalytics.from_loader(PersonalityLoader.from_corpus())
+    if args.json:
+        text = json.dumps(analytics.to_dict(), indent=2, ensure_ascii=False)
+    else:
+        text = render_report(analytics)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
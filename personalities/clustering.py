@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Data-driven archetype clustering over OCEAN and trait vectors.
+
+Each persona becomes a vector of its OCEAN scores scaled to 0-1 (missing
+scores imputed with the corpus mean), optionally extended with weighted
+indicators for the most discriminative trait tokens. Vectors are grouped
+with k-means, mini-batch k-means or a hierarchical (Ward) merge of k-means
+micro-clusters, all seeded so the same input gives the same clusters.
+
+Assignments are persisted as a sidecar JSON index that the loader serves
+through ``cluster_of`` and ``members``.
+
+Usage:
+    python -m personalities.clustering [-k 8] [--method auto|kmeans|minibatch|hierarchical] [-o clusters.json]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from operator import mul
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .features import WIDTH, CorpusFeatures, iter_bits
+from .personality_loader import OCEAN_TRAITS, PersonalityLoader
+
+METHODS = ("kmeans", "minibatch", "hierarchical")
+# Above this many personas ``auto`` switches from full Lloyd k-means (about
+# two minutes at 100k) to mini-batch k-means (a few seconds)
+FULL_KMEANS_LIMIT = 10_000
+
+Vector = List[float]
+
+
+def feature_vectors(
+    features: CorpusFeatures, trait_dims: int = 8, trait_weight: float = 0.5,
+) -> Tuple[List[Vector], List[str]]:
+    """Clustering vectors for every row of ``features`` and their column names.
+
+    The ``trait_dims`` traits held by closest to half the corpus are used,
+    since near-universal or one-off traits do not separate anyone.
+    """
+    n = len(features)
+    sums, counts = [0.0] * WIDTH, [0] * WIDTH
+    ocean = features.ocean
+    for i, value in enumerate(ocean):
+        if not math.isnan(value):
+            sums[i % WIDTH] += value
+            counts[i % WIDTH] += 1
+    means = [s / c if c else 50.0 for s, c in zip(sums, counts)]
+
+    frequency = [0] * len(features.trait_vocab)
+    for bits in features.traits:
+        for bit in iter_bits(bits):
+            frequency[bit] += 1
+    ranked = sorted(range(len(frequency)), key=lambda b: (abs(frequency[b] - n / 2), b))
+    chosen = [b for b in ranked[:trait_dims] if 0 < frequency[b] < n]
+
+    vectors = []
+    for row in range(n):
+        vector = [
+            (v if not math.isnan(v) else means[j]) / 100.0
+            for j, v in enumerate(ocean[row * WIDTH:(row + 1) * WIDTH])
+        ]
+        bits = features.traits[row]
+        vector.extend(trait_weight if bits >> b & 1 else 0.0 for b in chosen)
+        vectors.append(vector)
+    columns = list(OCEAN_TRAITS) + [features.trait_vocab[b] for b in chosen]
+    return vectors, columns
+
+
+def _squared_norms(vectors: Sequence[Vector]) -> List[float]:
+    return [sum(map(mul, v, v)) for v in vectors]
+
+
+def _nearest(vector: Vector, centroids: Sequence[Vector], norms: Sequence[float]) -> Tuple[int, float]:
+    """Index of the closest centroid and ``|c|^2 - 2 v.c`` for it."""
+    best, best_score = 0, math.inf
+    for j, centroid in enumerate(centroids):
+        score = norms[j] - 2.0 * sum(map(mul, vector, centroid))
+        if score < best_score:
+            best, best_score = j, score
+    return best, best_score
+
+
+def assign(vectors: Sequence[Vector], centroids: Sequence[Vector]) -> Tuple[List[int], float]:
+    """Label each vector with its nearest centroid; returns labels and inertia."""
+    norms = _squared_norms(centroids)
+    labels = []
+    inertia = 0.0
+    for vector in vectors:
+        label, score = _nearest(vector, centroids, norms)
+        labels.append(label)
+        inertia += max(score + sum(map(mul, vector, vector)), 0.0)
+    return labels, inertia
+
+
+def _init_plus_plus(vectors: Sequence[Vector], k: int, rng: random.Random,
+                    sample_size: int = 4096) -> List[Vector]:
+    """k-means++ seeding over a seeded sample of the vectors."""
+    sample = list(vectors) if len(vectors) <= sample_size else rng.sample(list(vectors), sample_size)
+    centroids = [list(rng.choice(sample))]
+    distances = [sum((a - b) ** 2 for a, b in zip(v, centroids[0])) for v in sample]
+    while len(centroids) < k:
+        total = sum(distances)
+        if total <= 0:
+            centroids.append(list(rng.choice(sample)))
+            continue
+        target = rng.random() * total
+        acc = 0.0
+        for i, d in enumerate(distances):
+            acc += d
+            if acc >= target:
+                break
+        centroids.append(list(sample[i]))
+        distances = [min(d, sum((a - b) ** 2 for a, b in zip(v, centroids[-1])))
+                     for d, v in zip(distances, sample)]
+    return centroids
+
+
+def _means(vectors: Sequence[Vector], labels: Sequence[int], centroids: List[Vector]) -> List[Vector]:
+    """Recompute centroids; empty clusters keep their previous position."""
+    dims = len(centroids[0])
+    sums = [[0.0] * dims for _ in centroids]
+    counts = [0] * len(centroids)
+    for vector, label in zip(vectors, labels):
+        counts[label] += 1
+        acc = sums[label]
+        for d in range(dims):
+            acc[d] += vector[d]
+    return [[s / count for s in acc] if count else centroids[j]
+            for j, (acc, count) in enumerate(zip(sums, counts))]
+
+
+def kmeans(vectors: Sequence[Vector], k: int, seed: int = 0, max_iter: int = 100,
+           tol: float = 1e-6) -> Tuple[List[int], List[Vector], float]:
+    """Lloyd's k-means with k-means++ seeding."""
+    rng = random.Random(seed)
+    centroids = _init_plus_plus(vectors, k, rng)
+    labels, inertia = assign(vectors, centroids)
+    for _ in range(max_iter):
+        centroids = _means(vectors, labels, centroids)
+        new_labels, new_inertia = assign(vectors, centroids)
+        converged = new_labels == labels or inertia - new_inertia <= tol * max(inertia, 1e-12)
+        labels, inertia = new_labels, new_inertia
+        if converged:
+            break
+    return labels, centroids, inertia
+
+
+def _minibatch_centroids(vectors: Sequence[Vector], k: int, rng: random.Random, batch_size: int,
+                         max_iter: int, tol: float) -> Tuple[List[Vector], List[int]]:
+    """Centroids and per-centroid sample counts from mini-batch updates."""
+    centroids = _init_plus_plus(vectors, k, rng)
+    counts = [0] * k
+    population = range(len(vectors))
+    for _ in range(max_iter):
+        batch = [vectors[i] for i in rng.sample(population, min(batch_size, len(vectors)))]
+        previous = [list(c) for c in centroids]
+        norms = _squared_norms(centroids)
+        for vector in batch:
+            j, _ = _nearest(vector, centroids, norms)
+            counts[j] += 1
+            rate = 1.0 / counts[j]
+            centroid = centroids[j]
+            for d, value in enumerate(vector):
+                centroid[d] += rate * (value - centroid[d])
+            norms[j] = sum(map(mul, centroid, centroid))
+        shift = max(sum((a - b) ** 2 for a, b in zip(c, p)) for c, p in zip(centroids, previous))
+        if shift <= tol:
+            break
+    return centroids, counts
+
+
+def minibatch_kmeans(vectors: Sequence[Vector], k: int, seed: int = 0, batch_size: int = 1024,
+                     max_iter: int = 100, tol: float = 1e-5) -> Tuple[List[int], List[Vector], float]:
+    """Mini-batch k-means (Sculley 2010): per-centroid learning rates on sampled batches.
+
+    Stops early once no centroid moves more than ``tol`` (squared) in a batch,
+    then labels every vector in a single assignment pass.
+    """
+    centroids, _ = _minibatch_centroids(vectors, k, random.Random(seed), batch_size, max_iter, tol)
+    labels, inertia = assign(vectors, centroids)
+    return labels, centroids, inertia
+
+
+def hierarchical(vectors: Sequence[Vector], k: int, seed: int = 0, micro_clusters: int = 32,
+                 ) -> Tuple[List[int], List[Vector], float, List[Tuple[int, int, float]]]:
+    """Ward agglomeration of mini-batch k-means micro-clusters down to ``k``.
+
+    Micro-clusters are weighted by how many sampled vectors they absorbed,
+    so the full input is only scanned once, to label it against the
+    merged centroids. Returns labels, centroids, inertia and the merge list
+    of ``(kept, absorbed, ward_cost)`` in micro-cluster ids.
+    """
+    micro = min(max(micro_clusters, k), len(vectors))
+    centers, sizes = _minibatch_centroids(vectors, micro, random.Random(seed), 1024, 100, 1e-5)
+    alive = {j: (sizes[j], list(centers[j])) for j in range(micro) if sizes[j]}
+    merges = []
+
+    def ward(a: Tuple[int, Vector], b: Tuple[int, Vector]) -> float:
+        (na, ca), (nb, cb) = a, b
+        return na * nb / (na + nb) * sum((x - y) ** 2 for x, y in zip(ca, cb))
+
+    while len(alive) > k:
+        ids = sorted(alive)
+        cost, a, b = min(
+            (ward(alive[a], alive[b]), a, b)
+            for i, a in enumerate(ids) for b in ids[i + 1:]
+        )
+        (na, ca), (nb, cb) = alive[a], alive.pop(b)
+        alive[a] = (na + nb, [(na * x + nb * y) / (na + nb) for x, y in zip(ca, cb)])
+        merges.append((a, b, cost))
+
+    centroids = [alive[j][1] for j in sorted(alive)]
+    labels, inertia = assign(vectors, centroids)
+    return labels, centroids, inertia, merges
+
+
+def silhouette_score(vectors: Sequence[Vector], labels: Sequence[int], sample_size: int = 1000,
+                     seed: int = 0) -> Optional[float]:
+    """Mean silhouette coefficient, over a seeded sample for large inputs."""
+    indices = list(range(len(vectors)))
+    if len(indices) > sample_size:
+        indices = sorted(random.Random(seed).sample(indices, sample_size))
+    clusters: Dict[int, List[int]] = {}
+    for i in indices:
+        clusters.setdefault(labels[i], []).append(i)
+    if len(clusters) < 2:
+        return None
+
+    total = 0.0
+    for i in indices:
+        own = labels[i]
+        if len(clusters[own]) < 2:
+            continue
+        mean_distance = {}
+        for label, members in clusters.items():
+            distance = sum(math.dist(vectors[i], vectors[m]) for m in members if m != i)
+            mean_distance[label] = distance / (len(members) - (label == own))
+        a = mean_distance.pop(own)
+        b = min(mean_distance.values())
+        total += (b - a) / max(a, b) if max(a, b) > 0 else 0.0
+    return total / len(indices)
+
+
+class ClusterIndex:
+    """Persisted cluster assignments with key and cluster lookups."""
+
+    def __init__(self, assignments: Dict[str, int], meta: Optional[Dict[str, Any]] = None):
+        self.assignments = assignments
+        self.meta = meta or {}
+        self._members: Dict[int, List[str]] = {}
+        for key, label in assignments.items():
+            self._members.setdefault(label, []).append(key)
+
+    def cluster_of(self, key: str) -> Optional[int]:
+        """Cluster id of ``key``, or None when it was not clustered."""
+        return self.assignments.get(key)
+
+    def members(self, cluster: int) -> List[str]:
+        """Keys assigned to ``cluster``."""
+        return list(self._members.get(cluster, []))
+
+    def clusters(self) -> List[int]:
+        """All cluster ids."""
+        return sorted(self._members)
+
+    def save(self, path: Path) -> None:
+        """Write the sidecar index."""
+        data = dict(self.meta, assignments=self.assignments)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path) -> "ClusterIndex":
+        """Read a sidecar index written by ``save``."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assignments = data.pop("assignments")
+        return cls(assignments, data)
+
+
+class ClusterResult:
+    """Outcome of one clustering run."""
+
+    def __init__(self, keys: List[str], labels: List[int], centroids: List[Vector],
+                 inertia: float, columns: List[str], method: str, seed: int,
+                 silhouette: Optional[float] = None, merges: Optional[list] = None):
+        self.keys = keys
+        self.labels = labels
+        self.centroids = centroids
+        self.inertia = inertia
+        self.columns = columns
+        self.method = method
+        self.seed = seed
+        self.silhouette = silhouette
+        self.merges = merges or []
+
+    @property
+    def k(self) -> int:
+        return len(self.centroids)
+
+    def to_index(self) -> ClusterIndex:
+        """Sidecar index of these assignments, with the run parameters."""
+        meta = {
+            "method": self.method,
+            "k": self.k,
+            "seed": self.seed,
+            "inertia": self.inertia,
+            "silhouette": self.silhouette,
+            "columns": self.columns,
+            "centroids": [[round(x, 6) for x in c] for c in self.centroids],
+        }
+        return ClusterIndex(dict(zip(self.keys, self.labels)), meta)
+
+
+def choose_method(count: int) -> str:
+    """Method ``auto`` resolves to for ``count`` personas."""
+    return "kmeans" if count <= FULL_KMEANS_LIMIT else "minibatch"
+
+
+def cluster_features(
+    features: CorpusFeatures, k: int = 8, method: str = "auto", seed: int = 0,
+    trait_dims: int = 8, trait_weight: float = 0.5, score: bool = True,
+) -> ClusterResult:
+    """Cluster every row of ``features`` into ``k`` archetypes.
+
+    ``kmeans`` runs full Lloyd iterations and suits the shipped corpus;
+    ``minibatch`` and ``hierarchical`` only scan the whole input once and
+    are the modes to use for 100k-scale synthetic corpora. ``auto`` picks
+    ``kmeans`` up to ``FULL_KMEANS_LIMIT`` personas and ``minibatch`` above.
+    """
+    if method != "auto" and method not in METHODS:
+        raise ValueError(f"Unknown clustering method {method!r}; expected auto or one of {METHODS}")
+    vectors, columns = feature_vectors(features, trait_dims, trait_weight)
+    if not vectors:
+        raise ValueError("Nothing to cluster")
+    if method == "auto":
+        method = choose_method(len(vectors))
+    k = min(k, len(vectors))
+
+    merges = None
+    if method == "kmeans":
+        labels, centroids, inertia = kmeans(vectors, k, seed=seed)
+    elif method == "minibatch":
+        labels, centroids, inertia = minibatch_kmeans(vectors, k, seed=seed)
+    else:
+        labels, centroids, inertia, merges = hierarchical(vectors, k, seed=seed)
+
+    silhouette = silhouette_score(vectors, labels, seed=seed) if score else None
+    return ClusterResult(list(features.keys), labels, centroids, inertia, columns,
+                         method, seed, silhouette, merges)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cluster personas into archetypes.")
+    parser.add_argument("-k", type=int, default=8, help="number of clusters")
+    parser.add_argument("--method", choices=("auto",) + METHODS, default="auto",
+                        help=f"auto: kmeans up to {FULL_KMEANS_LIMIT:,} personas, minibatch above")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trait-dims", type=int, default=8,
+                        help="trait indicator columns added to the OCEAN vector")
+    parser.add_argument("-o", "--output", default="clusters.json", help="sidecar index path")
+    args = parser.parse_args(argv)
+
+    features = CorpusFeatures.from_loader(PersonalityLoader.from_corpus())
+    result = cluster_features(features, k=args.k, method=args.method, seed=args.seed,
+                              trait_dims=args.trait_dims)
+    index = result.to_index()
+    index.save(Path(args.output))
+
+    print(f"{len(result.keys)} personas -> {result.k} clusters ({result.method}), "
+          f"inertia {result.inertia:.2f}, silhouette {result.silhouette or 0.0:.3f}")
+    for cluster in index.clusters():
+        members = index.members(cluster)
+        print(f"  {cluster}: {len(members)} e.g. {', '.join(members[:5])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the corpus for analytics pipelines.
+
+Records are flattened into typed columns:
+
+* ``float64`` - ``ocean.<trait>``, NaN where a score is missing
+* ``string`` - ``key``, ``name``, ``description``, ``philosophy`` as
+  Arrow-style ``offsets`` (int64, n + 1) plus UTF-8 ``data``
+* ``enum`` - ``category`` and every ``section.field`` of the enhanced
+  sections as int32 ``codes`` (-1 when missing) into a string ``dictionary``
+* ``list`` - ``tags``, ``tools``, ``domains`` and the enhanced list fields
+  as int64 ``offsets`` into dictionary-encoded ``codes``
+
+The table is built while streaming records from the source readers
+(``sources.iter_records``), so peak memory is one backing file plus the
+compact column buffers, never the parsed corpus.
+
+``.npz`` files are written with the standard library alone (an npz is a
+zip of ``.npy`` arrays), so ``numpy.load`` reads them without any JSON
+work; ``read_npz`` reads them back without numpy. ``.parquet`` and
+``.arrow`` outputs need pyarrow.
+
+Usage:
+    python -m personalities.columnar -o corpus.npz
+"""
+
+import argparse
+import ast
+import json
+import math
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .features import ENHANCED_SECTIONS, enum_fields
+from .personality_loader import OCEAN_TRAITS
+from .query import record_tools
+from .sources import Source, default_sources, iter_records
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pyarrow = None
+
+STRING_FIELDS = ("name", "description", "philosophy")
+LIST_FIELDS = ("tags", "tools", "domains")
+SCHEMA_ENTRY = "__schema__"
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_DTYPES = {"d": "<f8", "i": "<i4", "q": "<i8", "B": "|u1"}
+_TYPECODES = {v: k for k, v in _DTYPES.items()}
+
+
+class _Dictionary:
+    """Value -> code mapping in first-seen order."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ColumnTable:
+    """Typed column buffers filled one record at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.floats: Dict[str, array] = {f"ocean.{t}": array("d") for t in OCEAN_TRAITS}
+        self.strings: Dict[str, Tuple[array, bytearray]] = {}
+        self.enums: Dict[str, Tuple[array, _Dictionary]] = {}
+        self.lists: Dict[str, Tuple[array, array, _Dictionary]] = {}
+        for name in ("key",) + STRING_FIELDS:
+            self.strings[name] = (array("q", [0]), bytearray())
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "ColumnTable":
+        table = cls()
+        for key, record in records:
+            table.append(key, record)
+        return table
+
+    @classmethod
+    def from_sources(cls, sources: Optional[List[Source]] = None) -> "ColumnTable":
+        """Stream every shipped record (first source wins) into a table."""
+        return cls.from_records(iter_records(default_sources() if sources is None else sources))
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _enum(self, name: str) -> Tuple[array, _Dictionary]:
+        column = self.enums.get(name)
+        if column is None:
+            # Columns first seen mid-stream are missing in earlier rows
+            column = self.enums[name] = (array("i", [-1]) * self.rows, _Dictionary())
+        return column
+
+    def _list(self, name: str) -> Tuple[array, array, _Dictionary]:
+        column = self.lists.get(name)
+        if column is None:
+            column = self.lists[name] = (array("q", [0]) * (self.rows + 1), array("i"), _Dictionary())
+        return column
+
+    def append(self, key: str, record: Dict[str, Any]) -> None:
+        """Flatten one record into the next row."""
+        scores = record.get("ocean") or {}
+        for trait in OCEAN_TRAITS:
+            value = scores.get(trait)
+            self.floats[f"ocean.{trait}"].append(float(value) if isinstance(value, (int, float)) else math.nan)
+
+        for name, (offsets, data) in self.strings.items():
+            value = key if name == "key" else record.get(name)
+            if isinstance(value, str):
+                data += value.encode("utf-8")
+            offsets.append(len(data))
+
+        scalars = enum_fields(record)
+        if isinstance(record.get("category"), str):
+            scalars["category"] = record["category"]
+        for name, value in scalars.items():
+            self._enum(name)
+        for name, (codes, dictionary) in self.enums.items():
+            value = scalars.get(name)
+            codes.append(-1 if value is None else dictionary.code(value))
+
+        lists = {field: record.get(field) for field in LIST_FIELDS}
+        lists["tools"] = record_tools(record)
+        for section in ENHANCED_SECTIONS:
+            block = record.get(section)
+            if isinstance(block, dict):
+                for field, value in block.items():
+                    if isinstance(value, list):
+                        lists[f"{section}.{field}"] = value
+        for name, value in lists.items():
+            if isinstance(value, list) and value:
+                self._list(name)
+        for name, (offsets, codes, dictionary) in self.lists.items():
+            for item in lists.get(name) or ():
+                if isinstance(item, str):
+                    codes.append(dictionary.code(item))
+            offsets.append(len(codes))
+        self.rows += 1
+
+    def schema(self) -> Dict[str, str]:
+        """Column name -> kind (``float64``, ``string``, ``enum``, ``list``)."""
+        schema = {name: "string" for name in self.strings}
+        schema.update({name: "float64" for name in self.floats})
+        schema.update({name: "enum" for name in sorted(self.enums)})
+        schema.update({name: "list" for name in sorted(self.lists)})
+        return schema
+
+    def arrays(self) -> Dict[str, array]:
+        """Every physical array, named ``column[.part]`` as stored in the npz."""
+        result: Dict[str, array] = {SCHEMA_ENTRY: array("B", json.dumps(self.schema()).encode("utf-8"))}
+        result.update(self.floats)
+        for name, (offsets, data) in self.strings.items():
+            result[f"{name}.offsets"], result[f"{name}.data"] = offsets, array("B", data)
+        for name, (codes, dictionary) in self.enums.items():
+            result[f"{name}.codes"] = codes
+            result.update(_string_arrays(f"{name}.dictionary", dictionary.values))
+        for name, (offsets, codes, dictionary) in self.lists.items():
+            result[f"{name}.offsets"], result[f"{name}.codes"] = offsets, codes
+            result.update(_string_arrays(f"{name}.dictionary", dictionary.values))
+        return result
+
+
+def _string_arrays(name: str, values: List[str]) -> Dict[str, array]:
+    offsets, data = array("q", [0]), bytearray()
+    for value in values:
+        data += value.encode("utf-8")
+        offsets.append(len(data))
+    return {f"{name}.offsets": offsets, f"{name}.data": array("B", data)}
+
+
+def _npy(values: array) -> bytes:
+    """One array in ``.npy`` format (version 1.0, little-endian)."""
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    header = f"{{'descr': '{_DTYPES[values.typecode]}', 'fortran_order': False, 'shape': ({len(values)},), }}"
+    padding = 64 - (len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + " " * padding + "\n").encode("latin1")
+    return _NPY_MAGIC + len(header).to_bytes(2, "little") + header + values.tobytes()
+
+
+def write_npz(table: ColumnTable, path: Path, compress: bool = False) -> int:
+    """Write the table as ``.npz``; returns the file size."""
+    mode = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", mode) as archive:
+        for name, values in table.arrays().items():
+            archive.writestr(f"{name}.npy", _npy(values))
+    return Path(path).stat().st_size
+
+
+def read_npz(path: Path) -> Dict[str, array]:
+    """Arrays of an ``.npz`` as ``array.array`` (for use without numpy)."""
+    result = {}
+    with zipfile.ZipFile(path) as archive:
+        for entry in archive.namelist():
+            raw = archive.read(entry)
+            if raw[:6] != _NPY_MAGIC[:6]:
+                raise ValueError(f"{entry} is not an .npy array")
+            size = int.from_bytes(raw[8:10], "little")
+            header = ast.literal_eval(raw[10:10 + size].decode("latin1"))
+            values = array(_TYPECODES[header["descr"]])
+            values.frombytes(raw[10 + size:])
+            if sys.byteorder == "big" and values.itemsize > 1:
+                values.byteswap()
+            result[entry[:-len(".npy")]] = values
+    return result
+
+
+def decode_strings(arrays: Dict[str, Any], name: str) -> List[str]:
+    """Strings of a ``string`` column or an enum/list dictionary."""
+    offsets, data = arrays[f"{name}.offsets"], bytes(arrays[f"{name}.data"])
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def to_arrow(table: ColumnTable) -> Any:
+    """The table as a ``pyarrow.Table`` with dictionary-typed enums and lists."""
+    if pyarrow is None:
+        raise ValueError("Arrow and Parquet output need the pyarrow package")
+    pa = pyarrow
+    columns = {}
+    for name, (offsets, data) in table.strings.items():
+        columns[name] = pa.array(decode_strings({f"{name}.offsets": offsets, f"{name}.data": data}, name), pa.string())
+    for name, values in table.floats.items():
+        columns[name] = pa.array(values, pa.float64(), mask=[math.isnan(v) for v in values])
+    for name, (codes, dictionary) in table.enums.items():
+        indices = pa.array(codes, pa.int32(), mask=[c < 0 for c in codes])
+        columns[name] = pa.DictionaryArray.from_arrays(indices, pa.array(dictionary.values, pa.string()))
+    for name, (offsets, codes, dictionary) in table.lists.items():
+        values = pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(dictionary.values, pa.string()))
+        columns[name] = pa.LargeListArray.from_arrays(pa.array(offsets, pa.int64()), values)
+    return pa.table(columns)
+
+
+def export(table: ColumnTable, path: Path) -> int:
+    """Write by suffix: ``.npz``, ``.parquet`` or ``.arrow``; returns the file size."""
+    path = Path(path)
+    if path.suffix == ".npz":
+        return write_npz(table, path)
+    arrow = to_arrow(table)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(arrow, path)
+    elif path.suffix in (".arrow", ".feather"):
+        import pyarrow.feather as feather
+
+        feather.write_feather(arrow, path)
+    else:
+        raise ValueError(f"Unsupported columnar format {path.suffix!r}")
+    return path.stat().st_size
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the corpus as typed columns.")
+    parser.add_argument("-o", "--output", required=True, help="output file (.npz, .parquet or .arrow)")
+    args = parser.parse_args(argv)
+
+    table = ColumnTable.from_sources()
+    size = export(table, Path(args.output))
+    kinds = list(table.schema().values())
+    print(f"Wrote {args.output}: {len(table)} rows, " +
+          ", ".join(f"{kinds.count(k)} {k}" for k in ("float64", "string", "enum", "list")) +
+          f" columns, {size:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Numeric feature table over the personality corpus.
+
+Flattens records into the shapes analytics and clustering work on:
+
+* ``ocean`` - row-major ``n x 5`` float64 array, NaN where a score is missing
+* ``traits`` - one int bitset per row over the trait vocabulary, where a
+  trait is a ``field:value`` token from a list field of the enhanced
+  sections (e.g. ``core_values:wisdom``)
+* ``enums`` - per row, the scalar string fields of the enhanced sections
+  keyed ``section.field`` (e.g. ``cognitive_style.thinking_pattern``)
+
+Rows can be replaced or removed in place so consumers can keep derived
+statistics up to date without rebuilding the table.
+"""
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .personality_loader import OCEAN_TRAITS, PersonalityLoader
+
+# Sections written by the enhancer, in profile order
+ENHANCED_SECTIONS = (
+    "behavioral_traits",
+    "cognitive_style",
+    "social_dynamics",
+    "communication_patterns",
+    "work_methodology",
+    "emotional_profile",
+    "legacy_impact",
+    "category_specific",
+)
+
+WIDTH = len(OCEAN_TRAITS)
+
+
+def ocean_vector(record: Dict[str, Any]) -> Tuple[float, ...]:
+    """OCEAN scores in ``OCEAN_TRAITS`` order, NaN for missing scores."""
+    scores = record.get("ocean") or {}
+    vector = []
+    for trait in OCEAN_TRAITS:
+        value = scores.get(trait)
+        vector.append(float(value) if isinstance(value, (int, float)) else math.nan)
+    return tuple(vector)
+
+
+def trait_tokens(record: Dict[str, Any]) -> List[str]:
+    """``field:value`` tokens for every string in the enhanced list fields."""
+    tokens = []
+    for section in ENHANCED_SECTIONS:
+        block = record.get(section)
+        if not isinstance(block, dict):
+            continue
+        for field, value in block.items():
+            if isinstance(value, list):
+                tokens.extend(f"{field}:{item}" for item in value if isinstance(item, str))
+    return tokens
+
+
+def enum_fields(record: Dict[str, Any]) -> Dict[str, str]:
+    """Scalar string fields of the enhanced sections, keyed ``section.field``."""
+    fields = {}
+    for section in ENHANCED_SECTIONS:
+        block = record.get(section)
+        if not isinstance(block, dict):
+            continue
+        for field, value in block.items():
+            if isinstance(value, str):
+                fields[f"{section}.{field}"] = value
+    return fields
+
+
+def iter_bits(bits: int) -> Iterable[int]:
+    """Indices of the set bits of ``bits``, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class Row:
+    """Features of a single record."""
+
+    __slots__ = ("key", "ocean", "category", "traits", "enums")
+
+    def __init__(self, key: str, ocean: Tuple[float, ...], category: Optional[str],
+                 traits: int, enums: Dict[str, str]):
+        self.key = key
+        self.ocean = ocean
+        self.category = category
+        self.traits = traits
+        self.enums = enums
+
+    @property
+    def complete(self) -> bool:
+        """True when all five OCEAN scores are present."""
+        return not any(math.isnan(v) for v in self.ocean)
+
+
+class CorpusFeatures:
+    """Column-oriented features of a corpus, updatable row by row."""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.ocean = array("d")
+        self.categories: List[Optional[str]] = []
+        self.traits: List[int] = []
+        self.enums: List[Dict[str, str]] = []
+        self.trait_vocab: List[str] = []
+        self._trait_bit: Dict[str, int] = {}
+        self._rows: Dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "CorpusFeatures":
+        """Build from ``(key, record)`` pairs."""
+        features = cls()
+        for key, record in records:
+            features.set(key, record)
+        return features
+
+    @classmethod
+    def from_loader(cls, loader: PersonalityLoader) -> "CorpusFeatures":
+        """Build from every record of ``loader``."""
+        names = loader.get_names()
+        return cls.from_records(zip(names, loader.get_many(names)))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def _bits(self, tokens: Iterable[str]) -> int:
+        bits = 0
+        for token in tokens:
+            bit = self._trait_bit.get(token)
+            if bit is None:
+                bit = self._trait_bit[token] = len(self.trait_vocab)
+                self.trait_vocab.append(token)
+            bits |= 1 << bit
+        return bits
+
+    def row(self, key: str) -> Optional[Row]:
+        """Features of ``key``, or None when absent."""
+        i = self._rows.get(key)
+        if i is None:
+            return None
+        return Row(key, tuple(self.ocean[i * WIDTH:(i + 1) * WIDTH]),
+                   self.categories[i], self.traits[i], self.enums[i])
+
+    def rows(self) -> Iterable[Row]:
+        """Every row, in table order."""
+        for key in self.keys:
+            yield self.row(key)
+
+    def set(self, key: str, record: Dict[str, Any]) -> Optional[Row]:
+        """Insert or replace ``key``; returns the replaced row, if any."""
+        old = self.row(key)
+        ocean = ocean_vector(record)
+        category = record.get("category")
+        traits = self._bits(trait_tokens(record))
+        enums = enum_fields(record)
+
+        i = self._rows.get(key)
+        if i is None:
+            self._rows[key] = len(self.keys)
+            self.keys.append(key)
+            self.ocean.extend(ocean)
+            self.categories.append(category)
+            self.traits.append(traits)
+            self.enums.append(enums)
+        else:
+            self.ocean[i * WIDTH:(i + 1) * WIDTH] = array("d", ocean)
+            self.categories[i] = category
+            self.traits[i] = traits
+            self.enums[i] = enums
+        return old
+
+    def remove(self, key: str) -> Optional[Row]:
+        """Drop ``key`` by moving the last row into its slot."""
+        old = self.row(key)
+        if old is None:
+            return None
+        i = self._rows.pop(key)
+        last = len(self.keys) - 1
+        if i != last:
+            moved = self.keys[last]
+            self.keys[i] = moved
+            self.ocean[i * WIDTH:(i + 1) * WIDTH] = self.ocean[last * WIDTH:(last + 1) * WIDTH]
+            self.categories[i] = self.categories[last]
+            self.traits[i] = self.traits[last]
+            self.enums[i] = self.enums[last]
+            self._rows[moved] = i
+        self.keys.pop()
+        del self.ocean[last * WIDTH:]
+        self.categories.pop()
+        self.traits.pop()
+        self.enums.pop()
+        return old
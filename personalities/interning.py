@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Hash-consed sharing of identical sub-objects across records.
+
+Enhanced profiles are heavily templated: every philosopher carries the
+same ``category_specific`` block, ``influence_domains`` lists repeat per
+category, and so on. ``Interner`` rebuilds records bottom-up so that
+structurally identical dicts, lists and strings are stored once and
+shared. Because children are interned first, a container is identified
+by the identities of its children, so each node is hashed exactly once.
+
+Interned records share structure and must be treated as read-only.
+
+The same sharing is available on disk: ``export_deduplicated`` writes
+repeated blocks once into a ``shared`` table and replaces each use with
+``{"$ref": n}``; ``DedupSource`` reads such a file back, already shared.
+
+Usage:
+    python -m personalities.interning [-o corpus.dedup.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .sources import Source
+
+DEDUP_FORMAT = "hanzo-persona-dedup"
+DEDUP_VERSION = 1
+REF_KEY = "$ref"
+
+
+class InternStats:
+    """Counters describing how much sharing an interner achieved."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.unique = 0
+        self.bytes_before = 0
+        self.bytes_shared = 0
+        # The canonicalizing table itself: its hash slots and key tuples
+        self.table_bytes = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_shared - self.table_bytes
+
+    @property
+    def bytes_after(self) -> int:
+        return self.bytes_before - self.bytes_saved
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "unique_nodes": self.unique,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "bytes_shared": self.bytes_shared,
+            "table_bytes": self.table_bytes,
+            "bytes_saved": self.bytes_saved,
+            "saved_ratio": round(self.bytes_saved / self.bytes_before, 4) if self.bytes_before else 0.0,
+        }
+
+
+class Interner:
+    """Canonicalizing table of strings, lists and dicts.
+
+    Memory figures are shallow ``sys.getsizeof`` sizes of distinct
+    objects: each node that resolves to an existing copy saves its own
+    size, and its children are accounted for at their own level. Nodes
+    that already are the canonical copy (e.g. keys the JSON parser shared
+    within one file) count for nothing. The table costs memory of its own
+    for as long as it is kept; ``release`` drops it once no more records
+    will be interned.
+    """
+
+    def __init__(self):
+        self._table: Dict[Any, Any] = {}
+        self.stats = InternStats()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def release(self) -> None:
+        """Drop the table; shared objects stay shared, later records start afresh."""
+        self._table = {}
+        self.stats.table_bytes = 0
+
+    def _canonical(self, key: Any, value: Any) -> Any:
+        existing = self._table.get(key)
+        if existing is value:
+            return value
+        self.stats.nodes += 1
+        size = sys.getsizeof(value)
+        self.stats.bytes_before += size
+        if existing is not None:
+            self.stats.bytes_shared += size
+            return existing
+        before = sys.getsizeof(self._table)
+        self._table[key] = value
+        self.stats.unique += 1
+        self.stats.table_bytes += _key_bytes(key) + sys.getsizeof(self._table) - before
+        return value
+
+    def intern(self, value: Any) -> Any:
+        """Return the shared copy of ``value``, registering it if new."""
+        if isinstance(value, str):
+            return self._canonical(("s", value), value)
+        if isinstance(value, list):
+            items = [self.intern(item) for item in value]
+            return self._canonical(("l",) + tuple(map(_identity, items)), items)
+        if isinstance(value, dict):
+            items = {self.intern(k): self.intern(v) for k, v in value.items()}
+            key = ("d",) + tuple((k, _identity(v)) for k, v in items.items())
+            return self._canonical(key, items)
+        return value
+
+
+def _key_bytes(key: Any) -> int:
+    """Memory only a table key holds: its tuples and ``id`` integers.
+
+    Strings and scalars in a key are the interned objects themselves.
+    """
+    if isinstance(key, tuple):
+        return sys.getsizeof(key) + sum(_key_bytes(part) for part in key)
+    if type(key) is int and not -5 <= key <= 256:
+        return sys.getsizeof(key)
+    return 0
+
+
+def _identity(value: Any) -> Any:
+    """Hashable identity of an interned child.
+
+    Interned containers are unique per structure, so their ``id`` is a
+    sound key; scalars are keyed by type and value so ``1``, ``1.0`` and
+    ``True`` stay distinct.
+    """
+    if isinstance(value, (dict, list)):
+        return id(value)
+    return (type(value).__name__, value)
+
+
+def _dedup_nodes(records: Dict[str, Any], min_size: int) -> Dict[int, int]:
+    """Map ``id`` of repeated, sizable containers to their shared-table slot."""
+    counts: Dict[int, int] = {}
+    sizes: Dict[int, int] = {}
+
+    def visit(value: Any) -> None:
+        if not isinstance(value, (dict, list)):
+            return
+        node = id(value)
+        counts[node] = counts.get(node, 0) + 1
+        if counts[node] > 1:
+            # Children were already counted through the first occurrence
+            return
+        sizes[node] = len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+        children = value.values() if isinstance(value, dict) else value
+        for child in children:
+            visit(child)
+
+    for record in records.values():
+        visit(record)
+    repeated = [n for n, c in counts.items() if c > 1 and sizes[n] >= min_size]
+    return {node: slot for slot, node in enumerate(repeated)}
+
+
+def deduplicate(records: Dict[str, Dict[str, Any]], min_size: int = 24) -> Dict[str, Any]:
+    """Deduplicated document for ``records`` (which are interned first).
+
+    Containers that occur more than once and serialize to at least
+    ``min_size`` bytes are written once to ``shared`` and referenced.
+    """
+    interner = Interner()
+    records = {key: interner.intern(record) for key, record in records.items()}
+    slots = _dedup_nodes(records, min_size)
+    shared: List[Any] = [None] * len(slots)
+
+    def encode(value: Any, top: bool = False) -> Any:
+        if isinstance(value, (dict, list)):
+            slot = slots.get(id(value))
+            if slot is not None and not top:
+                if shared[slot] is None:
+                    shared[slot] = encode(value, top=True)
+                return {REF_KEY: slot}
+            if isinstance(value, dict):
+                return {k: encode(v) for k, v in value.items()}
+            return [encode(v) for v in value]
+        return value
+
+    encoded = {key: encode(record) for key, record in records.items()}
+    return {
+        "format": DEDUP_FORMAT,
+        "version": DEDUP_VERSION,
+        "shared": shared,
+        "records": encoded,
+    }
+
+
+def expand(document: Dict[str, Any], interner: Optional[Interner] = None) -> Dict[str, Dict[str, Any]]:
+    """Resolve a deduplicated document back into records that share blocks."""
+    if document.get("format") != DEDUP_FORMAT:
+        raise ValueError("Not a deduplicated personality corpus")
+    shared = document["shared"]
+    resolved: Dict[int, Any] = {}
+
+    def decode(value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and REF_KEY in value:
+                slot = value[REF_KEY]
+                if slot not in resolved:
+                    resolved[slot] = decode(shared[slot])
+                return resolved[slot]
+            return {k: decode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [decode(v) for v in value]
+        return value
+
+    records = {key: decode(record) for key, record in document["records"].items()}
+    if interner is not None:
+        records = {key: interner.intern(record) for key, record in records.items()}
+    return records
+
+
+def export_deduplicated(records: Dict[str, Dict[str, Any]], path: Path, min_size: int = 24) -> Tuple[int, int]:
+    """Write the deduplicated form; returns ``(plain_bytes, dedup_bytes)``."""
+    compact = (",", ":")
+    plain = len(json.dumps(records, ensure_ascii=False, separators=compact).encode("utf-8"))
+    data = json.dumps(deduplicate(records, min_size), ensure_ascii=False, separators=compact).encode("utf-8")
+    Path(path).write_bytes(data)
+    return plain, len(data)
+
+
+class DedupSource(Source):
+    """A file written by ``export_deduplicated``."""
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        yield from expand(data).items()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .personality_loader import PersonalityLoader
+
+    parser = argparse.ArgumentParser(description="Report interning savings and export a deduplicated corpus.")
+    parser.add_argument("-o", "--output", help="write the deduplicated corpus here")
+    args = parser.parse_args(argv)
+
+    loader = PersonalityLoader.from_corpus(lazy=False, intern=True)
+    print(json.dumps(loader.intern_stats(), indent=2))
+    if args.output:
+        names = loader.get_names()
+        plain, dedup = export_deduplicated(dict(zip(names, loader.get_many(names))), Path(args.output))
+        print(f"Wrote {args.output}: {dedup:,} bytes vs {plain:,} compact JSON "
+              f"({100 * (1 - dedup / plain):.1f}% smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Compressed corpus container with per-record random access.
+
+A pack stores records as compact JSON in small independently compressed
+blocks (one record per block by default), all sharing a preset dictionary
+trained on the corpus: the JSON keys and enum values that repeat across
+profiles (``"thinking_pattern":"analytical"``, ...). Reading one persona
+decompresses one block; nothing else is touched.
+
+Layout (little-endian)::
+
+    header   magic, format version, codec, records per block, record count,
+             dictionary offset/length, index offset/length
+    dictionary
+    blocks   compressed, newline-joined compact JSON records
+    index    zlib-compressed JSON: {"keys": [...], "offsets": [...]}
+
+The codec is raw deflate with a preset dictionary (stdlib ``zlib``), or
+zstd with a trained dictionary when ``zstandard`` is installed.
+
+Usage:
+    python -m personalities.packed -o corpus.hpack [--block-records N] [--codec zlib|zstd]
+"""
+
+import argparse
+import json
+import mmap
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import serialization
+from .sources import Source
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+PACK_MAGIC = b"HPCK"
+PACK_VERSION = 1
+CODECS = {"zlib": 0, "zstd": 1}
+
+# magic, version, codec, block records, record count, dict off/len, index off/len
+_HEADER = struct.Struct("<4sHHII4Q")
+
+# Preset dictionaries beyond the deflate window are useless
+ZLIB_DICT_SIZE = 32 * 1024
+_FRAGMENT = re.compile(r'"(?:[^"\\]|\\.){2,80}"[:,]?')
+
+
+def _dumps(record: Dict[str, Any]) -> bytes:
+    return serialization.dumps(record)
+
+
+def train_dictionary(samples: List[bytes], size: int = ZLIB_DICT_SIZE) -> bytes:
+    """Preset dictionary of the JSON fragments that recur across samples.
+
+    Fragments (quoted strings with their trailing ``:`` or ``,``) are
+    ranked by how many samples contain them times their length; the best
+    go last, where deflate reaches them with the shortest distances.
+    """
+    seen: Counter = Counter()
+    for sample in samples:
+        seen.update(set(_FRAGMENT.findall(sample.decode("utf-8"))))
+    ranked = sorted(((count * len(f.encode("utf-8")), f) for f, count in seen.items() if count > 1), reverse=True)
+    chosen, total = [], 0
+    for _, fragment in ranked:
+        data = fragment.encode("utf-8")
+        if total + len(data) > size:
+            continue
+        chosen.append(data)
+        total += len(data)
+    return b"".join(reversed(chosen))
+
+
+def _train_zstd(samples: List[bytes]) -> bytes:
+    """zstd-trained dictionary, or none when zstd has too few samples to train on."""
+    try:
+        return zstandard.train_dictionary(64 * 1024, samples).as_bytes()
+    except zstandard.ZstdError:
+        return b""
+
+
+class _Codec:
+    """Block (de)compression bound to one dictionary."""
+
+    def __init__(self, codec: str, dictionary: bytes, level: Optional[int] = None):
+        self.name = codec
+        self.dictionary = dictionary
+        if codec == "zstd":
+            if zstandard is None:
+                raise ValueError("The zstd codec needs the zstandard package")
+            data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            self._compressor = zstandard.ZstdCompressor(level=level or 19, dict_data=data)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=data)
+        elif codec != "zlib":
+            raise ValueError(f"Unknown codec {codec!r}")
+        self.level = level or 9
+        self._zdict = {"zdict": dictionary} if dictionary else {}
+
+    def compress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._compressor.compress(data)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, **self._zdict)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.name == "zstd":
+            return self._decompressor.decompress(data)
+        return zlib.decompressobj(-15, **self._zdict).decompress(data)
+
+
+def write_pack(records: Iterable[Tuple[str, Dict[str, Any]]], path: Path,
+               block_records: int = 1, codec: Optional[str] = None) -> Dict[str, int]:
+    """Write ``(key, record)`` pairs as a pack; returns byte counts.
+
+    ``codec`` defaults to zstd when available, else zlib.
+    """
+    codec = codec or ("zstd" if zstandard is not None else "zlib")
+    keys, encoded = [], []
+    for key, record in records:
+        keys.append(key)
+        encoded.append(_dumps(record))
+    if codec == "zstd" and zstandard is not None:
+        dictionary = _train_zstd(encoded)
+    else:
+        dictionary = train_dictionary(encoded)
+    coder = _Codec(codec, dictionary)
+
+    blocks, offsets = [], [0]
+    for start in range(0, len(encoded), block_records):
+        block = coder.compress(b"\n".join(encoded[start:start + block_records]))
+        blocks.append(block)
+        offsets.append(offsets[-1] + len(block))
+    index = zlib.compress(json.dumps({"keys": keys, "offsets": offsets}, separators=(",", ":")).encode("utf-8"), 9)
+
+    dict_offset = _HEADER.size
+    data_offset = dict_offset + len(dictionary)
+    index_offset = data_offset + offsets[-1]
+    header = _HEADER.pack(PACK_MAGIC, PACK_VERSION, CODECS[codec], block_records, len(keys),
+                          dict_offset, len(dictionary), index_offset, len(index))
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(dictionary)
+        for block in blocks:
+            f.write(block)
+        f.write(index)
+    return {
+        "records": len(keys),
+        "json_bytes": sum(len(e) for e in encoded),
+        "dictionary_bytes": len(dictionary),
+        "pack_bytes": index_offset + len(index),
+    }
+
+
+class PackedCorpus:
+    """Random-access reader over a pack held in a buffer (mmap or bytes)."""
+
+    def __init__(self, buffer: Any, cache_blocks: int = 64):
+        self._buffer = buffer
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        magic, version, codec, block_records, count, dict_off, dict_len, index_off, index_len = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError("Not a personality pack")
+        if version != PACK_VERSION:
+            raise ValueError(f"Unsupported pack version {version}")
+        name = next(n for n, c in CODECS.items() if c == codec)
+        self._codec = _Codec(name, bytes(buffer[dict_off:dict_off + dict_len]))
+        index = json.loads(zlib.decompress(bytes(buffer[index_off:index_off + index_len])))
+        self._keys: List[str] = index["keys"]
+        self._offsets: List[int] = index["offsets"]
+        if len(self._keys) != count:
+            raise ValueError("Pack index does not match its header")
+        self._data_offset = dict_off + dict_len
+        self._block_records = block_records
+        self._position = {key: i for i, key in reversed(list(enumerate(self._keys)))}
+        self._cache: "OrderedDict[int, List[bytes]]" = OrderedDict()
+        self._cache_blocks = cache_blocks
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: Path, **kwargs: Any) -> "PackedCorpus":
+        """Memory-map a pack file; only touched blocks are paged in."""
+        f = open(path, "rb")
+        mapped = None
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            corpus = cls(mapped, **kwargs)
+        except Exception:
+            if mapped is not None:
+                mapped.close()
+            f.close()
+            raise
+        corpus._mmap, corpus._file = mapped, f
+        return corpus
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def __enter__(self) -> "PackedCorpus":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._position
+
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    @property
+    def codec(self) -> str:
+        return self._codec.name
+
+    def _block(self, number: int) -> List[bytes]:
+        with self._lock:
+            cached = self._cache.get(number)
+            if cached is not None:
+                self._cache.move_to_end(number)
+                return cached
+        start = self._data_offset + self._offsets[number]
+        stop = self._data_offset + self._offsets[number + 1]
+        lines = self._codec.decompress(self._buffer[start:stop]).split(b"\n")
+        with self._lock:
+            self._cache[number] = lines
+            if len(self._cache) > self._cache_blocks:
+                self._cache.popitem(last=False)
+        return lines
+
+    def _decode(self, position: int) -> Dict[str, Any]:
+        block, slot = divmod(position, self._block_records)
+        return serialization.loads(self._block(block)[slot])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Decode one record, or ``None`` for an unknown key."""
+        position = self._position.get(key)
+        return None if position is None else self._decode(position)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Decode the known ``keys``, each block at most once."""
+        return {key: self._decode(self._position[key]) for key in sorted(
+            set(keys).intersection(self._position), key=self._position.__getitem__)}
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Every ``(key, record)`` in pack order, decompressing each block once."""
+        for number in range(len(self._offsets) - 1):
+            start = self._data_offset + self._offsets[number]
+            stop = self._data_offset + self._offsets[number + 1]
+            lines = self._codec.decompress(self._buffer[start:stop]).split(b"\n")
+            first = number * self._block_records
+            for key, line in zip(self._keys[first:first + len(lines)], lines):
+                yield key, serialization.loads(line)
+
+
+class PackedSource(Source):
+    """A pack written by ``write_pack``; reads decode only requested records."""
+
+    keys_from_path = True
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._corpus: Optional[PackedCorpus] = None
+        self._open_lock = threading.Lock()
+
+    def corpus(self) -> PackedCorpus:
+        with self._open_lock:
+            if self._corpus is None:
+                if not self.path.exists():
+                    raise FileNotFoundError(f"Personality file not found: {self.path}")
+                self._corpus = PackedCorpus.open(self.path)
+        return self._corpus
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return self.corpus().records()
+
+    def parse_bytes(self, raw: bytes) -> Any:
+        # Packs are decoded block by block in ``records_in``
+        return raw
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Records of a whole pack held in ``data`` (bytes or a buffer)."""
+        return PackedCorpus(data).records()
+
+    def read_keys(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return self.corpus().get_many(keys)
+
+    def keys(self) -> List[str]:
+        return list(dict.fromkeys(self.corpus().keys()))
+
+
+def benchmark(pack: Path, loader: Any, sample: int = 200) -> Dict[str, Any]:
+    """Size and decode speed of a pack against the loader's raw JSON files."""
+    files = {source.path for source in loader.sources if source.path.exists()}
+    raw_bytes = sum(path.stat().st_size for path in files)
+    start = time.perf_counter()
+    for path in files:
+        with open(path, "rb") as f:
+            json.loads(f.read())
+    raw_seconds = time.perf_counter() - start
+
+    with PackedCorpus.open(pack, cache_blocks=0) as corpus:
+        start = time.perf_counter()
+        for _ in corpus.records():
+            pass
+        full_seconds = time.perf_counter() - start
+        keys = corpus.keys()[::max(1, len(corpus) // sample)][:sample]
+        start = time.perf_counter()
+        for key in keys:
+            corpus.get(key)
+        one_seconds = (time.perf_counter() - start) / max(len(keys), 1)
+        codec = corpus.codec
+
+    return {
+        "codec": codec,
+        "raw_files": len(files),
+        "raw_bytes": raw_bytes,
+        "pack_bytes": Path(pack).stat().st_size,
+        "ratio": round(Path(pack).stat().st_size / raw_bytes, 4) if raw_bytes else None,
+        "raw_parse_ms": round(raw_seconds * 1000, 2),
+        "pack_decode_all_ms": round(full_seconds * 1000, 2),
+        "pack_decode_one_us": round(one_seconds * 1e6, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .personality_loader import PersonalityLoader
+
+    parser = argparse.ArgumentParser(description="Pack the corpus into a compressed random-access container.")
+    parser.add_argument("-o", "--output", required=True, help="pack file to write")
+    parser.add_argument("--block-records", type=int, default=1, help="records per compressed block")
+    parser.add_argument("--codec", choices=sorted(CODECS), help="default: zstd if installed, else zlib")
+    args = parser.parse_args(argv)
+
+    loader = PersonalityLoader.from_corpus()
+    names = loader.get_names()
+    stats = write_pack(zip(names, loader.get_many(names)), Path(args.output), args.block_records, args.codec)
+    print(json.dumps(dict(stats, **benchmark(Path(args.output), loader)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,60 +6,401 @@ Loads personalities from the centralized JSON file.
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from .sources import RecordListSource, Source, default_sources
 
 # Find the personality data file
 PERSONA_DIR = Path(__file__).parent
-PERSONALITY_FILE = PERSONA_DIR / "all_personalities.json"
+PERSONALITY_FILE = PERSONA_DIR / "archive-mega-files" / "all_personalities.json"
+
+# Column order of the OCEAN vector wherever scores are packed
+OCEAN_TRAITS = (
+    "openness",
+    "conscientiousness",
+    "extraversion",
+    "agreeableness",
+    "neuroticism",
+)
+
+class PersonalityNotFoundError(KeyError):
+    """Raised when one or more requested personalities do not exist."""
+
+    def __init__(self, missing: List[str]):
+        self.missing = list(missing)
+        super().__init__(f"Personalities not found: {', '.join(self.missing)}")
+
 
 class PersonalityLoader:
     """Load and manage personalities from centralized JSON."""
 
-    def __init__(self, file_path: Optional[Path] = None):
-        """Initialize loader with optional custom path."""
-        self.file_path = file_path or PERSONALITY_FILE
+    def __init__(
+        self,
+        file_path: Optional[Path] = None,
+        lazy: bool = False,
+        sources: Optional[List[Source]] = None,
+        max_workers: int = 8,
+        cluster_index: Optional[Path] = None,
+        intern: bool = False,
+    ):
+        """Initialize loader with optional custom path.
+
+        With ``lazy=True`` nothing is parsed until first access, so
+        importing the package stays cheap in processes that never touch
+        the global loader (e.g. workers attached to a shared corpus). A
+        lazy loader only indexes its sources and reads a backing file
+        when one of its records is requested.
+
+        ``sources`` replaces the single ``file_path`` with several backing
+        files (see ``personalities.sources``); the first source providing
+        a key wins. When neither is given and ``all_personalities.json``
+        is not installed, its packed copy ``all_personalities.hpack`` is
+        used, so the same records are served either way.
+
+        ``cluster_index`` points at a sidecar written by
+        ``personalities.clustering``; it is read on the first
+        ``cluster_of``/``members`` call.
+
+        With ``intern=True`` identical nested dicts, lists and strings are
+        shared across records (see ``personalities.interning``); records
+        must then be treated as read-only.
+        """
+        self.file_path = Path(file_path) if file_path else PERSONALITY_FILE
+        if sources is None and file_path is None and not PERSONALITY_FILE.exists():
+            # Zipped wheels, zipapps and frozen apps only ship the packs
+            from .resource import DEFAULT_RESOURCE_NAME, resource_sources
+
+            sources = resource_sources(DEFAULT_RESOURCE_NAME) or None
+        self.sources: List[Source] = sources if sources is not None else [RecordListSource(self.file_path)]
+        self.lazy = lazy
+        self.max_workers = max_workers
         self._personalities: Dict[str, Dict[str, Any]] = {}
-        self._load()
+        # Backing source per key; None for records that only live in memory
+        self._index: Dict[str, Optional[Source]] = {}
+        self._loaded = False
+        self.cluster_index_path = Path(cluster_index) if cluster_index else None
+        self._clusters = None
+        self._aliases = None
+        self._query_index = None
+        self._router = None
+        self._activator = None
+        self._snapshot = None
+        self._interner = None
+        if intern:
+            from .interning import Interner
+
+            self._interner = Interner()
+        if not lazy:
+            self._load()
+
+    @classmethod
+    def from_corpus(cls, lazy: bool = True, **kwargs: Any) -> "PersonalityLoader":
+        """Loader over ``profiles/`` and the archive mega files.
+
+        Installs without the loose files (wheels, zipapps, frozen apps)
+        fall back to the packed ``corpus.hpack`` resource.
+        """
+        sources = default_sources()
+        if not sources:
+            from .resource import resource_sources
+
+            sources = resource_sources()
+        return cls(sources=sources, lazy=lazy, **kwargs)
+
+    @classmethod
+    def from_resource(cls, lazy: bool = True, **kwargs: Any) -> "PersonalityLoader":
+        """Loader over the packed ``corpus.hpack`` resource only (one open, lazy decoding)."""
+        from .resource import ResourceSource
+
+        return cls(sources=[ResourceSource()], lazy=lazy, **kwargs)
+
+    def _ensure_loaded(self) -> None:
+        """Parse (or, when lazy, index) the backing files on first use."""
+        if not self._loaded:
+            self._load()
 
     def _load(self) -> None:
-        """Load personalities from JSON file."""
-        if not self.file_path.exists():
-            raise FileNotFoundError(f"Personality file not found: {self.file_path}")
+        """Index every source, reading records up front unless lazy.
+
+        Lazy loaders only skip files whose keys are known without parsing
+        them (per-profile files); anything parsed while indexing is kept.
+        An eager load interns everything at once, so its interning table
+        is released afterwards rather than kept alive next to the records.
+        """
+        index: Dict[str, Source] = {}
+        for source in self.sources:
+            if self.lazy and source.keys_from_path:
+                keys = source.keys()
+            else:
+                records = source.read()
+                keys = list(records)
+                self._personalities.update(self._intern(
+                    {key: record for key, record in records.items() if key not in index}))
+            for key in keys:
+                index.setdefault(key, source)
+        self._index = index
+        self._loaded = True
+        if self._interner is not None and not self.lazy:
+            self._interner.release()
+
+    def _intern(self, records: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Share identical sub-objects with already loaded records, if enabled."""
+        if self._interner is None:
+            return records
+        return {key: self._interner.intern(record) for key, record in records.items()}
+
+    def _read_source(self, source: Source, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read ``names`` from one backing file, keeping every record it is
+        authoritative for (sources that parse the whole file return all)."""
+        return {
+            key: record for key, record in source.read_keys(names).items()
+            if self._index.get(key) is source
+        }
+
+    def _fetch(self, names: List[str], strict: bool) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Yield ``(name, record)`` in request order, grouping reads by file."""
+        self._ensure_loaded()
+        missing = [name for name in dict.fromkeys(names) if name not in self._index]
+        if missing and strict:
+            raise PersonalityNotFoundError(missing)
+
+        groups: Dict[Source, List[str]] = {}
+        for name in names:
+            if name in self._index and name not in self._personalities:
+                groups.setdefault(self._index[name], []).append(name)
+
+        if not groups:
+            for name in names:
+                yield name, self._personalities.get(name)
+            return
+
+        workers = min(self.max_workers, len(groups))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {source: pool.submit(self._read_source, source, wanted) for source, wanted in groups.items()}
+            for name in names:
+                source = self._index.get(name)
+                if name not in self._personalities and source in futures:
+                    self._personalities.update(self._intern(futures.pop(source).result()))
+                yield name, self._personalities.get(name)
 
-        with open(self.file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def get_many(self, names: List[str], strict: bool = True) -> List[Optional[Dict[str, Any]]]:
+        """Get several personalities at once, in request order.
 
-        # Convert list to dict for easy lookup
-        for personality in data:
-            self._personalities[personality['name']] = personality
+        Backing files are grouped so each is read at most once, with
+        independent files read in parallel. All unknown names are reported
+        together in one ``PersonalityNotFoundError``; with ``strict=False``
+        they come back as ``None`` instead.
+        """
+        return [record for _, record in self._fetch(list(names), strict)]
+
+    def iter_many(self, names: List[str], strict: bool = True) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Like ``get_many`` but yields ``(name, record)`` pairs as files finish."""
+        return self._fetch(list(names), strict)
 
     def get_all(self) -> List[Dict[str, Any]]:
         """Get all personalities as a list."""
+        self._ensure_loaded()
+        if self.lazy:
+            return self.get_many(list(self._index))
         return list(self._personalities.values())
 
     def get(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a specific personality by name."""
+        self._ensure_loaded()
+        if name not in self._personalities and name in self._index:
+            return self.get_many([name])[0]
         return self._personalities.get(name)
 
     def filter_by_tags(self, tags: List[str]) -> List[Dict[str, Any]]:
         """Filter personalities by tags."""
         results = []
-        for personality in self._personalities.values():
+        for personality in self.get_all():
             if any(tag in personality.get('tags', []) for tag in tags):
                 results.append(personality)
         return results
 
     def get_names(self) -> List[str]:
         """Get all personality names."""
-        return list(self._personalities.keys())
+        self._ensure_loaded()
+        return list(self._index.keys())
 
     def count(self) -> int:
         """Get total number of personalities."""
-        return len(self._personalities)
+        self._ensure_loaded()
+        return len(self._index)
+
+    def resolve(self, query: str, k: int = 5) -> List[Any]:
+        """Rank personalities matching a free-form id, name or partial name.
+
+        Returns up to ``k`` ``AliasMatch(key, score, alias)`` candidates;
+        the alias index is built on first use.
+        """
+        return self.alias_index().resolve(query, k)
+
+    def alias_index(self):
+        """The ``personalities.aliases.AliasIndex`` behind ``resolve``, built on first use."""
+        if self._aliases is None:
+            from .aliases import AliasIndex
+
+            names = self.get_names()
+            self._aliases = AliasIndex.from_records(zip(names, self.get_many(names)))
+        return self._aliases
+
+    def route(self, task: str, k: int = 5) -> List[Any]:
+        """Rank personas for a coding task by tools, domains and keywords.
+
+        Returns up to ``k`` ``RouteMatch(key, score, explanation)``
+        candidates (see ``personalities.routing``); the router is built on
+        first use and caches results per task signature.
+        """
+        if self._router is None:
+            from .routing import Router
+
+            self._router = Router.from_loader(self)
+        return self._router.route(task, k)
+
+    def activator(self):
+        """The ``personalities.activation.Activator`` caching this loader's bundles."""
+        if self._activator is None:
+            from .activation import Activator
+
+            self._activator = Activator(self)
+        return self._activator
+
+    def activate(self, key: str) -> Any:
+        """Frozen activation bundle (env, tools, shell, editor) of a persona."""
+        return self.activator().bundle(key)
+
+    def activation_diff(self, from_id: str, to_id: str) -> Any:
+        """Env vars and tools to add or remove when switching personas."""
+        return self.activator().diff(from_id, to_id)
+
+    def _planner_index(self):
+        if self._query_index is None:
+            from .query import QueryIndex
+
+            names = self.get_names()
+            self._query_index = QueryIndex.from_records(zip(names, self.get_many(names)))
+        return self._query_index
+
+    def query(self, query: Any) -> List[Dict[str, Any]]:
+        """Run a ``personalities.query.Query`` (or its DSL string).
+
+        Only the matching records are fetched; the planner indexes are
+        built on first use.
+        """
+        return self.get_many(self.query_keys(query))
+
+    def query_keys(self, query: Any) -> List[str]:
+        """Keys matching ``query``, in result order, without fetching records."""
+        return self._plan(query)[0]
+
+    def explain(self, query: Any) -> Any:
+        """The plan ``query`` would run, with the number of keys it examines."""
+        return self._plan(query)[1]
+
+    def _plan(self, query: Any) -> Tuple[List[str], Any]:
+        from .query import Query
+
+        if isinstance(query, str):
+            query = Query.parse(query)
+        return query.execute(self._planner_index())
+
+    def snapshot(self) -> Any:
+        """Content-hashed ``personalities.snapshots.Snapshot`` of the corpus.
+
+        Hashing reads every record once; the snapshot is then kept up to
+        date by ``apply_delta``.
+        """
+        if self._snapshot is None:
+            from .snapshots import Snapshot
+
+            names = self.get_names()
+            self._snapshot = Snapshot.from_records(zip(names, self.get_many(names)))
+        return self._snapshot
+
+    def version(self) -> str:
+        """Content hash of the whole corpus."""
+        return self.snapshot().version
+
+    def apply_delta(self, delta: Dict[str, Any]) -> str:
+        """Apply a delta from ``personalities.snapshots`` in place.
+
+        The delta must start from this loader's version, and every patched
+        record must hash to the value the delta records; otherwise
+        ``ValueError`` is raised and nothing is changed. Only touched
+        records are read or hashed. Returns the new version.
+        """
+        from .snapshots import DELTA_FORMAT, RecordHashes, patch_record
+
+        if delta.get("format") != DELTA_FORMAT:
+            raise ValueError("Not a personality corpus delta")
+        snapshot = self.snapshot()
+        if delta["from"] != snapshot.version:
+            raise ValueError(f"Delta applies to version {delta['from']}, corpus is at {snapshot.version}")
+
+        changed = delta["changed"]
+        current = dict(zip(changed, self.get_many(list(changed))))
+        updates = dict(delta["added"])
+        for key, change in changed.items():
+            updates[key] = patch_record(current[key], change)
+        hashes = {key: RecordHashes.of(record) for key, record in updates.items()}
+        for key, change in changed.items():
+            if hashes[key].digest != change["hash"]:
+                raise ValueError(f"Delta does not reproduce record {key!r}")
+        expected = snapshot.version_after(delta["removed"], hashes)
+        if expected != delta["to"]:
+            raise ValueError(f"Delta produces version {expected}, expected {delta['to']}")
+
+        for key in delta["removed"]:
+            self._personalities.pop(key, None)
+            self._index.pop(key, None)
+            snapshot.remove(key)
+        for key, record in self._intern(updates).items():
+            self._personalities[key] = record
+            self._index[key] = None
+            snapshot.set(key, hashes[key])
+
+        # Derived indexes are rebuilt on next use
+        self._aliases = self._query_index = self._router = None
+        if self._activator is not None:
+            self._activator.invalidate(list(updates) + list(delta["removed"]))
+        return snapshot.version
+
+    def intern_stats(self) -> Dict[str, Any]:
+        """Sharing achieved by ``intern=True`` over the records loaded so far, net of the table."""
+        if self._interner is None:
+            raise ValueError("Interning is disabled; create the loader with intern=True")
+        return self._interner.stats.to_dict()
+
+    def attach_clusters(self, index: Any) -> None:
+        """Serve ``cluster_of``/``members`` from a ``ClusterIndex`` or sidecar path."""
+        from .clustering import ClusterIndex
+
+        if not isinstance(index, ClusterIndex):
+            self.cluster_index_path = Path(index)
+            index = ClusterIndex.load(self.cluster_index_path)
+        self._clusters = index
+
+    def _cluster_index(self):
+        if self._clusters is None:
+            if self.cluster_index_path is None:
+                raise ValueError("No cluster index attached; run `python -m personalities.clustering`")
+            self.attach_clusters(self.cluster_index_path)
+        return self._clusters
+
+    def cluster_of(self, name: str) -> Optional[int]:
+        """Archetype cluster of a personality, from the sidecar index."""
+        return self._cluster_index().cluster_of(name)
+
+    def members(self, cluster: int) -> List[str]:
+        """Names of the personalities in an archetype cluster."""
+        return self._cluster_index().members(cluster)
 
 # Global instance for easy import
-loader = PersonalityLoader()
+loader = PersonalityLoader(lazy=True)
 
 # Convenience functions
 def get_all_personalities() -> List[Dict[str, Any]]:
@@ -70,6 +411,14 @@ def get_personality(name: str) -> Optional[Dict[str, Any]]:
     """Get a specific personality."""
     return loader.get(name)
 
+def get_many_personalities(names: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Get several personalities, in request order."""
+    return loader.get_many(names)
+
+def resolve_personality(query: str, k: int = 5) -> List[Any]:
+    """Rank personalities matching a free-form name."""
+    return loader.resolve(query, k)
+
 def list_personality_names() -> List[str]:
     """List all personality names."""
     return loader.get_names()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Load profiling for the corpus.
+
+Reads every backing file the way the loader does and reports, per file:
+bytes, read and parse time, record count, the largest top-level sections
+(summed serialized size across the file's records) and duplicate keys.
+There are two kinds of duplicate key: repeated inside the file, or
+shadowed because an earlier source already provides the key (first
+source wins).
+
+The sources are the loader's (``profiles/`` and the archive mega files,
+or the packed ``corpus.hpack`` resource when no loose files are
+installed); for packs, "parse" is decoding every block. The Markdown
+profiles shipped in the package are timed too. Their sections
+are the ``##`` headings, and their embedded YAML blocks are parsed when
+PyYAML is installed.
+
+The table can be sorted by any column. ``--json`` writes the same data
+for tracking over time.
+
+Usage:
+    python -m personalities profile [--sort parse_ms] [--top 20] [--json] [-o FILE]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from . import serialization
+from .resource import resource_sources
+from .sources import PERSONA_DIR, Source, default_sources
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - PyYAML is optional
+    yaml = None
+
+SORT_KEYS = ("parse_ms", "read_ms", "bytes", "records", "duplicates", "file")
+TOP_SECTIONS = 3
+
+_YAML_BLOCK = re.compile(r"^```ya?ml\n(.*?)^```", re.M | re.S)
+
+
+class FileProfile(NamedTuple):
+    file: str
+    kind: str
+    bytes: int
+    read_ms: float
+    parse_ms: float
+    records: int
+    sections: List[Tuple[str, int]]
+    duplicates: int
+    duplicate_keys: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self._asdict()
+        result["sections"] = dict(self.sections)
+        return result
+
+
+def _display(path: Path) -> str:
+    try:
+        return str(path.relative_to(PERSONA_DIR.parent))
+    except ValueError:
+        return str(path)
+
+
+def _largest(sizes: Dict[str, int], top: int) -> List[Tuple[str, int]]:
+    return sorted(sizes.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+
+def profile_source(source: Source, seen: Set[str], top: int = TOP_SECTIONS) -> FileProfile:
+    """Profile one source; ``seen`` holds keys of earlier sources and is updated."""
+    start = time.perf_counter()
+    raw = source.read_bytes()
+    read_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    records = list(source.records_in(source.parse_bytes(raw)))
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    sizes: Dict[str, int] = {}
+    duplicate_keys = []
+    local: Set[str] = set()
+    for key, record in records:
+        if key in local or key in seen:
+            duplicate_keys.append(key)
+        local.add(key)
+        for section, value in record.items():
+            sizes[section] = sizes.get(section, 0) + len(serialization.dumps(value))
+    seen.update(local)
+    return FileProfile(_display(source.path), type(source).__name__, len(raw), round(read_ms, 3),
+                       round(parse_ms, 3), len(records), _largest(sizes, top),
+                       len(duplicate_keys), duplicate_keys)
+
+
+def profile_markdown(path: Path, top: int = TOP_SECTIONS) -> FileProfile:
+    """Profile a Markdown profile: one record per ``#`` heading, sections per ``##``."""
+    start = time.perf_counter()
+    raw = path.read_bytes()
+    read_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    text = raw.decode("utf-8")
+    records, sizes, section = 0, {}, None
+    for line in text.splitlines(keepends=True):
+        if line.startswith("# "):
+            records += 1
+        elif line.startswith("## "):
+            section = line[3:].strip()
+        elif section is not None:
+            sizes[section] = sizes.get(section, 0) + len(line.encode("utf-8"))
+    if yaml is not None:
+        for block in _YAML_BLOCK.findall(text):
+            yaml.safe_load(block)
+    parse_ms = (time.perf_counter() - start) * 1000
+    return FileProfile(_display(path), "Markdown", len(raw), round(read_ms, 3), round(parse_ms, 3),
+                       records, _largest(sizes, top), 0, [])
+
+
+def profile_corpus(sources: Optional[List[Source]] = None, markdown: Optional[Iterable[Path]] = None,
+                   top: int = TOP_SECTIONS) -> List[FileProfile]:
+    """Profile every source in loader order, then the Markdown profiles.
+
+    Without ``sources`` these are the ones ``PersonalityLoader.from_corpus``
+    reads: the loose files, else the packed resource.
+    """
+    if sources is None:
+        sources = default_sources() or resource_sources()
+    seen: Set[str] = set()
+    result = [profile_source(source, seen, top) for source in sources]
+    paths = sorted(PERSONA_DIR.glob("*.md")) if markdown is None else markdown
+    result.extend(profile_markdown(path, top) for path in paths)
+    return result
+
+
+def summarize(profiles: List[FileProfile]) -> Dict[str, Any]:
+    return {
+        "files": len(profiles),
+        "bytes": sum(p.bytes for p in profiles),
+        "read_ms": round(sum(p.read_ms for p in profiles), 3),
+        "parse_ms": round(sum(p.parse_ms for p in profiles), 3),
+        "records": sum(p.records for p in profiles),
+        "duplicates": sum(p.duplicates for p in profiles),
+        "backend": serialization.backend.name,
+    }
+
+
+def sort_profiles(profiles: List[FileProfile], key: str) -> List[FileProfile]:
+    if key not in SORT_KEYS:
+        raise ValueError(f"Cannot sort by {key!r}")
+    return sorted(profiles, key=lambda p: getattr(p, key), reverse=key != "file")
+
+
+def _size(n: int) -> str:
+    return f"{n}B" if n < 1024 else f"{n / 1024:.1f}K"
+
+
+def format_table(profiles: List[FileProfile], totals: Dict[str, Any]) -> str:
+    total = f"total ({totals['files']} files, {totals['backend']})"
+    width = max([len(p.file) for p in profiles] + [len(total)])
+    lines = [f"{'file':<{width}} {'KB':>8} {'read ms':>8} {'parse ms':>9} {'records':>8} {'dups':>5}  largest sections"]
+    for p in profiles:
+        sections = ", ".join(f"{name} {_size(size)}" for name, size in p.sections)
+        lines.append(f"{p.file:<{width}} {p.bytes / 1024:>8.1f} {p.read_ms:>8.2f} {p.parse_ms:>9.2f} "
+                     f"{p.records:>8} {p.duplicates:>5}  {sections}")
+    lines.append(f"{total:<{width}} {totals['bytes'] / 1024:>8.1f} {totals['read_ms']:>8.2f} "
+                 f"{totals['parse_ms']:>9.2f} {totals['records']:>8} {totals['duplicates']:>5}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m personalities profile",
+                                     description="Profile parse time and size of every corpus file.")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="parse_ms", help="column to sort by")
+    parser.add_argument("--top", type=int, default=0, help="only show the first N files")
+    parser.add_argument("--sections", type=int, default=TOP_SECTIONS, help="largest sections per file")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("-o", "--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    profiles = profile_corpus(top=args.sections)
+    if not profiles:
+        print("No corpus files found to profile", file=sys.stderr)
+        return 1
+    totals = summarize(profiles)
+    ordered = sort_profiles(profiles, args.sort)
+    shown = ordered[:args.top] if args.top else ordered
+    report = {"summary": totals, "files": [p.to_dict() for p in ordered]}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.json:
+        print(json.dumps(dict(report, files=[p.to_dict() for p in shown]), indent=2, ensure_ascii=False))
+    else:
+        print(format_table(shown, totals))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Query planner over category, tags, tools, OCEAN ranges and text.
+
+A ``Query`` is a conjunction of predicates. The planner asks each
+predicate for a candidate-count estimate from the ``QueryIndex`` (set
+sizes, or two bisections on a sorted OCEAN column), starts from the most
+selective one and then either intersects with or filters by the rest,
+whichever touches fewer keys. With ``order_by`` on an OCEAN trait and a
+small ``limit`` over a broad filter it walks the sorted column instead
+and stops at the limit, when the expected walk is shorter than the
+smallest candidate set. Only matching records are ever fetched.
+
+Queries can be built fluently or parsed from a small DSL::
+
+    Query().category("scientist").tag("open-source").ocean("openness", min=80)
+    Query.parse("category:scientist tag:open-source openness>=80 tool:docker kernel")
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .aliases import normalize
+from .personality_loader import OCEAN_TRAITS
+
+# Record fields searched by text predicates
+TEXT_FIELDS = ("name", "programmer", "description", "philosophy", "contributions", "quotes")
+
+_TRAIT_ALIASES = {t: t for t in OCEAN_TRAITS}
+_TRAIT_ALIASES.update({t[0]: t for t in OCEAN_TRAITS})
+_COMPARISON = re.compile(r"^([a-z]+)(>=|<=|>|<|=)(-?\d+(?:\.\d+)?)$")
+
+
+def record_tools(record: Dict[str, Any]) -> List[str]:
+    """Tool names of a record, whether ``tools`` is a list or grouped dict."""
+    tools = record.get("tools")
+    if isinstance(tools, list):
+        return [t for t in tools if isinstance(t, str)]
+    if isinstance(tools, dict):
+        return [t for group in tools.values() if isinstance(group, list)
+                for t in group if isinstance(t, str)]
+    return []
+
+
+def _text_tokens(record: Dict[str, Any]) -> Set[str]:
+    tokens: Set[str] = set()
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        values = value if isinstance(value, list) else [value]
+        for text in values:
+            if isinstance(text, str):
+                tokens.update(normalize(text).split())
+    return tokens
+
+
+class QueryIndex:
+    """Set indexes, sorted OCEAN columns and text postings."""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.position: Dict[str, int] = {}
+        self.sets: Dict[str, Dict[str, Set[str]]] = {"category": {}, "tag": {}, "tool": {}, "text": {}}
+        self.scores: Dict[str, Dict[str, float]] = {t: {} for t in OCEAN_TRAITS}
+        self._columns: Optional[Dict[str, Tuple[List[float], List[str]]]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "QueryIndex":
+        index = cls()
+        for key, record in records:
+            index.add(key, record)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _post(self, kind: str, value: str, key: str) -> None:
+        self.sets[kind].setdefault(value, set()).add(key)
+
+    def add(self, key: str, record: Dict[str, Any]) -> None:
+        """Index one record."""
+        self.position[key] = len(self.keys)
+        self.keys.append(key)
+        if isinstance(record.get("category"), str):
+            self._post("category", record["category"], key)
+        for tag in record.get("tags") or []:
+            if isinstance(tag, str):
+                self._post("tag", tag, key)
+        for tool in record_tools(record):
+            self._post("tool", tool, key)
+        for token in _text_tokens(record):
+            self._post("text", token, key)
+        for trait, value in (record.get("ocean") or {}).items():
+            if trait in self.scores and isinstance(value, (int, float)):
+                self.scores[trait][key] = float(value)
+        self._columns = None
+
+    def column(self, trait: str) -> Tuple[List[float], List[str]]:
+        """``(scores, keys)`` of a trait sorted ascending by score."""
+        if self._columns is None:
+            self._columns = {}
+            for name, scores in self.scores.items():
+                ordered = sorted(scores.items(), key=lambda item: (item[1], self.position[item[0]]))
+                self._columns[name] = ([s for _, s in ordered], [k for k, _ in ordered])
+        return self._columns[trait]
+
+
+class Predicate:
+    """One conjunct of a query."""
+
+    def estimate(self, index: QueryIndex) -> int:
+        """Upper bound on matching keys, cheap to compute."""
+        raise NotImplementedError
+
+    def keys(self, index: QueryIndex) -> Set[str]:
+        """All matching keys."""
+        raise NotImplementedError
+
+    def matches(self, index: QueryIndex, key: str) -> bool:
+        """Whether one key matches."""
+        raise NotImplementedError
+
+
+class SetPredicate(Predicate):
+    """Membership in one of the set indexes (category, tag, tool, text token)."""
+
+    def __init__(self, kind: str, value: str):
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{self.value}"
+
+    def _set(self, index: QueryIndex) -> Set[str]:
+        return index.sets[self.kind].get(self.value, set())
+
+    def estimate(self, index: QueryIndex) -> int:
+        return len(self._set(index))
+
+    def keys(self, index: QueryIndex) -> Set[str]:
+        return self._set(index)
+
+    def matches(self, index: QueryIndex, key: str) -> bool:
+        return key in self._set(index)
+
+
+class RangePredicate(Predicate):
+    """OCEAN score within ``[low, high]``."""
+
+    def __init__(self, trait: str, low: Optional[float] = None, high: Optional[float] = None):
+        self.trait = trait
+        self.low = float("-inf") if low is None else low
+        self.high = float("inf") if high is None else high
+
+    def __repr__(self) -> str:
+        return f"{self.low:g}<={self.trait}<={self.high:g}"
+
+    def _bounds(self, index: QueryIndex) -> Tuple[int, int]:
+        scores, _ = index.column(self.trait)
+        return bisect_left(scores, self.low), bisect_right(scores, self.high)
+
+    def estimate(self, index: QueryIndex) -> int:
+        start, stop = self._bounds(index)
+        return max(stop - start, 0)
+
+    def keys(self, index: QueryIndex) -> Set[str]:
+        start, stop = self._bounds(index)
+        return set(index.column(self.trait)[1][start:stop])
+
+    def matches(self, index: QueryIndex, key: str) -> bool:
+        score = index.scores[self.trait].get(key)
+        return score is not None and self.low <= score <= self.high
+
+
+class Plan:
+    """What the planner did, for ``explain`` and tests."""
+
+    def __init__(self):
+        self.steps: List[str] = []
+        self.examined = 0
+
+    def __repr__(self) -> str:
+        return "\n".join(self.steps + [f"examined {self.examined} keys"])
+
+
+class Query:
+    """Conjunction of predicates with optional ordering and limit."""
+
+    def __init__(self):
+        self.predicates: List[Predicate] = []
+        self.order_trait: Optional[str] = None
+        self.descending = False
+        self.max_results: Optional[int] = None
+
+    def category(self, category: str) -> "Query":
+        self.predicates.append(SetPredicate("category", category))
+        return self
+
+    def tag(self, *tags: str) -> "Query":
+        self.predicates.extend(SetPredicate("tag", t) for t in tags)
+        return self
+
+    def tool(self, *tools: str) -> "Query":
+        self.predicates.extend(SetPredicate("tool", t) for t in tools)
+        return self
+
+    def text(self, text: str) -> "Query":
+        """Require every word of ``text`` in the record's text fields."""
+        self.predicates.extend(SetPredicate("text", w) for w in normalize(text).split())
+        return self
+
+    def ocean(self, trait: str, min: Optional[float] = None, max: Optional[float] = None) -> "Query":
+        self.predicates.append(RangePredicate(_trait(trait), min, max))
+        return self
+
+    def order_by(self, trait: str) -> "Query":
+        """Order by an OCEAN trait; prefix with ``-`` for descending."""
+        self.descending = trait.startswith("-")
+        self.order_trait = _trait(trait.lstrip("-"))
+        return self
+
+    def limit(self, count: int) -> "Query":
+        self.max_results = count
+        return self
+
+    @classmethod
+    def parse(cls, text: str) -> "Query":
+        """Build a query from the DSL.
+
+        ``category:X``, ``tag:X``, ``tool:X``, ``<trait><op><n>`` with op one of
+        ``>= <= > < =`` (trait may be its initial), ``sort:[-]trait``,
+        ``limit:N``; any other word is a text term.
+        """
+        query = cls()
+        for token in text.split():
+            field, _, value = token.partition(":")
+            comparison = _COMPARISON.match(token.lower())
+            if value and field == "category":
+                query.category(value)
+            elif value and field == "tag":
+                query.tag(value)
+            elif value and field == "tool":
+                query.tool(value)
+            elif value and field == "sort":
+                query.order_by(value)
+            elif value and field == "limit":
+                query.limit(int(value))
+            elif comparison and comparison.group(1) in _TRAIT_ALIASES:
+                name, op, number = comparison.groups()
+                n = float(number)
+                bounds = {">=": (n, None), "<=": (None, n), "=": (n, n),
+                          # scores are integers in the corpus; treat strict bounds as +-epsilon
+                          ">": (n + 1e-9, None), "<": (None, n - 1e-9)}[op]
+                query.ocean(name, *bounds)
+            else:
+                query.text(token)
+        return query
+
+    def _ordered_scan(self, index: QueryIndex, plan: Plan) -> List[str]:
+        scores, keys = index.column(self.order_trait)
+        walk = reversed(keys) if self.descending else iter(keys)
+        plan.steps.append(f"walk {self.order_trait} {'desc' if self.descending else 'asc'} "
+                          f"until {self.max_results} matches")
+        # Keys without the score sort last, as in the materialized path
+        scored = index.scores[self.order_trait]
+        unscored = (key for key in index.keys if key not in scored)
+        results = []
+        for key in chain(walk, unscored):
+            plan.examined += 1
+            if all(p.matches(index, key) for p in self.predicates):
+                results.append(key)
+                if len(results) == self.max_results:
+                    break
+        return results
+
+    def execute(self, index: QueryIndex) -> Tuple[List[str], Plan]:
+        """Matching keys, in order, and the plan that produced them."""
+        plan = Plan()
+        ranked = sorted(((p.estimate(index), i, p) for i, p in enumerate(self.predicates)),
+                        key=lambda item: item[:2])
+        smallest = ranked[0][0] if ranked else len(index)
+
+        # Walking the sorted column is expected to visit limit * n / matches
+        # keys; prefer it when that beats materializing the smallest set
+        if self.order_trait and self.max_results is not None:
+            walk_cost = self.max_results * len(index) / max(smallest, 1)
+            if walk_cost < smallest:
+                return self._ordered_scan(index, plan), plan
+
+        if ranked:
+            estimate, _, first = ranked[0]
+            candidates = set(first.keys(index))
+            plan.steps.append(f"seed {first!r} ({estimate} keys)")
+            plan.examined += estimate
+            for estimate, _, predicate in ranked[1:]:
+                if not candidates:
+                    break
+                if len(candidates) <= estimate:
+                    plan.steps.append(f"filter by {predicate!r} ({len(candidates)} keys)")
+                    plan.examined += len(candidates)
+                    candidates = {k for k in candidates if predicate.matches(index, k)}
+                else:
+                    plan.steps.append(f"intersect {predicate!r} ({estimate} keys)")
+                    plan.examined += estimate
+                    candidates &= predicate.keys(index)
+        else:
+            plan.steps.append("scan all keys")
+            plan.examined += len(index)
+            candidates = set(index.keys)
+
+        if self.order_trait:
+            column = index.scores[self.order_trait]
+            missing = float("-inf") if self.descending else float("inf")
+            results = sorted(candidates, key=lambda k: (column.get(k, missing), index.position[k]),
+                             reverse=self.descending)
+            plan.steps.append(f"sort {len(results)} by {self.order_trait}")
+        else:
+            results = sorted(candidates, key=index.position.__getitem__)
+        if self.max_results is not None:
+            results = results[:self.max_results]
+        return results, plan
+
+
+def _trait(name: str) -> str:
+    trait = _TRAIT_ALIASES.get(name.lower())
+    if trait is None:
+        raise ValueError(f"Unknown OCEAN trait {name!r}")
+    return trait
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Task-to-persona routing over tools, domains and keywords.
+
+Every persona is reduced once to a sparse TF-IDF vector over terms drawn
+from its ``tools`` (essential tools weigh more than preferred ones), tool
+``domains``, its entry in ``tools/unix_tools.yaml`` (essential tools,
+shell, editor) and the words of its description, philosophy, category and
+tags. The vectors are stored as an inverted index (term -> persona
+postings), i.e. the transposed sparse matrix, so scoring a batch of tasks
+is one sparse matrix product: each posting list touched by the batch is
+read once and accumulated into every task that contains the term.
+
+Results are cached per task signature (the sorted set of known terms), so
+rephrasings that reduce to the same terms are answered from the cache.
+
+Usage:
+    python -m personalities.routing [-k 5] "profile a slow git bisect"
+"""
+
+import argparse
+import heapq
+import math
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .aliases import AliasIndex, normalize
+from .personality_loader import PERSONA_DIR
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - PyYAML is optional
+    yaml = None
+
+UNIX_TOOLS_FILE = PERSONA_DIR.parent / "tools" / "unix_tools.yaml"
+
+# Weight of a term by where the persona got it from
+SOURCE_WEIGHTS = {
+    "essential": 3.0,
+    "unix": 3.0,
+    "tool": 2.0,
+    "preferred": 1.5,
+    "shell": 1.5,
+    "editor": 1.5,
+    "domain": 1.5,
+    "keyword": 1.0,
+}
+
+# Record fields whose words become keyword terms
+KEYWORD_FIELDS = ("description", "philosophy", "category", "tags")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in into is it its of on or "
+    "that the this to was with will i we you my our me us".split()
+)
+
+
+class RouteMatch(NamedTuple):
+    """One ranked persona for a task."""
+
+    key: str
+    score: float
+    explanation: Tuple[Tuple[str, float, Tuple[str, ...]], ...]  # (term, contribution, sources)
+
+
+def terms(text: str) -> List[str]:
+    """Normalized, stopword-free words of ``text``."""
+    return [w for w in normalize(text).split() if w not in STOPWORDS and len(w) > 1]
+
+
+def load_unix_preferences(path: Path = UNIX_TOOLS_FILE) -> Dict[str, Dict[str, Any]]:
+    """The ``unix_cli_preferences`` table, or ``{}`` without the file or PyYAML."""
+    if yaml is None or not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    prefs = data.get("unix_cli_preferences") or {}
+    return {key: value for key, value in prefs.items() if isinstance(value, dict)}
+
+
+def match_unix_preferences(prefs: Dict[str, Dict[str, Any]], aliases: AliasIndex) -> Dict[str, List[Dict[str, Any]]]:
+    """Attach Unix preference entries to persona keys by exact alias.
+
+    Entries keyed by a pair (``ritchie_thompson``) apply to each person
+    when the whole key is not itself an alias.
+    """
+    matched: Dict[str, List[Dict[str, Any]]] = {}
+    for name, entry in prefs.items():
+        hits = aliases.exact(name)[:1]
+        if not hits:
+            hits = [h for part in name.split("_") for h in aliases.exact(part)[:1]]
+        for hit in hits:
+            matched.setdefault(hit.key, []).append(entry)
+    return matched
+
+
+def persona_terms(record: Dict[str, Any], unix: Sequence[Dict[str, Any]] = ()) -> Dict[str, Dict[str, float]]:
+    """``term -> {source: weight}`` for one persona (before IDF)."""
+    found: Dict[str, Dict[str, float]] = {}
+
+    def add(text: Any, source: str) -> None:
+        if not isinstance(text, str):
+            return
+        for term in terms(text):
+            sources = found.setdefault(term, {})
+            sources[source] = max(sources.get(source, 0.0), SOURCE_WEIGHTS[source])
+
+    tools = record.get("tools")
+    if isinstance(tools, list):
+        for tool in tools:
+            add(tool, "tool")
+    elif isinstance(tools, dict):
+        for group, values in tools.items():
+            source = {"essential": "essential", "preferred": "preferred", "domains": "domain"}.get(group, "tool")
+            for value in values if isinstance(values, list) else []:
+                add(value, source)
+    for field in KEYWORD_FIELDS:
+        value = record.get(field)
+        for text in value if isinstance(value, list) else [value]:
+            add(text, "keyword")
+    for entry in unix:
+        for tool in entry.get("essential_tools") or []:
+            add(tool, "unix")
+        add(entry.get("shell"), "shell")
+        add(entry.get("editor"), "editor")
+    return found
+
+
+class Router:
+    """Sparse persona vectors with batched top-k scoring and a result cache."""
+
+    def __init__(self, cache_size: int = 1024):
+        self.keys: List[str] = []
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._sources: List[Dict[str, Dict[str, float]]] = []
+        self._idf: Dict[str, float] = {}
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._cache: "OrderedDict[Tuple[Tuple[str, ...], int], List[RouteMatch]]" = OrderedDict()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]],
+                     unix_preferences: Optional[Dict[str, Dict[str, Any]]] = None,
+                     cache_size: int = 1024) -> "Router":
+        """Build from ``(key, record)`` pairs and the Unix preference table."""
+        records = list(records)
+        router = cls(cache_size)
+        matched = match_unix_preferences(unix_preferences or {}, AliasIndex.from_records(records))
+        for key, record in records:
+            router.keys.append(key)
+            router._sources.append(persona_terms(record, matched.get(key, ())))
+        router._build()
+        return router
+
+    @classmethod
+    def from_loader(cls, loader: Any, unix_tools: Path = UNIX_TOOLS_FILE, cache_size: int = 1024) -> "Router":
+        names = loader.get_names()
+        return cls.from_records(zip(names, loader.get_many(names)), load_unix_preferences(unix_tools), cache_size)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _build(self) -> None:
+        df: Dict[str, int] = {}
+        for found in self._sources:
+            for term in found:
+                df[term] = df.get(term, 0) + 1
+        n = len(self.keys)
+        self._idf = {term: math.log((n + 1) / (count + 1)) + 1.0 for term, count in df.items()}
+        self._postings = {}
+        for row, found in enumerate(self._sources):
+            weights = {term: sum(sources.values()) * self._idf[term] for term, sources in found.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self._postings.setdefault(term, []).append((row, weight / norm))
+        self._cache.clear()
+
+    def vectorize(self, task: str) -> Dict[str, float]:
+        """Unit-length sparse vector of a task over the known terms."""
+        weights = {term: self._idf[term] for term in terms(task) if term in self._idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+    def route_many(self, tasks: Sequence[str], k: int = 5) -> List[List[RouteMatch]]:
+        """Top ``k`` personas for each task, scored in one sparse product."""
+        vectors = [self.vectorize(task) for task in tasks]
+        signatures = [(tuple(sorted(v)), k) for v in vectors]
+        # Results are collected locally: storing misses may evict entries
+        # this batch still needs when it holds more than ``cache_size``
+        results: Dict[Tuple[Tuple[str, ...], int], List[RouteMatch]] = {}
+        pending: Dict[Tuple[Tuple[str, ...], int], Dict[str, float]] = {}
+        for signature, vector in zip(signatures, vectors):
+            if signature in results or signature in pending:
+                continue
+            if signature in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(signature)
+                results[signature] = self._cache[signature]
+            else:
+                self.misses += 1
+                pending[signature] = vector
+
+        if pending:
+            batch = list(pending.items())
+            # Column view of the task batch: term -> [(task, weight)]
+            columns: Dict[str, List[Tuple[int, float]]] = {}
+            for t, (_, vector) in enumerate(batch):
+                for term, weight in vector.items():
+                    columns.setdefault(term, []).append((t, weight))
+            scores: List[Dict[int, float]] = [{} for _ in batch]
+            for term, entries in columns.items():
+                for row, persona_weight in self._postings[term]:
+                    for t, task_weight in entries:
+                        acc = scores[t]
+                        acc[row] = acc.get(row, 0.0) + persona_weight * task_weight
+            for (signature, vector), acc in zip(batch, scores):
+                top = heapq.nlargest(k, acc.items(), key=lambda item: (item[1], -item[0]))
+                results[signature] = [self._explain(row, score, vector) for row, score in top]
+                self._store(signature, results[signature])
+
+        return [list(results[signature]) for signature in signatures]
+
+    def route(self, task: str, k: int = 5) -> List[RouteMatch]:
+        """Top ``k`` personas for one task."""
+        return self.route_many([task], k)[0]
+
+    def _store(self, signature: Tuple[Tuple[str, ...], int], matches: List[RouteMatch]) -> None:
+        self._cache[signature] = matches
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _explain(self, row: int, score: float, vector: Dict[str, float]) -> RouteMatch:
+        found = self._sources[row]
+        parts = []
+        for term, task_weight in vector.items():
+            sources = found.get(term)
+            if sources:
+                weight = next(w for r, w in self._postings[term] if r == row)
+                parts.append((term, round(weight * task_weight, 4), tuple(sorted(sources))))
+        parts.sort(key=lambda part: -part[1])
+        return RouteMatch(self.keys[row], round(score, 4), tuple(parts))
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .personality_loader import PersonalityLoader
+
+    parser = argparse.ArgumentParser(description="Route coding tasks to the best-matching personas.")
+    parser.add_argument("tasks", nargs="+", help="task descriptions")
+    parser.add_argument("-k", type=int, default=5, help="personas per task")
+    args = parser.parse_args(argv)
+
+    router = Router.from_loader(PersonalityLoader.from_corpus())
+    for task, matches in zip(args.tasks, router.route_many(args.tasks, args.k)):
+        print(task)
+        for match in matches:
+            why = ", ".join(f"{term} ({'/'.join(sources)})" for term, _, sources in match.explanation[:4])
+            print(f"  {match.score:.3f}  {match.key:<24} {why}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+JSON serialization with a pluggable backend.
+
+Parsing and dumping go through the fastest backend available: orjson
+when installed, the standard library otherwise. ``HANZO_PERSONA_JSON``
+(``orjson`` or ``stdlib``) forces one.
+
+Output is canonical: keys are sorted, non-ASCII text is kept as UTF-8,
+and the two layouts are fixed:
+
+* ``pretty`` - two-space indent plus a trailing newline, for files kept
+  in git (``profiles/``)
+* ``compact`` - no whitespace at all, for caches, hashes and wire formats
+
+The same content always gives the same bytes, whichever backend wrote
+them, so rewriting an unchanged record leaves the file and its hash alone.
+Floats are written as ``repr`` writes them: orjson spells the ones
+``repr`` puts in exponent form differently (``1e16`` for ``1e+16``,
+``0.00001`` for ``1e-05``), so values holding such a float are dumped
+by the standard library. NaN and infinities are not JSON: both backends
+refuse to read or write them with ``ValueError``, where the standard
+library would otherwise emit ``NaN`` and orjson ``null``. Values orjson
+cannot encode (integers over 64 bits, non-string keys) fall back to the
+standard library too.
+
+Usage:
+    python -m personalities json [--profiles-dir DIR] [--rounds 3]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+BACKEND_ENV = "HANZO_PERSONA_JSON"
+
+# Every float orjson writes differently from repr() has a digit, "e" and
+# its exponent, or a run of leading zeros
+_EXPONENT = re.compile(rb"e[-\d]")
+_LEADING_ZEROS = b"0.0000"
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _has_nonfinite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_nonfinite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_nonfinite(v) for v in value)
+    return False
+
+
+def _may_have_exponent_float(data: bytes) -> bool:
+    """Cheap scan of orjson output; text can match too."""
+    if _LEADING_ZEROS in data:
+        return True
+    return any(data[m.start() - 1:m.start()].isdigit() for m in _EXPONENT.finditer(data))
+
+
+def _has_exponent_float(value: Any) -> bool:
+    """True when ``repr`` writes some float in ``value`` in exponent form."""
+    if isinstance(value, float):
+        return value != 0 and not 1e-4 <= abs(value) < 1e16
+    if isinstance(value, dict):
+        return any(_has_exponent_float(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_exponent_float(v) for v in value)
+    return False
+
+
+class _Backend:
+    """``loads`` / ``dumps`` pair producing canonical bytes."""
+
+    name = "stdlib"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data, parse_constant=_reject_constant)
+
+    def dumps(self, value: Any, pretty: bool) -> bytes:
+        if pretty:
+            text = json.dumps(value, sort_keys=True, ensure_ascii=False, allow_nan=False, indent=2) + "\n"
+        else:
+            text = json.dumps(value, sort_keys=True, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+        return text.encode("utf-8")
+
+
+class _OrjsonBackend(_Backend):
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, value: Any, pretty: bool) -> bytes:
+        try:
+            if pretty:
+                data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2 |
+                                    orjson.OPT_APPEND_NEWLINE)
+            else:
+                data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return super().dumps(value, pretty)
+        if _may_have_exponent_float(data) and _has_exponent_float(value):
+            return super().dumps(value, pretty)
+        # orjson writes NaN and infinities as null; only walk the value
+        # when a null shows up at all
+        if b"null" in data and _has_nonfinite(value):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return data
+
+
+BACKENDS: Dict[str, Callable[[], _Backend]] = {"stdlib": _Backend}
+if orjson is not None:
+    BACKENDS["orjson"] = _OrjsonBackend
+
+
+def get_backend(name: Optional[str] = None) -> _Backend:
+    """Backend ``name``, else ``$HANZO_PERSONA_JSON``, else the fastest installed."""
+    name = name or os.environ.get(BACKEND_ENV) or ("orjson" if orjson is not None else "stdlib")
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not available (have {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+backend = get_backend()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return backend.loads(data)
+
+
+def dumps(value: Any, compact: bool = True) -> bytes:
+    """Canonical UTF-8 bytes of ``value``; ``compact=False`` is the pretty layout."""
+    return backend.dumps(value, not compact)
+
+
+def load_file(path: Path) -> Any:
+    """Parse a JSON file (read as bytes, so orjson skips decoding to ``str``)."""
+    with open(path, "rb") as f:
+        return backend.loads(f.read())
+
+
+def dump_file(value: Any, path: Path, compact: bool = False) -> bool:
+    """Write ``value`` canonically; returns False when the file already holds those bytes.
+
+    The file is replaced atomically, so readers never see a partial write.
+    """
+    path = Path(path)
+    data = dumps(value, compact)
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def benchmark(paths: List[Path], rounds: int = 3) -> Dict[str, Dict[str, float]]:
+    """Best-of-``rounds`` parse and dump throughput (MB/s) per backend."""
+    raw = [path.read_bytes() for path in paths]
+    total = sum(len(data) for data in raw)
+    results = {}
+    for name in BACKENDS:
+        engine = get_backend(name)
+        values = [engine.loads(data) for data in raw]
+        timings = {"parse": float("inf"), "pretty": float("inf"), "compact": float("inf")}
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for data in raw:
+                engine.loads(data)
+            timings["parse"] = min(timings["parse"], time.perf_counter() - start)
+            for layout, pretty in (("pretty", True), ("compact", False)):
+                start = time.perf_counter()
+                for value in values:
+                    engine.dumps(value, pretty)
+                timings[layout] = min(timings[layout], time.perf_counter() - start)
+        results[name] = {f"{k}_mb_s": round(total / 1e6 / v, 1) for k, v in timings.items()}
+        results[name]["files"] = len(raw)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .sources import PROFILES_DIR, PROFILE_INDEX_FILES
+
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends on the profiles corpus.")
+    parser.add_argument("--profiles-dir", default=str(PROFILES_DIR))
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    paths = [p for p in sorted(Path(args.profiles_dir).glob("*.json")) if p.name not in PROFILE_INDEX_FILES]
+    print(f"default backend: {backend.name}")
+    print(json.dumps(benchmark(paths, args.rounds), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
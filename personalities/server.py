@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Local persona-serving daemon (stdlib only).
+
+Serves a ``PersonalityLoader`` over HTTP/1.1 on TCP or a Unix socket so
+non-Python services can fetch personas without shelling out:
+
+    GET  /health                      status, corpus version and count
+    GET  /personas                    all keys
+    GET  /personas/<key>              one record
+    GET  /personas?names=a,b          batch, ``{"personas": {...}, "missing": [...]}``
+    POST /batch  {"names": [...]}     same, for long name lists
+    GET  /query?q=<DSL>               ``personalities.query`` DSL; ``category``,
+                                      ``tag``, ``tool``, ``sort``, ``limit``
+                                      parameters are appended to ``q``
+
+Connections are kept alive. Every record is serialized once and its bytes
+cached; batch and query responses are assembled by joining cached bytes.
+ETags are the per-record content hashes from ``loader.snapshot()`` (a
+hash over them for multi-record responses), so ``If-None-Match`` answers
+304 without touching the record; a delta applied to the loader changes
+the hashes and stale cached bytes are re-serialized on next use.
+
+Usage:
+    python -m personalities.server [--host 127.0.0.1] [--port 8765] [--unix PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import serialization
+from .personality_loader import PersonalityLoader
+
+JSON_TYPE = "application/json; charset=utf-8"
+QUERY_PARAMS = ("category", "tag", "tool", "sort", "limit")
+
+
+def _etag(digests: Iterable[str]) -> str:
+    joined = "\0".join(digests).encode("utf-8")
+    return '"' + hashlib.blake2b(joined, digest_size=16).hexdigest() + '"'
+
+
+class PersonaService:
+    """Transport-independent responses with per-record byte caching."""
+
+    def __init__(self, loader: PersonalityLoader):
+        self.loader = loader
+        # Hashing every record also loads them, so request threads never
+        # trigger lazy reads
+        self.snapshot = loader.snapshot()
+        self._bodies: Dict[str, Tuple[str, bytes]] = {}
+
+    def digest(self, key: str) -> Optional[str]:
+        hashes = self.snapshot.records.get(key)
+        return hashes.digest if hashes is not None else None
+
+    def body(self, key: str) -> Optional[bytes]:
+        """Serialized record, reused while its content hash is unchanged."""
+        digest = self.digest(key)
+        if digest is None:
+            return None
+        cached = self._bodies.get(key)
+        if cached is None or cached[0] != digest:
+            record = self.loader.get(key)
+            cached = self._bodies[key] = (digest, serialization.dumps(record))
+        return cached[1]
+
+    def record(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        body = self.body(key)
+        if body is None:
+            return None, None
+        return body, '"' + self.digest(key) + '"'
+
+    def batch(self, names: List[str]) -> Tuple[bytes, str]:
+        names = list(dict.fromkeys(names))
+        found = [n for n in names if self.digest(n) is not None]
+        missing = [n for n in names if self.digest(n) is None]
+        parts = [json.dumps(n, ensure_ascii=False).encode("utf-8") + b":" + self.body(n) for n in found]
+        body = (b'{"personas":{' + b",".join(parts) + b'},"missing":' +
+                json.dumps(missing, ensure_ascii=False).encode("utf-8") + b"}")
+        return body, _etag([self.snapshot.version if missing else ""] + [f"{n}={self.digest(n)}" for n in found])
+
+    def query(self, text: str) -> Tuple[bytes, str]:
+        keys = self.loader.query_keys(text)
+        body = (b'{"keys":' + json.dumps(keys, ensure_ascii=False).encode("utf-8") +
+                b',"personas":[' + b",".join(self.body(k) for k in keys) + b"]}")
+        return body, _etag([text, self.snapshot.version])
+
+    def names(self) -> Tuple[bytes, str]:
+        return json.dumps(self.loader.get_names(), ensure_ascii=False).encode("utf-8"), f'"{self.snapshot.version}"'
+
+    def health(self) -> bytes:
+        return json.dumps({"status": "ok", "version": self.snapshot.version,
+                           "count": len(self.snapshot)}).encode("utf-8")
+
+
+class PersonaRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler over ``server.service``."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "hanzo-persona"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _not_modified(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        for tag in header.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag == etag or tag == "W/" + etag:
+                return True
+        return False
+
+    def _send(self, status: int, body: bytes = b"", etag: Optional[str] = None) -> None:
+        if etag is not None and status == 200 and self._not_modified(etag):
+            status, body = 304, b""
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if status != 304:
+            self.send_header("Content-Type", JSON_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/")
+        try:
+            if path == "/health":
+                self._send(200, service.health())
+            elif path == "/personas" and "names" in params:
+                self._send(200, *service.batch([n for n in params["names"].split(",") if n]))
+            elif path == "/personas":
+                self._send(200, *service.names())
+            elif path.startswith("/personas/"):
+                body, etag = service.record(unquote(path[len("/personas/"):]))
+                if body is None:
+                    self._error(404, "Personality not found")
+                else:
+                    self._send(200, body, etag)
+            elif path == "/query":
+                terms = [params.get("q", "")] + [f"{p}:{params[p]}" for p in QUERY_PARAMS if p in params]
+                self._send(200, *service.query(" ".join(t for t in terms if t)))
+            else:
+                self._error(404, "Unknown endpoint")
+        except ValueError as e:
+            self._error(400, str(e))
+
+    do_HEAD = do_GET
+
+    def do_POST(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body length is unknown, so the connection cannot be reused
+            self.close_connection = True
+            self._error(400, "Invalid Content-Length")
+            return
+        if urlsplit(self.path).path.rstrip("/") != "/batch":
+            self.rfile.read(length)
+            self._error(404, "Unknown endpoint")
+            return
+        try:
+            names = json.loads(self.rfile.read(length) or b"{}").get("names")
+        except (ValueError, AttributeError):
+            names = None
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+            self._error(400, 'Expected {"names": [...]}')
+            return
+        self._send(200, *self.server.service.batch(names))
+
+
+class PersonaHTTPServer(ThreadingHTTPServer):
+    """Threaded TCP server holding a ``PersonaService``."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: PersonaService, verbose: bool = False):
+        self.service = service
+        self.verbose = verbose
+        super().__init__(address, PersonaRequestHandler)
+
+
+class _UnixRequestHandler(PersonaRequestHandler):
+    # TCP_NODELAY is not supported on Unix sockets
+    disable_nagle_algorithm = False
+
+
+class PersonaUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix-socket server holding a ``PersonaService``."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, service: PersonaService, verbose: bool = False):
+        self.service = service
+        self.verbose = verbose
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _UnixRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(loader: Optional[PersonalityLoader] = None, host: str = "127.0.0.1", port: int = 8765,
+                unix_socket: Optional[str] = None, verbose: bool = False) -> socketserver.BaseServer:
+    """Server over ``loader`` (the full corpus by default); call ``serve_forever``."""
+    service = PersonaService(loader or PersonalityLoader.from_corpus())
+    if unix_socket:
+        return PersonaUnixServer(unix_socket, service, verbose)
+    return PersonaHTTPServer((host, port), service, verbose)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve personas over local HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(host=args.host, port=args.port, unix_socket=args.unix, verbose=args.verbose)
+    where = args.unix or "http://%s:%d" % server.server_address[:2]
+    print(f"Serving {len(server.service.snapshot)} personas on {where}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
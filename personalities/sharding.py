@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Consistent-hash sharding of the corpus across serving nodes.
+
+``HashRing`` places each node at ``vnodes`` pseudo-random points on a
+64-bit ring; a persona id belongs to the first node point at or after
+its own hash. Adding a node only claims the arcs in front of its new
+points, so about 1/N of the ids move and every other assignment stays.
+
+``build_shards`` splits the corpus into one pack per node (see
+``personalities.packed``) plus a ``shards.json`` manifest from which the
+ring is rebuilt. ``ShardRouter`` is the client side: it sends ``get`` and
+``get_many`` to the owning nodes through a transport. ``LocalTransport``
+serves each node's pack through its own lazy ``PersonalityLoader`` and
+stands in for the network in tests and single-host setups.
+
+Usage:
+    python -m personalities.sharding build --nodes a,b,c -o shards/
+    python -m personalities.sharding rebalance --nodes a,b,c --add d
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .packed import PackedSource, write_pack
+from .personality_loader import PersonalityLoader, PersonalityNotFoundError
+from .sources import Source, iter_records, profile_sources
+
+SHARDS_FORMAT = "hanzo-persona-shards"
+MANIFEST_FILE = "shards.json"
+DEFAULT_VNODES = 128
+
+
+def ring_hash(value: str) -> int:
+    """Stable 64-bit position of ``value`` on the ring."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self.nodes: List[str] = []
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def _rebuild(self, points: List[Tuple[int, str]]) -> None:
+        points.sort()
+        self._points = [p for p, _ in points]
+        self._owners = [n for _, n in points]
+
+    def add_node(self, node: str) -> None:
+        if node in self.nodes:
+            raise ValueError(f"Node {node!r} is already on the ring")
+        self.nodes.append(node)
+        points = list(zip(self._points, self._owners))
+        points.extend((ring_hash(f"{node}#{i}"), node) for i in range(self.vnodes))
+        self._rebuild(points)
+
+    def remove_node(self, node: str) -> None:
+        self.nodes.remove(node)
+        self._rebuild([(p, n) for p, n in zip(self._points, self._owners) if n != node])
+
+    def node_for(self, key: str) -> str:
+        """Node owning ``key``."""
+        if not self._points:
+            raise ValueError("The ring has no nodes")
+        i = bisect_left(self._points, ring_hash(key))
+        return self._owners[i if i < len(self._points) else 0]
+
+    def assign(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """``node -> keys`` for every node, in key order."""
+        groups: Dict[str, List[str]] = {node: [] for node in self.nodes}
+        for key in keys:
+            groups[self.node_for(key)].append(key)
+        return groups
+
+
+def rebalance_moves(ring: HashRing, keys: Iterable[str], add: Iterable[str] = (),
+                    remove: Iterable[str] = ()) -> Dict[str, Tuple[str, str]]:
+    """``key -> (old node, new node)`` for the keys that change owner."""
+    keys = list(keys)
+    before = {key: ring.node_for(key) for key in keys}
+    after_ring = HashRing(ring.nodes, ring.vnodes)
+    for node in add:
+        after_ring.add_node(node)
+    for node in remove:
+        after_ring.remove_node(node)
+    moves = {}
+    for key in keys:
+        owner = after_ring.node_for(key)
+        if owner != before[key]:
+            moves[key] = (before[key], owner)
+    return moves
+
+
+def build_shards(nodes: List[str], output: Path, sources: Optional[List[Source]] = None,
+                 vnodes: int = DEFAULT_VNODES, codec: Optional[str] = None) -> Dict[str, Any]:
+    """Split records (``profiles/`` by default) into one pack per node.
+
+    Writes ``<node>.hpack`` files and the ``shards.json`` manifest into
+    ``output`` and returns the manifest.
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    ring = HashRing(nodes, vnodes)
+    shards: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {node: [] for node in nodes}
+    for key, record in iter_records(profile_sources() if sources is None else sources):
+        shards[ring.node_for(key)].append((key, record))
+
+    manifest: Dict[str, Any] = {"format": SHARDS_FORMAT, "vnodes": vnodes, "nodes": {}}
+    for node, records in shards.items():
+        pack = f"{node}.hpack"
+        stats = write_pack(records, output / pack, codec=codec)
+        manifest["nodes"][node] = {"pack": pack, "records": stats["records"], "bytes": stats["pack_bytes"]}
+    (output / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def load_manifest(directory: Path) -> Dict[str, Any]:
+    manifest = json.loads((Path(directory) / MANIFEST_FILE).read_text(encoding="utf-8"))
+    if manifest.get("format") != SHARDS_FORMAT:
+        raise ValueError("Not a shard manifest")
+    return manifest
+
+
+class LocalTransport:
+    """In-process stand-in for the network: one lazy loader per node pack."""
+
+    def __init__(self, directory: Path, manifest: Optional[Dict[str, Any]] = None):
+        self.directory = Path(directory)
+        manifest = manifest or load_manifest(self.directory)
+        self.loaders = {
+            node: PersonalityLoader(sources=[PackedSource(self.directory / entry["pack"])], lazy=True)
+            for node, entry in manifest["nodes"].items()
+        }
+        self.requests = 0
+
+    def fetch(self, node: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Records of ``keys`` held by ``node``; unknown keys are left out."""
+        self.requests += 1
+        loader = self.loaders[node]
+        return {key: record for key, record in zip(keys, loader.get_many(keys, strict=False)) if record is not None}
+
+
+class ShardRouter:
+    """Client-side router sending lookups to the owning shard."""
+
+    def __init__(self, ring: HashRing, transport: Any, max_workers: int = 8):
+        self.ring = ring
+        self.transport = transport
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_directory(cls, directory: Path, **kwargs: Any) -> "ShardRouter":
+        """Router over shards written by ``build_shards``, served locally."""
+        manifest = load_manifest(directory)
+        ring = HashRing(manifest["nodes"], manifest["vnodes"])
+        return cls(ring, LocalTransport(directory, manifest), **kwargs)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.transport.fetch(self.ring.node_for(key), [key]).get(key)
+
+    def get_many(self, keys: List[str], strict: bool = True) -> List[Optional[Dict[str, Any]]]:
+        """Records in request order, one request per owning node.
+
+        Unknown ids are reported together in ``PersonalityNotFoundError``;
+        with ``strict=False`` they come back as ``None``.
+        """
+        groups = {node: group for node, group in self.ring.assign(dict.fromkeys(keys)).items() if group}
+        found: Dict[str, Dict[str, Any]] = {}
+        if len(groups) == 1:
+            (node, group), = groups.items()
+            found = self.transport.fetch(node, group)
+        elif groups:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                for result in pool.map(lambda item: self.transport.fetch(*item), groups.items()):
+                    found.update(result)
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and strict:
+            raise PersonalityNotFoundError(missing)
+        return [found.get(key) for key in keys]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shard the corpus across serving nodes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="write per-node packs and the shard manifest")
+    build.add_argument("--nodes", required=True, help="comma-separated node names")
+    build.add_argument("-o", "--output", required=True, help="directory for packs and shards.json")
+    build.add_argument("--vnodes", type=int, default=DEFAULT_VNODES)
+    move = commands.add_parser("rebalance", help="report which records move when nodes change")
+    move.add_argument("--nodes", required=True, help="comma-separated current node names")
+    move.add_argument("--add", default="", help="comma-separated nodes to add")
+    move.add_argument("--remove", default="", help="comma-separated nodes to remove")
+    move.add_argument("--vnodes", type=int, default=DEFAULT_VNODES)
+    args = parser.parse_args(argv)
+
+    nodes = [n for n in args.nodes.split(",") if n]
+    if args.command == "build":
+        manifest = build_shards(nodes, Path(args.output), vnodes=args.vnodes)
+        for node, entry in manifest["nodes"].items():
+            print(f"{node}: {entry['records']} records, {entry['bytes']:,} bytes")
+        return 0
+
+    keys = [key for source in profile_sources() for key in source.keys()]
+    add = [n for n in args.add.split(",") if n]
+    remove = [n for n in args.remove.split(",") if n]
+    moves = rebalance_moves(HashRing(nodes, args.vnodes), keys, add, remove)
+    print(f"{len(moves)} of {len(keys)} records move ({100 * len(moves) / max(len(keys), 1):.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Shared-memory personality corpus for pre-fork multi-process servers.
+
+The parent process packs a loaded corpus into a single
+``multiprocessing.shared_memory`` block; worker processes attach to it
+read-only and decode records on demand, so the corpus is held once per
+box instead of once per worker.
+
+Block layout (little-endian, every section 8-byte aligned)::
+
+    header       magic, version, record count, section offsets
+    ocean        count x 5 float64, NaN where a score is missing
+    key index    (count + 1) uint64 offsets into the key blob
+    key blob     UTF-8 keys, sorted bytewise
+    record index (count + 1) uint64 offsets into the record blob
+    record blob  compact UTF-8 JSON, one document per record
+"""
+
+import json
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .features import ocean_vector
+from .personality_loader import OCEAN_TRAITS, PersonalityLoader
+
+# Environment variable used to hand the block name to forked workers
+SHARED_CORPUS_ENV = "HANZO_PERSONA_SHM"
+
+_MAGIC = b"HPSC"
+_VERSION = 1
+# magic, version, ocean width, record count, then six section offsets
+_HEADER = struct.Struct("<4sHHI6Q")
+_HEADER_SIZE = 64
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the next 8-byte boundary."""
+    return (offset + 7) & ~7
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without registering it for cleanup.
+
+    Before Python 3.13 every process that opens a block registers it with
+    the resource tracker, which unlinks it when that process exits. Only
+    the creating process may own the block, so workers opt out.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def pack_corpus(loader: PersonalityLoader) -> bytes:
+    """Serialize every record of ``loader`` into the shared block layout."""
+    keys = sorted(loader.get_names(), key=lambda k: k.encode("utf-8"))
+    count = len(keys)
+
+    ocean = []
+    key_blob = bytearray()
+    key_index = [0]
+    rec_blob = bytearray()
+    rec_index = [0]
+    for key in keys:
+        record = loader.get(key)
+        ocean.extend(ocean_vector(record))
+        key_blob += key.encode("utf-8")
+        key_index.append(len(key_blob))
+        rec_blob += json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        rec_index.append(len(rec_blob))
+
+    ocean_off = _HEADER_SIZE
+    key_index_off = _align(ocean_off + 8 * len(ocean))
+    key_blob_off = _align(key_index_off + 8 * len(key_index))
+    rec_index_off = _align(key_blob_off + len(key_blob))
+    rec_blob_off = _align(rec_index_off + 8 * len(rec_index))
+    end = rec_blob_off + len(rec_blob)
+
+    buf = bytearray(end)
+    _HEADER.pack_into(
+        buf, 0, _MAGIC, _VERSION, len(OCEAN_TRAITS), count,
+        ocean_off, key_index_off, key_blob_off, rec_index_off, rec_blob_off, end,
+    )
+    struct.pack_into(f"<{len(ocean)}d", buf, ocean_off, *ocean)
+    struct.pack_into(f"<{len(key_index)}Q", buf, key_index_off, *key_index)
+    buf[key_blob_off:key_blob_off + len(key_blob)] = key_blob
+    struct.pack_into(f"<{len(rec_index)}Q", buf, rec_index_off, *rec_index)
+    buf[rec_blob_off:end] = rec_blob
+    return bytes(buf)
+
+
+class SharedCorpus:
+    """Read-only view of a packed corpus living in shared memory.
+
+    Exposes the same read API as ``PersonalityLoader`` (``get``,
+    ``get_all``, ``get_names``, ``filter_by_tags``, ``count``). Attaching
+    only maps the block and reads the header; keys are looked up by binary
+    search over the sorted key table and records are decoded per call.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        """Wrap an opened block; use ``create`` or ``attach`` instead."""
+        self._shm = shm
+        self._owner = owner
+        buf = shm.buf.toreadonly()
+        (magic, version, width, count, ocean_off, key_index_off,
+         key_blob_off, rec_index_off, rec_blob_off, end) = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC or version != _VERSION or width != len(OCEAN_TRAITS):
+            buf.release()
+            raise ValueError(f"Shared memory block {shm.name!r} is not a packed corpus")
+
+        self._count = count
+        self._size = end
+        self._buf = buf
+        self._ocean = buf[ocean_off:ocean_off + 8 * width * count].cast("d")
+        self._key_index = buf[key_index_off:key_index_off + 8 * (count + 1)].cast("Q")
+        self._key_blob = buf[key_blob_off:rec_index_off]
+        self._rec_index = buf[rec_index_off:rec_index_off + 8 * (count + 1)].cast("Q")
+        self._rec_blob = buf[rec_blob_off:end]
+
+    @classmethod
+    def create(cls, loader: PersonalityLoader, name: Optional[str] = None) -> "SharedCorpus":
+        """Pack ``loader`` into a new block owned by the calling process."""
+        data = pack_corpus(loader)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: Optional[str] = None) -> "SharedCorpus":
+        """Attach read-only to a block created by another process.
+
+        ``name`` defaults to the ``HANZO_PERSONA_SHM`` environment variable.
+        """
+        name = name or os.environ.get(SHARED_CORPUS_ENV)
+        if not name:
+            raise ValueError(f"No shared corpus name given and {SHARED_CORPUS_ENV} is not set")
+        return cls(_attach_untracked(name))
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block, for passing to workers."""
+        return self._shm.name
+
+    @property
+    def size(self) -> int:
+        """Bytes occupied by the packed corpus."""
+        return self._size
+
+    @property
+    def ocean_matrix(self) -> memoryview:
+        """Row-major ``count x 5`` float64 view, rows in ``get_names()`` order."""
+        return self._ocean
+
+    def export_env(self) -> None:
+        """Publish the block name so workers forked later can ``attach()``."""
+        os.environ[SHARED_CORPUS_ENV] = self.name
+
+    def _key(self, i: int) -> bytes:
+        return bytes(self._key_blob[self._key_index[i]:self._key_index[i + 1]])
+
+    def _find(self, name: str) -> int:
+        """Binary search the sorted key table; -1 when absent."""
+        target = name.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == target:
+            return lo
+        return -1
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        start, stop = self._rec_index[i], self._rec_index[i + 1]
+        return json.loads(bytes(self._rec_blob[start:stop]))
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            yield self._record(i)
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        """Get all personalities as a list."""
+        return list(self._records())
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get a specific personality by name."""
+        i = self._find(name)
+        return self._record(i) if i >= 0 else None
+
+    def ocean(self, name: str) -> Optional[Tuple[float, ...]]:
+        """OCEAN scores in ``OCEAN_TRAITS`` order, without decoding the record."""
+        i = self._find(name)
+        if i < 0:
+            return None
+        width = len(OCEAN_TRAITS)
+        return tuple(self._ocean[i * width:(i + 1) * width])
+
+    def filter_by_tags(self, tags: List[str]) -> List[Dict[str, Any]]:
+        """Filter personalities by tags."""
+        return [p for p in self._records() if any(tag in p.get('tags', []) for tag in tags)]
+
+    def get_names(self) -> List[str]:
+        """Get all personality names, in packed (bytewise sorted) order."""
+        return [self._key(i).decode("utf-8") for i in range(self._count)]
+
+    def count(self) -> int:
+        """Get total number of personalities."""
+        return self._count
+
+    def close(self) -> None:
+        """Release this process's mapping; the owner also unlinks the block."""
+        if self._buf is None:
+            return
+        for view in (self._ocean, self._key_index, self._key_blob,
+                     self._rec_index, self._rec_blob, self._buf):
+            view.release()
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedCorpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Versioned corpus snapshots and deltas for incremental downstream sync.
+
+A ``Snapshot`` holds a content hash per record and per top-level section
+(``ocean``, ``tools``, ``behavioral_traits``, ...). The corpus version is
+an additive multiset hash of the ``(key, record hash)`` pairs, so it does
+not depend on record order and is updated in O(1) when one record
+changes, is added or removed.
+
+A delta between two snapshots carries only added records, removed keys
+and, for changed records, the sections to set or unset together with the
+record's new hash. Comparing snapshots needs only the hashes; record
+content is fetched just for what changed. ``PersonalityLoader.apply_delta``
+applies a delta in place after checking it starts from the loader's
+version and reproduces the target hashes.
+
+Usage:
+    python -m personalities.snapshots snapshot [-o manifest.json]
+    python -m personalities.snapshots delta OLD_MANIFEST [-o delta.json]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import serialization
+
+SNAPSHOT_FORMAT = "hanzo-persona-snapshot"
+DELTA_FORMAT = "hanzo-persona-delta"
+FORMAT_VERSION = 1
+
+_MODULUS = 1 << 128
+
+
+def canonical_json(value: Any) -> bytes:
+    """Byte-stable serialization used for hashing."""
+    return serialization.dumps(value)
+
+
+def content_hash(value: Any) -> str:
+    """Hex digest of a JSON value's canonical form."""
+    return hashlib.blake2b(canonical_json(value), digest_size=16).hexdigest()
+
+
+def _term(key: str, digest: str) -> int:
+    pair = hashlib.blake2b(f"{key}\0{digest}".encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(pair, "big")
+
+
+class RecordHashes:
+    """Hash of one record and of each of its top-level sections."""
+
+    __slots__ = ("digest", "sections")
+
+    def __init__(self, digest: str, sections: Dict[str, str]):
+        self.digest = digest
+        self.sections = sections
+
+    @classmethod
+    def of(cls, record: Dict[str, Any]) -> "RecordHashes":
+        return cls(content_hash(record), {name: content_hash(value) for name, value in record.items()})
+
+
+class Snapshot:
+    """Per-record hashes plus an order-independent corpus version."""
+
+    def __init__(self):
+        self.records: Dict[str, RecordHashes] = {}
+        self._sum = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Dict[str, Any]]]) -> "Snapshot":
+        snapshot = cls()
+        for key, record in records:
+            snapshot.set(key, RecordHashes.of(record))
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        return f"{self._sum:032x}"
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.records
+
+    def set(self, key: str, hashes: RecordHashes) -> None:
+        """Add or replace one record's hashes, updating the version."""
+        self.remove(key)
+        self.records[key] = hashes
+        self._sum = (self._sum + _term(key, hashes.digest)) % _MODULUS
+
+    def remove(self, key: str) -> None:
+        old = self.records.pop(key, None)
+        if old is not None:
+            self._sum = (self._sum - _term(key, old.digest)) % _MODULUS
+
+    def version_after(self, removed: Iterable[str], updates: Dict[str, RecordHashes]) -> str:
+        """Version the snapshot would have after removing and setting records."""
+        total = self._sum
+        for key in set(removed).union(updates):
+            old = self.records.get(key)
+            if old is not None:
+                total -= _term(key, old.digest)
+        for key, hashes in updates.items():
+            total += _term(key, hashes.digest)
+        return f"{total % _MODULUS:032x}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "version": FORMAT_VERSION,
+            "corpus_version": self.version,
+            "records": {key: {"hash": h.digest, "sections": h.sections} for key, h in self.records.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Snapshot":
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Not a personality snapshot manifest")
+        snapshot = cls()
+        for key, entry in data["records"].items():
+            snapshot.set(key, RecordHashes(entry["hash"], dict(entry["sections"])))
+        if snapshot.version != data["corpus_version"]:
+            raise ValueError("Snapshot manifest is corrupt: record hashes do not match its version")
+        return snapshot
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "Snapshot":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def compare(old: Snapshot, new: Snapshot) -> Tuple[List[str], List[str], List[str]]:
+    """``(added, removed, changed)`` keys, from hashes alone."""
+    if old.version == new.version:
+        return [], [], []
+    added = [key for key in new.records if key not in old.records]
+    removed = [key for key in old.records if key not in new.records]
+    changed = [key for key, h in new.records.items()
+               if key in old.records and old.records[key].digest != h.digest]
+    return added, removed, changed
+
+
+def make_delta(old: Snapshot, new: Snapshot,
+               fetch: Callable[[List[str]], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Delta from ``old`` to ``new``; ``fetch`` is called once for the new
+    content of added and changed records (e.g. ``loader.get_many``)."""
+    added, removed, changed = compare(old, new)
+    content = dict(zip(added + changed, fetch(added + changed))) if added or changed else {}
+    delta_changed = {}
+    for key in changed:
+        before, after = old.records[key].sections, new.records[key].sections
+        delta_changed[key] = {
+            "hash": new.records[key].digest,
+            "set": {name: content[key][name] for name, digest in after.items() if before.get(name) != digest},
+            "unset": [name for name in before if name not in after],
+        }
+    return {
+        "format": DELTA_FORMAT,
+        "version": FORMAT_VERSION,
+        "from": old.version,
+        "to": new.version,
+        "added": {key: content[key] for key in added},
+        "removed": removed,
+        "changed": delta_changed,
+    }
+
+
+def patch_record(record: Dict[str, Any], change: Dict[str, Any]) -> Dict[str, Any]:
+    """New record with a delta's section changes applied (``record`` is untouched)."""
+    patched = {name: value for name, value in record.items() if name not in change["unset"]}
+    patched.update(change["set"])
+    return patched
+
+
+def summarize(delta: Dict[str, Any]) -> str:
+    sections = sum(len(c["set"]) + len(c["unset"]) for c in delta["changed"].values())
+    return (f"{delta['from']} -> {delta['to']}: {len(delta['added'])} added, "
+            f"{len(delta['removed'])} removed, {len(delta['changed'])} changed ({sections} sections)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .personality_loader import PersonalityLoader
+
+    parser = argparse.ArgumentParser(description="Version the corpus and produce deltas between versions.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snap = commands.add_parser("snapshot", help="print the corpus version and optionally write its manifest")
+    snap.add_argument("-o", "--output", help="write the snapshot manifest here")
+    delta = commands.add_parser("delta", help="delta from an older manifest to the current corpus")
+    delta.add_argument("manifest", help="snapshot manifest of the older version")
+    delta.add_argument("-o", "--output", help="write the delta here instead of stdout")
+    args = parser.parse_args(argv)
+
+    loader = PersonalityLoader.from_corpus()
+    current = loader.snapshot()
+    if args.command == "snapshot":
+        if args.output:
+            current.save(Path(args.output))
+        print(current.version)
+        return 0
+
+    result = make_delta(Snapshot.load(Path(args.manifest)), current, loader.get_many)
+    text = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text + "\n")
+    print(summarize(result), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Source readers for the personality corpus.
+
+Records live in three on-disk shapes:
+
+* ``profiles/<id>.json`` - one record per file (``ProfileSource``)
+* ``archive-mega-files/*.json`` - a JSON object whose list values hold
+  records, e.g. ``{"thinkers": [...], "archetypes": {...}}`` (``ArchiveSource``)
+* ``all_personalities.json`` - a bare JSON list of records (``RecordListSource``)
+
+Each source is one backing file. ``keys()`` lists the record keys it
+provides and ``read()`` parses the file once and returns every record.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from . import serialization
+
+PERSONA_DIR = Path(__file__).parent
+PROFILES_DIR = PERSONA_DIR.parent / "profiles"
+ARCHIVE_DIR = PERSONA_DIR / "archive-mega-files"
+
+# Index files kept alongside the per-profile JSON files
+PROFILE_INDEX_FILES = {"index.json", "categories.json"}
+
+
+def record_key(record: Dict[str, Any]) -> str:
+    """Lookup key of a record: its ``id`` when present, else its ``name``."""
+    return record.get('id') or record['name']
+
+
+class Source:
+    """A single file backing one or more personality records."""
+
+    # True when ``keys()`` is answered without parsing the records
+    keys_from_path = False
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+    def read_bytes(self) -> bytes:
+        """Raw contents of the backing file."""
+        return self.path.read_bytes()
+
+    def parse_bytes(self, raw: bytes) -> Any:
+        """Parse raw contents into the form ``records_in`` walks."""
+        return serialization.loads(raw)
+
+    def _parse(self) -> Any:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Personality file not found: {self.path}")
+        return serialization.load_file(self.path)
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(key, record)`` pairs in file order."""
+        return self.records_in(self._parse())
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(key, record)`` pairs from the already parsed file contents."""
+        raise NotImplementedError
+
+    def read(self) -> Dict[str, Dict[str, Any]]:
+        """Parse the file once; the first record wins for repeated keys."""
+        result: Dict[str, Dict[str, Any]] = {}
+        for key, record in self.records():
+            result.setdefault(key, record)
+        return result
+
+    def read_keys(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Records for ``keys``; may return more when the whole file is parsed anyway."""
+        return self.read()
+
+    def keys(self) -> List[str]:
+        """Record keys provided by this file."""
+        return list(self.read())
+
+
+class RecordListSource(Source):
+    """A bare JSON list of records keyed by ``name``."""
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for record in data:
+            yield record['name'], record
+
+
+class ArchiveSource(Source):
+    """A mega file whose top-level list values hold records."""
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        sections = data.values() if isinstance(data, dict) else [data]
+        for section in sections:
+            if not isinstance(section, list):
+                continue
+            for record in section:
+                if isinstance(record, dict) and ('id' in record or 'name' in record):
+                    yield record_key(record), record
+
+
+class ProfileSource(Source):
+    """A single ``profiles/<id>.json`` file; the key is the file stem."""
+
+    keys_from_path = True
+
+    def records_in(self, data: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        yield self.path.stem, data
+
+    def keys(self) -> List[str]:
+        return [self.path.stem]
+
+
+def profile_sources(directory: Path = PROFILES_DIR) -> List[Source]:
+    """One ``ProfileSource`` per profile file, skipping the index files."""
+    return [
+        ProfileSource(path)
+        for path in sorted(Path(directory).glob("*.json"))
+        if path.name not in PROFILE_INDEX_FILES
+    ]
+
+
+def archive_sources(directory: Path = ARCHIVE_DIR) -> List[Source]:
+    """One ``ArchiveSource`` per mega file, ``all_personalities.json`` included."""
+    sources: List[Source] = []
+    for path in sorted(Path(directory).glob("*.json")):
+        if path.name == "all_personalities.json":
+            sources.append(RecordListSource(path))
+        else:
+            sources.append(ArchiveSource(path))
+    return sources
+
+
+def default_sources() -> List[Source]:
+    """Every shipped source, per-profile files taking precedence."""
+    return profile_sources() + archive_sources()
+
+
+def iter_records(sources: Iterable[Source]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream ``(key, record)`` from sources, the first source winning.
+
+    Only one backing file is parsed at a time and nothing is cached, so
+    memory stays bounded by the largest file.
+    """
+    seen = set()
+    for source in sources:
+        for key, record in source.records():
+            if key not in seen:
+                seen.add(key)
+                yield key, record
@@ -5,19 +5,38 @@ Comprehensive Personality Enhancement Script
 This script systematically enhances ALL 613+ personality profiles in the profiles directory
 with detailed behavioral, cognitive, social, emotional, and legacy attributes for accurate AI modeling.
 
+Profiles stream through load -> categorize -> sections -> template ->
+metadata -> write stages. Finished files are appended to a checkpoint
+journal, so an interrupted run continues with --resume.
+
+Usage:
+    python scripts/enhance_all_personalities.py [--dry-run] [--resume] [--journal PATH]
+
 Author: Claude Code
 Created: 2025-09-25
 """
 
 import json
+import logging
 import os
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 import random
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from personalities import serialization
+from personalities.snapshots import content_hash
+
+logger = logging.getLogger("enhance")
+
+PROFILES_DIR = Path(__file__).resolve().parent.parent / "profiles"
+JOURNAL_FILE = ".enhance-journal.jsonl"
+
 
 @dataclass
 class EnhancementStats:
@@ -26,6 +45,7 @@ class EnhancementStats:
     enhanced: int = 0
     errors: int = 0
     skipped: int = 0
+    resumed: int = 0
     categories: Dict[str, int] = None
     
     def __post_init__(self):
@@ -33,13 +53,179 @@ class EnhancementStats:
             self.categories = {}
 
 
+@dataclass
+class StageStats:
+    """Per-stage counters"""
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class PipelineItem:
+    """One profile flowing through the pipeline"""
+    path: Path
+    personality: Optional[Dict] = None
+    category: Optional[str] = None
+    sections: Dict[str, Any] = field(default_factory=dict)
+    status: str = "pending"  # becomes done, skipped or error
+    reason: str = ""
+
+
+class Journal:
+    """Append-only JSONL checkpoint of finished profiles.
+
+    With ``persist=False`` (dry runs) entries are only kept in memory, so
+    a dry run neither touches the disk nor makes a later resume skip
+    profiles it never wrote.
+    """
+
+    def __init__(self, path: Path, resume: bool = False, persist: bool = True):
+        self.path = Path(path)
+        self.finished: Dict[str, str] = {}
+        if resume and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted run
+                    self.finished[entry["file"]] = entry["status"]
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8') if persist else None
+
+    def is_finished(self, path: Path) -> bool:
+        return self.finished.get(path.name) in ("done", "skipped")
+
+    def record(self, item: PipelineItem) -> None:
+        entry = {"file": item.path.name, "status": item.status}
+        if item.reason:
+            entry["reason"] = item.reason
+        if self._file is not None:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+        self.finished[item.path.name] = item.status
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class EnhancementPipeline:
+    """Streaming load -> categorize -> sections -> template -> metadata -> write.
+
+    Each stage is a generator over ``PipelineItem``s, so one profile passes
+    through every stage before the next is loaded. A stage failure marks
+    the item as an error (counted per stage and logged), and the item then
+    bypasses the remaining stages; every finished item is journaled.
+    """
+
+    STAGES = ("load", "categorize", "sections", "template", "metadata", "write")
+
+    def __init__(self, enhancer: "PersonalityEnhancer", journal: Journal, dry_run: bool = False,
+                 compact: bool = False, progress_every: int = 50):
+        self.enhancer = enhancer
+        self.journal = journal
+        self.dry_run = dry_run
+        self.compact = compact
+        self.progress_every = progress_every
+        self.stage_stats = {name: StageStats() for name in self.STAGES}
+
+    def _stage(self, name: str, items: Iterator[PipelineItem]) -> Iterator[PipelineItem]:
+        work = getattr(self, f"_{name}")
+        stats = self.stage_stats[name]
+        for item in items:
+            if item.status == "pending":
+                stats.calls += 1
+                start = time.perf_counter()
+                try:
+                    work(item)
+                except Exception as e:
+                    stats.errors += 1
+                    item.status, item.reason = "error", f"{name}: {type(e).__name__}: {e}"
+                    logger.error("%s failed in %s stage: %s", item.path.name, name, e)
+                stats.seconds += time.perf_counter() - start
+            yield item
+
+    def _load(self, item: PipelineItem) -> None:
+        item.personality = serialization.load_file(item.path)
+        # Skip if not a valid personality (missing required fields)
+        if not item.personality.get("id") or not item.personality.get("name"):
+            item.status, item.reason = "skipped", "missing id or name"
+
+    def _categorize(self, item: PipelineItem) -> None:
+        category = item.personality.get("category", "unknown")
+        categories = self.enhancer.stats.categories
+        categories[category] = categories.get(category, 0) + 1
+        if "behavioral_traits" in item.personality:
+            item.status, item.reason = "skipped", "already enhanced"
+            return
+        item.category = self.enhancer.categorize(item.personality)
+
+    def _sections(self, item: PipelineItem) -> None:
+        item.sections = self.enhancer.generate_sections(item.personality, item.category)
+
+    def _template(self, item: PipelineItem) -> None:
+        item.sections["category_specific"] = self.enhancer.category_template(item.personality, item.category)
+
+    def _metadata(self, item: PipelineItem) -> None:
+        item.sections["enhancement_metadata"] = self.enhancer.metadata(item.personality, item.category)
+
+    def _write(self, item: PipelineItem) -> None:
+        if not self.dry_run:
+            # Canonical bytes, replaced atomically: an interrupted run never
+            # leaves a truncated profile and reruns leave unchanged files alone
+            serialization.dump_file({**item.personality, **item.sections}, item.path, compact=self.compact)
+        item.status = "done"
+
+    def run(self, files: Iterable[Path]) -> EnhancementStats:
+        stats = self.enhancer.stats
+        files = list(files)
+        stats.total_files = len(files)
+        pending = []
+        for path in files:
+            if self.journal.is_finished(path):
+                stats.resumed += 1
+            else:
+                pending.append(path)
+        if stats.resumed:
+            logger.info("Resuming: %d of %d profiles already finished", stats.resumed, len(files))
+
+        items: Iterator[PipelineItem] = (PipelineItem(path) for path in pending)
+        for name in self.STAGES:
+            items = self._stage(name, items)
+        try:
+            for done, item in enumerate(items, 1):
+                if item.status == "done":
+                    stats.enhanced += 1
+                elif item.status == "skipped":
+                    stats.skipped += 1
+                else:
+                    stats.errors += 1
+                self.journal.record(item)
+                if done % self.progress_every == 0:
+                    logger.info("Processed %d/%d profiles", done, len(pending))
+        finally:
+            self.journal.close()
+        return stats
+
+    def stage_report(self) -> str:
+        """Per-stage calls, errors and timing as a text table"""
+        lines = [f"{'stage':<12}{'calls':>8}{'errors':>8}{'total ms':>11}{'avg us':>9}"]
+        for name, st in self.stage_stats.items():
+            avg = st.seconds / st.calls * 1e6 if st.calls else 0.0
+            lines.append(f"{name:<12}{st.calls:>8}{st.errors:>8}{st.seconds * 1000:>11.1f}{avg:>9.1f}")
+        return "\n".join(lines)
+
+
 class PersonalityEnhancer:
     """Comprehensive personality enhancement engine"""
     
-    def __init__(self, profiles_dir: str = "/Users/z/work/hanzo/build/persona/profiles"):
+    def __init__(self, profiles_dir: str = str(PROFILES_DIR)):
         self.profiles_dir = Path(profiles_dir)
         self.categories_file = self.profiles_dir / "categories.json"
         self.stats = EnhancementStats()
+        self.pipeline: Optional[EnhancementPipeline] = None
+        self._category_index: Optional[Dict[str, str]] = None
         
         # Load category mappings
         self.categories = self._load_categories()
@@ -71,20 +257,11 @@ class PersonalityEnhancer:
     def _load_categories(self) -> Dict[str, List[Dict]]:
         """Load category mappings from categories.json"""
         try:
-            with open(self.categories_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return serialization.load_file(self.categories_file)
         except FileNotFoundError:
-            print(f"Warning: Categories file not found at {self.categories_file}")
+            logger.warning("Categories file not found at %s", self.categories_file)
             return {}
     
-    def _get_category_for_personality(self, personality_id: str) -> Optional[str]:
-        """Find category for a given personality ID"""
-        for category, personalities in self.categories.items():
-            for person in personalities:
-                if person.get("id") == personality_id:
-                    return category
-        return None
-    
     def _generate_behavioral_traits(self, category: str, ocean: Dict, name: str) -> Dict:
         """Generate behavioral traits based on category and OCEAN scores"""
         openness = ocean.get("openness", 50)
@@ -163,13 +340,13 @@ class PersonalityEnhancer:
             locals()[key].extend(values)
         
         return {
-            "core_values": list(set(core_values))[:5],  # Limit to 5
-            "primary_motivations": list(set(primary_motivations))[:4],
-            "fears": list(set(fears))[:4],
-            "strengths": list(set(strengths))[:5],
-            "weaknesses": list(set(weaknesses))[:3],
-            "habits": list(set(habits))[:4],
-            "quirks": list(set(quirks))[:3]
+            "core_values": list(dict.fromkeys(core_values))[:5],  # Limit to 5
+            "primary_motivations": list(dict.fromkeys(primary_motivations))[:4],
+            "fears": list(dict.fromkeys(fears))[:4],
+            "strengths": list(dict.fromkeys(strengths))[:5],
+            "weaknesses": list(dict.fromkeys(weaknesses))[:3],
+            "habits": list(dict.fromkeys(habits))[:4],
+            "quirks": list(dict.fromkeys(quirks))[:3]
         }
     
     def _get_category_specific_traits(self, category: str, name: str) -> Dict[str, List[str]]:
@@ -658,105 +835,84 @@ class PersonalityEnhancer:
             "legacy_building": "knowledge_advancement"
         }
     
+    def categorize(self, personality: Dict) -> str:
+        """Category of a personality: its own field, else categories.json, else default"""
+        if self._category_index is None:
+            self._category_index = {}
+            for category, people in self.categories.items():
+                for person in people:
+                    self._category_index.setdefault(person.get("id"), category)
+        category = personality.get("category") or self._category_index.get(personality.get("id", "unknown"))
+        return category or "default"
+
+    def generate_sections(self, personality: Dict, category: str) -> Dict:
+        """The seven OCEAN- and category-driven sections"""
+        name = personality.get("name", "Unknown")
+        ocean = personality.get("ocean", {})
+        linguistic_profile = personality.get("linguistic_profile", {})
+        contributions = personality.get("contributions", [])
+        return {
+            "behavioral_traits": self._generate_behavioral_traits(category, ocean, name),
+            "cognitive_style": self._generate_cognitive_style(category, ocean),
+            "social_dynamics": self._generate_social_dynamics(category, ocean),
+            "communication_patterns": self._generate_communication_patterns(category, ocean, linguistic_profile),
+            "work_methodology": self._generate_work_methodology(category, ocean),
+            "emotional_profile": self._generate_emotional_profile(category, ocean),
+            "legacy_impact": self._generate_legacy_impact(category, contributions, name)
+        }
+
+    def category_template(self, personality: Dict, category: str) -> Dict:
+        """Category-specific section from the template table"""
+        template_func = self.enhancement_templates.get(category, self.enhancement_templates["default"])
+        return template_func(personality)
+
+    def metadata(self, personality: Dict, category: str) -> Dict:
+        """Enhancement metadata section.
+
+        Derived from the input alone (no timestamp), so enhancing the same
+        record twice gives identical output.
+        """
+        return {
+            "source_hash": content_hash(personality),
+            "enhancement_version": "1.0",
+            "category_used": category,
+            "ocean_based": bool(personality.get("ocean", {})),
+            "linguistic_based": bool(personality.get("linguistic_profile", {}))
+        }
+
     def enhance_personality(self, personality: Dict) -> Dict:
-        """Enhance a single personality with comprehensive attributes"""
-        try:
-            # Skip if already enhanced (check for behavioral_traits)
-            if "behavioral_traits" in personality:
-                return personality
-            
-            personality_id = personality.get("id", "unknown")
-            name = personality.get("name", "Unknown")
-            category = personality.get("category") or self._get_category_for_personality(personality_id)
-            
-            if not category:
-                category = "default"
-            
-            ocean = personality.get("ocean", {})
-            linguistic_profile = personality.get("linguistic_profile", {})
-            contributions = personality.get("contributions", [])
-            
-            # Generate enhanced fields
-            enhanced_fields = {
-                "behavioral_traits": self._generate_behavioral_traits(category, ocean, name),
-                "cognitive_style": self._generate_cognitive_style(category, ocean),
-                "social_dynamics": self._generate_social_dynamics(category, ocean),
-                "communication_patterns": self._generate_communication_patterns(category, ocean, linguistic_profile),
-                "work_methodology": self._generate_work_methodology(category, ocean),
-                "emotional_profile": self._generate_emotional_profile(category, ocean),
-                "legacy_impact": self._generate_legacy_impact(category, contributions, name)
-            }
-            
-            # Add category-specific template
-            template_func = self.enhancement_templates.get(category, self.enhancement_templates["default"])
-            category_specific = template_func(personality)
-            enhanced_fields["category_specific"] = category_specific
-            
-            # Add metadata
-            enhanced_fields["enhancement_metadata"] = {
-                "enhanced_date": datetime.now().isoformat(),
-                "enhancement_version": "1.0",
-                "category_used": category,
-                "ocean_based": bool(ocean),
-                "linguistic_based": bool(linguistic_profile)
-            }
-            
-            # Merge with original personality
-            enhanced_personality = {**personality, **enhanced_fields}
-            
-            return enhanced_personality
-            
-        except Exception as e:
-            print(f"Error enhancing personality {personality.get('id', 'unknown')}: {e}")
+        """Enhance a single personality with comprehensive attributes.
+
+        Runs the categorize, sections, template and metadata stages in
+        memory; errors propagate to the caller.
+        """
+        # Skip if already enhanced (check for behavioral_traits)
+        if "behavioral_traits" in personality:
             return personality
-    
-    def process_all_profiles(self, dry_run: bool = False) -> EnhancementStats:
-        """Process all personality profiles in the directory"""
-        print("Starting comprehensive personality enhancement...")
-        print(f"Profiles directory: {self.profiles_dir}")
-        print(f"Dry run mode: {dry_run}")
-        print("-" * 60)
-        
-        # Get all JSON files except categories.json and index.json
-        json_files = [f for f in self.profiles_dir.glob("*.json") 
-                     if f.name not in ["categories.json", "index.json"]]
-        
-        self.stats.total_files = len(json_files)
-        
-        for json_file in json_files:
-            try:
-                # Load personality
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    personality = json.load(f)
-                
-                # Skip if not a valid personality (missing required fields)
-                if not personality.get("id") or not personality.get("name"):
-                    self.stats.skipped += 1
-                    continue
-                
-                # Track category
-                category = personality.get("category", "unknown")
-                self.stats.categories[category] = self.stats.categories.get(category, 0) + 1
-                
-                # Enhance personality
-                enhanced = self.enhance_personality(personality)
-                
-                # Save enhanced version (unless dry run)
-                if not dry_run:
-                    with open(json_file, 'w', encoding='utf-8') as f:
-                        json.dump(enhanced, f, indent=2, ensure_ascii=False)
-                
-                self.stats.enhanced += 1
-                
-                # Progress indicator
-                if self.stats.enhanced % 50 == 0:
-                    print(f"Enhanced {self.stats.enhanced}/{self.stats.total_files} profiles...")
-                
-            except Exception as e:
-                print(f"Error processing {json_file.name}: {e}")
-                self.stats.errors += 1
-                continue
-        
+        category = self.categorize(personality)
+        enhanced_fields = self.generate_sections(personality, category)
+        enhanced_fields["category_specific"] = self.category_template(personality, category)
+        enhanced_fields["enhancement_metadata"] = self.metadata(personality, category)
+        return {**personality, **enhanced_fields}
+
+    def profile_files(self) -> List[Path]:
+        """Profile files to enhance, excluding the index files"""
+        return sorted(f for f in self.profiles_dir.glob("*.json")
+                      if f.name not in ["categories.json", "index.json"])
+
+    def process_all_profiles(self, dry_run: bool = False, resume: bool = False,
+                             journal: Optional[Path] = None, compact: bool = False) -> EnhancementStats:
+        """Enhance every profile through the staged pipeline.
+
+        With ``resume=True`` files recorded as done or skipped in the
+        checkpoint journal are not processed again; failed files are
+        retried. ``compact=True`` writes profiles without whitespace.
+        """
+        journal = journal or self.profiles_dir / JOURNAL_FILE
+        pipeline = EnhancementPipeline(self, Journal(journal, resume, persist=not dry_run), dry_run=dry_run, compact=compact)
+        logger.info("Enhancing profiles in %s (dry run: %s, resume: %s)", self.profiles_dir, dry_run, resume)
+        pipeline.run(self.profile_files())
+        self.pipeline = pipeline
         return self.stats
     
     def generate_summary_report(self) -> str:
@@ -878,49 +1034,50 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Enhance personality profiles with comprehensive attributes")
-    parser.add_argument("--profiles-dir", default="/Users/z/work/hanzo/build/persona/profiles",
+    parser.add_argument("--profiles-dir", default=str(PROFILES_DIR),
                        help="Directory containing personality profiles")
     parser.add_argument("--dry-run", action="store_true",
                        help="Process files without saving changes")
     parser.add_argument("--report-only", action="store_true", 
                        help="Generate report without processing")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip profiles the checkpoint journal records as finished")
+    parser.add_argument("--journal", help=f"Checkpoint journal (default: <profiles-dir>/{JOURNAL_FILE})")
+    parser.add_argument("--compact", action="store_true",
+                       help="Write profiles as compact canonical JSON instead of indented")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s")
     
     try:
         enhancer = PersonalityEnhancer(args.profiles_dir)
         
         if not args.report_only:
-            stats = enhancer.process_all_profiles(dry_run=args.dry_run)
-            
-            print("\n" + "="*60)
-            print("Enhancement Complete!")
-            print("="*60)
-            print(f"Total files: {stats.total_files}")
-            print(f"Enhanced: {stats.enhanced}")
-            print(f"Errors: {stats.errors}")
-            print(f"Skipped: {stats.skipped}")
-            print(f"Success rate: {(stats.enhanced / stats.total_files * 100):.1f}%")
+            stats = enhancer.process_all_profiles(dry_run=args.dry_run, resume=args.resume,
+                                                  journal=Path(args.journal) if args.journal else None,
+                                                  compact=args.compact)
+            logger.info("Enhancement complete: %d files, %d enhanced, %d skipped, %d errors, %d already finished",
+                        stats.total_files, stats.enhanced, stats.skipped, stats.errors, stats.resumed)
+            logger.info("%s", enhancer.pipeline.stage_report())
             
             # Generate and save report
             report = enhancer.generate_summary_report()
             report_file = Path(args.profiles_dir) / "enhancement_summary.md"
             with open(report_file, 'w', encoding='utf-8') as f:
                 f.write(report)
-            print(f"\nDetailed report saved to: {report_file}")
+            logger.info("Detailed report saved to: %s", report_file)
+            if stats.errors:
+                sys.exit(1)
         
         else:
-            print("Report-only mode: generating summary without processing files")
             report = enhancer.generate_summary_report()
             print(report)
     
     except KeyboardInterrupt:
-        print("\nProcess interrupted by user")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Fatal error: {e}")
-        sys.exit(1)
+        logger.error("Process interrupted by user; rerun with --resume to continue")
+        sys.exit(130)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load test for the persona-serving daemon.
+
+Runs keep-alive clients against ``python -m personalities.server`` (or an
+in-process server when no --url is given) and reports requests/sec and
+latency percentiles for single GETs, conditional GETs and batch requests.
+
+Usage:
+    python scripts/loadtest_server.py [--url http://127.0.0.1:8765] [--clients 8] [--requests 2000]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    """``fraction`` percentile of ``samples``, or None when there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def run_client(host: str, port: int, paths: List[Tuple[str, Dict[str, str]]],
+               latencies: List[float], errors: List[str]) -> None:
+    connection = http.client.HTTPConnection(host, port)
+    for path, headers in paths:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status not in (200, 304):
+                errors.append(f"{path}: {response.status}")
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(f"{path}: {e}")
+            connection.close()
+            connection = http.client.HTTPConnection(host, port)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def scenario(host: str, port: int, mode: str, names: List[str], etags: Dict[str, str],
+             clients: int, requests: int) -> Dict[str, float]:
+    rng = random.Random(7)
+    per_client = []
+    for _ in range(clients):
+        paths = []
+        for _ in range(requests // clients):
+            if mode == "batch":
+                paths.append(("/personas?names=" + quote(",".join(rng.sample(names, 20))), {}))
+            else:
+                name = rng.choice(names)
+                headers = {"If-None-Match": etags[name]} if mode == "conditional" else {}
+                paths.append((f"/personas/{quote(name)}", headers))
+        per_client.append(paths)
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    threads = [threading.Thread(target=run_client, args=(host, port, paths, latencies, errors))
+               for paths in per_client]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": _ms(percentile(latencies, 0.50)),
+        "p99_ms": _ms(percentile(latencies, 0.99)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the persona server.")
+    parser.add_argument("--url", help="server to test; default starts one in-process")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        from personalities.server import make_server
+
+        server = make_server(port=0)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    connection = http.client.HTTPConnection(host, port)
+    connection.request("GET", "/personas")
+    names = json.loads(connection.getresponse().read())
+    etags = {}
+    for name in names:
+        connection.request("HEAD", f"/personas/{quote(name)}")
+        response = connection.getresponse()
+        response.read()
+        etags[name] = response.getheader("ETag")
+    connection.close()
+
+    print(f"{len(names)} personas, {args.clients} clients, {args.requests} requests per scenario")
+    print(f"{'scenario':<12} {'rps':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode in ("get", "conditional", "batch"):
+        result = scenario(host, port, mode, names, etags, args.clients, args.requests)
+        p50, p99 = ("-" if result[k] is None else result[k] for k in ("p50_ms", "p99_ms"))
+        print(f"{mode:<12} {result['rps']:>10} {p50:>9} {p99:>9} {result['errors']:>7}")
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test persona activation bundles and switch diffs."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader, PersonalityNotFoundError
+from personalities.activation import compile_bundle
+from personalities.snapshots import make_delta
+
+RECORDS = [
+    {"name": "linus", "programmer": "Linus Torvalds", "environment": {"CI": "true", "KERNEL": "6.1"},
+     "tools": {"essential": ["git", "bash"], "preferred": ["critic"], "domains": ["systems"]}},
+    {"name": "guido", "programmer": "Guido van Rossum", "environment": {"CI": "true", "PYTHON": 3},
+     "tools": ["python", "bash", "pytest"]},
+    {"name": "ada", "programmer": "Ada Lovelace"},
+]
+
+
+@pytest.fixture
+def loader(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps(RECORDS))
+    unix = tmp_path / "unix_tools.yaml"
+    unix.write_text("unix_cli_preferences:\n  torvalds:\n    essential_tools: [gdb, git]\n"
+                    "    shell: bash\n    editor: vim\n  kernighan:\n    essential_tools: [awk]\n")
+    loader = PersonalityLoader(data)
+    loader.activator().unix_tools = unix
+    return loader
+
+
+def test_bundle_is_frozen_and_cached(loader):
+    bundle = loader.activate("linus")
+    assert bundle.env == {"CI": "true", "KERNEL": "6.1"}
+    assert bundle.tools == ("git", "bash", "critic", "gdb")
+    assert (bundle.shell, bundle.editor) == ("bash", "vim")
+    assert loader.activate("linus") is bundle
+    with pytest.raises(TypeError):
+        bundle.env["CI"] = "false"
+    assert compile_bundle("guido", RECORDS[1]).env["PYTHON"] == "3"
+    with pytest.raises(PersonalityNotFoundError):
+        loader.activate("nobody")
+
+
+def test_diff_is_a_minimal_patch(loader):
+    diff = loader.activation_diff("linus", "guido")
+    assert dict(diff.set_env) == {"PYTHON": "3"}
+    assert diff.unset_env == ("KERNEL",)
+    assert diff.add_tools == ("python", "pytest")
+    assert diff.remove_tools == ("git", "critic", "gdb")
+    assert dict(diff.settings) == {"shell": None, "editor": None}
+    assert loader.activation_diff("linus", "guido") is diff
+    assert not loader.activation_diff("ada", "ada")
+
+    env, tools = dict(loader.activate("linus").env), set(loader.activate("linus").tools)
+    diff.apply(env, tools)
+    assert env == dict(loader.activate("guido").env)
+    assert tools == set(loader.activate("guido").tools)
+
+
+def test_persona_added_by_delta_gets_unix_preferences(loader, tmp_path):
+    assert loader.activate("linus").tools[-1] == "gdb"
+    newer = tmp_path / "newer.json"
+    newer.write_text(json.dumps(RECORDS + [{"name": "bwk", "programmer": "Brian Kernighan"}]))
+    target = PersonalityLoader(newer)
+    loader.apply_delta(make_delta(loader.snapshot(), target.snapshot(), target.get_many))
+    assert loader.activate("bwk").tools == ("awk",)
+
+
+def test_delta_moving_a_preference_recompiles_its_old_owner(loader, tmp_path):
+    assert loader.activate("linus").tools[-1] == "gdb"
+    assert loader.activation_diff("ada", "linus").add_tools[-1] == "gdb"
+    newer = tmp_path / "newer.json"
+    newer.write_text(json.dumps(RECORDS + [{"name": "torvalds", "programmer": "Torvalds"}]))
+    target = PersonalityLoader(newer)
+    loader.apply_delta(make_delta(loader.snapshot(), target.snapshot(), target.get_many))
+    assert loader.activate("torvalds").tools == ("gdb", "git")
+    assert loader.activate("linus").tools == ("git", "bash", "critic")
+    assert loader.activate("linus").shell is None
+    assert "gdb" not in loader.activation_diff("ada", "linus").add_tools
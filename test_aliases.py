@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Test alias and fuzzy name resolution."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities.aliases import AliasIndex, normalize
+
+RECORDS = [
+    ("kant", {"id": "kant", "name": "Immanuel Kant"}),
+    ("kant_behavioral", {"id": "kant_behavioral", "name": "Immanuel Kant"}),
+    ("antonin_dvorak", {"name": "Antonín Dvořák"}),
+    ("linus", {"name": "linus", "programmer": "Linus Torvalds"}),
+    ("daniel_kahneman", {"id": "daniel_kahneman", "name": "Daniel Kahneman"}),
+]
+
+
+def _keys(matches):
+    return [m.key for m in matches]
+
+
+def test_normalize_folds_accents_and_punctuation():
+    assert normalize("  Antonín  Dvořák ") == "antonin dvorak"
+    assert normalize("I. Kant") == "i kant"
+
+
+def test_exact_aliases():
+    index = AliasIndex.from_records(RECORDS)
+    assert _keys(index.resolve("kant")) == ["kant", "kant_behavioral"]
+    assert index.resolve("kant")[0].score == 1.0
+    assert _keys(index.resolve("Immanuel Kant", k=1)) == ["kant"]
+    assert _keys(index.resolve("I. Kant")) == ["kant", "kant_behavioral"]
+    assert _keys(index.resolve("dvorak")) == ["antonin_dvorak"]
+    assert _keys(index.resolve("Linus Torvalds")) == ["linus"]
+
+
+def test_fuzzy_matches_partial_and_misspelled_input():
+    index = AliasIndex.from_records(RECORDS)
+    assert _keys(index.resolve("kan", k=2)) == ["kant", "kant_behavioral"]
+    assert _keys(index.resolve("torvald", k=1)) == ["linus"]
+    assert _keys(index.resolve("kahnemann", k=1)) == ["daniel_kahneman"]
+    assert all(m.score < 1.0 for m in index.fuzzy("dvorack"))
+    assert index.resolve("zzzz") == []
+
+
+def test_loader_resolve(tmp_path):
+    from personalities import PersonalityLoader
+
+    data = tmp_path / "personas.json"
+    data.write_text('[{"name": "linus", "programmer": "Linus Torvalds"}, {"name": "guido"}]')
+    loader = PersonalityLoader(data)
+    assert _keys(loader.resolve("torvalds", k=1)) == ["linus"]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test the corpus psychometric analytics engine."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities.analytics import CorpusAnalytics, render_report
+from personalities.features import CorpusFeatures
+
+
+def _record(category, o, c, e, a, n, values=("wisdom",), thinking="analytical"):
+    return {
+        "category": category,
+        "ocean": {"openness": o, "conscientiousness": c, "extraversion": e,
+                  "agreeableness": a, "neuroticism": n},
+        "behavioral_traits": {"core_values": list(values)},
+        "cognitive_style": {"thinking_pattern": thinking},
+    }
+
+
+RECORDS = {
+    "kant": _record("philosopher", 85, 100, 20, 50, 60),
+    "hume": _record("philosopher", 90, 70, 60, 80, 30, values=("wisdom", "curiosity")),
+    "curie": _record("scientist", 95, 95, 30, 60, 40, thinking="empirical"),
+    "tesla": _record("scientist", 99, 60, 20, 40, 80, values=("novelty",)),
+    "ada": {"category": "pioneer", "ocean": {"openness": 95}},
+}
+
+
+def test_category_centroids_and_frequencies():
+    analytics = CorpusAnalytics(CorpusFeatures.from_records(RECORDS.items()))
+    stats = analytics.category_stats()
+
+    assert stats["philosopher"]["count"] == 2
+    assert stats["philosopher"]["centroid"]["conscientiousness"] == 85.0
+    assert stats["philosopher"]["variance"]["conscientiousness"] == 225.0
+    assert stats["pioneer"]["centroid"]["extraversion"] is None
+    assert analytics.complete_profiles == 4
+
+    assert analytics.trait_frequencies() == {"core_values:wisdom": 3, "core_values:curiosity": 1,
+                                             "core_values:novelty": 1}
+    assert analytics.enum_frequencies() == {
+        "cognitive_style.thinking_pattern": {"analytical": 3, "empirical": 1},
+    }
+    matrix = analytics.correlation_matrix()
+    assert matrix[0][0] == pytest.approx(1.0)
+    assert matrix[1][4] == pytest.approx(matrix[4][1])
+    assert "| philosopher | 2 |" in render_report(analytics)
+
+
+def test_incremental_update_matches_rebuild():
+    analytics = CorpusAnalytics(CorpusFeatures.from_records(RECORDS.items()))
+    changed = {"hume": _record("scientist", 70, 50, 90, 20, 10, thinking="empirical"),
+               "turing": _record("pioneer", 90, 80, 25, 45, 60)}
+    analytics.update(changed)
+    analytics.remove(["ada", "missing"])
+
+    expected = dict(RECORDS, **changed)
+    del expected["ada"]
+    rebuilt = CorpusAnalytics(CorpusFeatures.from_records(expected.items()))
+
+    assert analytics.category_stats() == rebuilt.category_stats()
+    assert analytics.enum_frequencies() == rebuilt.enum_frequencies()
+    assert analytics.trait_frequencies() == rebuilt.trait_frequencies()
+    for got, want in zip(analytics.correlation_matrix(), rebuilt.correlation_matrix()):
+        assert got == pytest.approx(want)
+
+
+def test_outliers_flag_extreme_scores():
+    records = {f"p{i}": _record("poet", 90, 80, 50, 70, 40 + i % 3) for i in range(20)}
+    records["odd"] = _record("poet", 90, 80, 50, 70, 99)
+    analytics = CorpusAnalytics(CorpusFeatures.from_records(records.items()))
+    outliers = analytics.outliers()
+    assert [o["id"] for o in outliers] == ["odd"]
+    assert list(outliers[0]["z_scores"]) == ["neuroticism"]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test archetype clustering and the loader's cluster lookups."""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.clustering import FULL_KMEANS_LIMIT, ClusterIndex, choose_method, cluster_features
+from personalities.features import CorpusFeatures
+
+TRAITS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+
+
+def _blobs(per_blob=30, seed=3):
+    """Three well separated OCEAN blobs."""
+    rng = random.Random(seed)
+    centers = {"calm": (20, 80, 20, 80, 10), "wild": (95, 20, 90, 30, 80), "mid": (55, 50, 50, 50, 50)}
+    records = []
+    for name, center in centers.items():
+        for i in range(per_blob):
+            ocean = {t: c + rng.uniform(-4, 4) for t, c in zip(TRAITS, center)}
+            records.append((f"{name}_{i}", {"name": f"{name}_{i}", "ocean": ocean}))
+    return records
+
+
+@pytest.mark.parametrize("method", ["kmeans", "minibatch", "hierarchical"])
+def test_clusters_recover_blobs(method):
+    features = CorpusFeatures.from_records(_blobs())
+    result = cluster_features(features, k=3, method=method, seed=7)
+
+    groups = {}
+    for key, label in zip(result.keys, result.labels):
+        groups.setdefault(key.split("_")[0], set()).add(label)
+    assert all(len(labels) == 1 for labels in groups.values())
+    assert len({labels.pop() for labels in groups.values()}) == 3
+    assert result.silhouette > 0.7
+
+
+def test_auto_method_switches_to_minibatch_at_scale():
+    assert cluster_features(CorpusFeatures.from_records(_blobs()), k=3).method == "kmeans"
+    assert choose_method(FULL_KMEANS_LIMIT) == "kmeans"
+    assert choose_method(FULL_KMEANS_LIMIT + 1) == "minibatch"
+
+
+def test_clustering_is_deterministic():
+    features = CorpusFeatures.from_records(_blobs())
+    first = cluster_features(features, k=4, method="minibatch", seed=11)
+    second = cluster_features(features, k=4, method="minibatch", seed=11)
+    assert first.labels == second.labels
+    assert first.centroids == second.centroids
+
+
+def test_loader_serves_sidecar_index(tmp_path):
+    records = _blobs(per_blob=5)
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps([record for _, record in records]))
+    features = CorpusFeatures.from_records(records)
+    sidecar = tmp_path / "clusters.json"
+    cluster_features(features, k=3, seed=1).to_index().save(sidecar)
+
+    loader = PersonalityLoader(data, cluster_index=sidecar)
+    cluster = loader.cluster_of("wild_0")
+    assert loader.members(cluster) == [f"wild_{i}" for i in range(5)]
+    assert loader.cluster_of("nobody") is None
+    assert ClusterIndex.load(sidecar).meta["k"] == 3
+
+    with pytest.raises(ValueError):
+        PersonalityLoader(data).cluster_of("wild_0")
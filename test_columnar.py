@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test the columnar corpus export."""
+
+import json
+import math
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities.columnar import ColumnTable, decode_strings, read_npz, write_npz
+from personalities.sources import ArchiveSource, ProfileSource
+
+RECORDS = [
+    ("kant", {"name": "Immanuel Kant", "category": "philosopher", "ocean": {"openness": 90},
+              "tags": ["ethics", "reason"]}),
+    ("hume", {"name": "David Hume", "tools": {"essential": ["pen"]},
+              "cognitive_style": {"thinking_pattern": "empirical"}}),
+    ("mill", {"name": "J. S. Mill", "category": "philosopher", "tags": ["ethics"],
+              "cognitive_style": {"thinking_pattern": "analytical"}}),
+]
+
+
+def test_npz_roundtrip_preserves_columns(tmp_path):
+    path = tmp_path / "corpus.npz"
+    write_npz(ColumnTable.from_records(RECORDS), path)
+    arrays = read_npz(path)
+
+    schema = json.loads(bytes(arrays["__schema__"]))
+    assert schema["ocean.openness"] == "float64" and schema["tags"] == "list"
+    assert schema["cognitive_style.thinking_pattern"] == "enum"
+    assert decode_strings(arrays, "key") == ["kant", "hume", "mill"]
+    assert decode_strings(arrays, "name")[2] == "J. S. Mill"
+
+    openness = arrays["ocean.openness"]
+    assert openness[0] == 90 and math.isnan(openness[1])
+    assert list(arrays["category.codes"]) == [0, -1, 0]
+    # First seen on the second row: the first row is padded as missing
+    assert list(arrays["cognitive_style.thinking_pattern.codes"]) == [-1, 0, 1]
+    assert list(arrays["tags.offsets"]) == [0, 2, 2, 3]
+    tags = decode_strings(arrays, "tags.dictionary")
+    assert [tags[c] for c in arrays["tags.codes"]] == ["ethics", "reason", "ethics"]
+    assert decode_strings(arrays, "tools.dictionary") == ["pen"]
+
+
+def test_npy_entries_are_aligned_numpy_arrays(tmp_path):
+    path = tmp_path / "corpus.npz"
+    write_npz(ColumnTable.from_records(RECORDS), path)
+    with zipfile.ZipFile(path) as archive:
+        raw = archive.read("ocean.openness.npy")
+    header_len = int.from_bytes(raw[8:10], "little")
+    assert raw[:8] == b"\x93NUMPY\x01\x00"
+    assert (10 + header_len) % 64 == 0
+    assert b"'descr': '<f8'" in raw[10:10 + header_len] and b"(3,)" in raw[10:10 + header_len]
+
+
+def test_streams_sources_first_source_wins(tmp_path):
+    (tmp_path / "kant.json").write_text(json.dumps({"id": "kant", "name": "Profile Kant"}))
+    archive = tmp_path / "archive.json"
+    archive.write_text(json.dumps({"thinkers": [{"id": "kant", "name": "Archive Kant"},
+                                                {"id": "locke", "name": "John Locke"}]}))
+    table = ColumnTable.from_sources([ProfileSource(tmp_path / "kant.json"), ArchiveSource(archive)])
+    arrays = {f"name.{part}": v for part, v in zip(("offsets", "data"), table.strings["name"])}
+    assert decode_strings(arrays, "name") == ["Profile Kant", "John Locke"]
+
+
+def test_arrow_roundtrip_of_masked_and_list_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    from personalities.columnar import export, to_arrow
+
+    table = to_arrow(ColumnTable.from_records(RECORDS))
+    assert table.num_rows == 3
+    assert table.column("ocean.openness").to_pylist() == [90.0, None, None]
+    assert table.column("category").to_pylist() == ["philosopher", None, "philosopher"]
+    assert table.column("cognitive_style.thinking_pattern").to_pylist() == [None, "empirical", "analytical"]
+    assert table.column("tags").to_pylist() == [["ethics", "reason"], [], ["ethics"]]
+    assert table.column("tools").to_pylist() == [[], ["pen"], []]
+    assert table.column("name").to_pylist()[2] == "J. S. Mill"
+
+    path = tmp_path / "corpus.parquet"
+    export(ColumnTable.from_records(RECORDS), path)
+    restored = pq.read_table(path)
+    assert restored.column("tags").to_pylist() == table.column("tags").to_pylist()
+    assert restored.column("ocean.openness").to_pylist() == [90.0, None, None]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test the staged enhancement pipeline and its checkpoint journal."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent / "scripts" / "enhance_all_personalities.py"
+
+
+@pytest.fixture(scope="module")
+def enhance():
+    spec = importlib.util.spec_from_file_location("enhance_all_personalities", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _profiles(tmp_path):
+    people = [
+        {"id": "ada", "name": "Ada", "category": "scientists", "ocean": {"openness": 90}},
+        {"id": "linus", "name": "Linus", "category": "programmers", "behavioral_traits": {}},
+        {"name": "anonymous"},
+    ]
+    for person in people:
+        (tmp_path / f"{person['name'].lower()}.json").write_text(json.dumps(person))
+    (tmp_path / "broken.json").write_text('{"id": ')
+    return tmp_path
+
+
+def test_pipeline_counts_and_journal(enhance, tmp_path):
+    enhancer = enhance.PersonalityEnhancer(_profiles(tmp_path))
+    stats = enhancer.process_all_profiles()
+    assert (stats.total_files, stats.enhanced, stats.skipped, stats.errors) == (4, 1, 2, 1)
+    assert enhancer.pipeline.stage_stats["load"].errors == 1
+    assert enhancer.pipeline.stage_stats["write"].calls == 1
+
+    ada = json.loads((tmp_path / "ada.json").read_text())
+    assert ada["enhancement_metadata"]["category_used"] == "scientists"
+    assert "category_specific" in ada and "behavioral_traits" in ada
+    assert not list(tmp_path.glob("*.tmp"))
+
+    journal = [json.loads(line) for line in (tmp_path / enhance.JOURNAL_FILE).read_text().splitlines()]
+    assert {entry["file"]: entry["status"] for entry in journal}["broken.json"] == "error"
+
+
+def test_resume_skips_finished_and_retries_errors(enhance, tmp_path):
+    enhance.PersonalityEnhancer(_profiles(tmp_path)).process_all_profiles()
+    (tmp_path / "broken.json").write_text(json.dumps({"id": "ken", "name": "Ken"}))
+
+    enhancer = enhance.PersonalityEnhancer(tmp_path)
+    stats = enhancer.process_all_profiles(resume=True)
+    assert (stats.resumed, stats.enhanced, stats.errors) == (3, 1, 0)
+    assert enhancer.pipeline.stage_stats["load"].calls == 1
+    assert "behavioral_traits" in json.loads((tmp_path / "broken.json").read_text())
+
+
+def test_dry_run_leaves_files(enhance, tmp_path):
+    _profiles(tmp_path)
+    before = (tmp_path / "ada.json").read_text()
+    stats = enhance.PersonalityEnhancer(tmp_path).process_all_profiles(dry_run=True)
+    assert stats.enhanced == 1
+    assert (tmp_path / "ada.json").read_text() == before
+    assert not (tmp_path / enhance.JOURNAL_FILE).exists()
+
+    stats = enhance.PersonalityEnhancer(tmp_path).process_all_profiles(resume=True)
+    assert (stats.resumed, stats.enhanced) == (0, 1)
+    assert "behavioral_traits" in json.loads((tmp_path / "ada.json").read_text())
+
+
+def test_output_is_deterministic(enhance, tmp_path):
+    person = {"id": "ada", "name": "Ada", "category": "scientists", "ocean": {"openness": 90}}
+    enhancer = enhance.PersonalityEnhancer(tmp_path)
+    first, second = enhancer.enhance_personality(dict(person)), enhancer.enhance_personality(dict(person))
+    assert first == second
+    assert "enhanced_date" not in first["enhancement_metadata"]
+    assert first["enhancement_metadata"]["source_hash"] == enhance.content_hash(person)
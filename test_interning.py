@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test hash-consed interning and the deduplicated export."""
+
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.interning import DedupSource, Interner, deduplicate, expand, export_deduplicated
+
+PHILOSOPHY = {"reasoning_style": "systematic_analysis", "inquiry_method": "socratic_questioning"}
+RECORDS = {
+    "kant": {"name": "Immanuel Kant", "tags": ["ethics", "reason"], "category_specific": dict(PHILOSOPHY)},
+    "hume": {"name": "David Hume", "tags": ["ethics", "reason"], "category_specific": dict(PHILOSOPHY)},
+    "ada": {"name": "Ada Lovelace", "tags": ["ethics"], "flags": [1, True, 1.0]},
+}
+
+
+def test_interner_shares_identical_subobjects():
+    interner = Interner()
+    kant, hume, ada = (interner.intern(json.loads(json.dumps(RECORDS[k]))) for k in ("kant", "hume", "ada"))
+
+    assert kant == RECORDS["kant"] and ada == RECORDS["ada"]
+    assert kant["category_specific"] is hume["category_specific"]
+    assert kant["tags"] is hume["tags"]
+    assert kant["tags"] is not ada["tags"]
+    # 1, True and 1.0 compare equal but must not be merged
+    assert [type(v) for v in ada["flags"]] == [int, bool, float]
+    stats = interner.stats
+    assert stats.bytes_shared > 0 and stats.table_bytes > 0
+    assert stats.bytes_saved == stats.bytes_shared - stats.table_bytes
+
+    interner.release()
+    assert len(interner) == 0 and stats.table_bytes == 0
+    assert interner.intern(dict(RECORDS["kant"]))["tags"] is not kant["tags"]
+
+
+def test_dedup_export_roundtrip(tmp_path):
+    document = deduplicate(RECORDS, min_size=8)
+    ref = document["records"]["kant"]["category_specific"]
+    assert ref == document["records"]["hume"]["category_specific"]
+    assert document["shared"][ref["$ref"]] == PHILOSOPHY
+
+    records = expand(json.loads(json.dumps(document)))
+    assert records == RECORDS
+    assert records["kant"]["category_specific"] is records["hume"]["category_specific"]
+
+    path = tmp_path / "corpus.dedup.json"
+    plain, dedup = export_deduplicated(RECORDS, path, min_size=8)
+    assert dedup == path.stat().st_size
+    assert PersonalityLoader(sources=[DedupSource(path)]).get("hume") == RECORDS["hume"]
+
+
+def test_loader_interning(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps([dict(r, name=k) for k, r in RECORDS.items()]))
+    loader = PersonalityLoader(data, intern=True)
+    assert loader.get("kant")["category_specific"] is loader.get("hume")["category_specific"]
+    assert loader.intern_stats()["bytes_saved"] > 0
+
+
+def test_intern_stats_match_measured_memory(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps([
+        {"name": f"p{i}", "tags": ["ethics", "reason", f"t{i % 7}"], "quotes": [f"quote {i % 50}"],
+         "category_specific": dict(PHILOSOPHY)} for i in range(3000)]))
+
+    def traced(**kwargs):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            loader = PersonalityLoader(data, **kwargs)
+            gc.collect()
+            return loader, tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    _, plain = traced()
+    loader, interned = traced(intern=True)
+    saved = plain - interned
+    assert saved > plain / 2
+    # The eager load released its table, and the estimate tracks reality
+    assert loader.intern_stats()["table_bytes"] == 0
+    assert abs(loader.intern_stats()["bytes_saved"] - saved) < 0.2 * saved
+
+    lazy = PersonalityLoader(data, lazy=True, intern=True)
+    lazy.get("p1")
+    assert lazy.intern_stats()["table_bytes"] > 0
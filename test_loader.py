@@ -7,12 +7,19 @@ from pathlib import Path
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import json
+
+import pytest
+
 from personalities import (
+    PersonalityLoader,
+    PersonalityNotFoundError,
     get_all_personalities,
     get_personality,
     list_personality_names,
     count_personalities,
 )
+from personalities.sources import ArchiveSource, ProfileSource
 
 def test_python_loader():
     """Test Python personality loader."""
@@ -49,5 +56,54 @@ def test_python_loader():
     print(f"\n✅ All {total} personalities have required fields")
     print("\nPython loader test PASSED!")
 
+def _corpus(tmp_path):
+    """Two profile files and one archive that repeats one of them."""
+    (tmp_path / "kant.json").write_text(json.dumps({"id": "kant", "name": "Immanuel Kant"}))
+    (tmp_path / "hume.json").write_text(json.dumps({"id": "hume", "name": "David Hume"}))
+    archive = tmp_path / "archive.json"
+    archive.write_text(json.dumps({
+        "thinkers": [
+            {"id": "kant", "name": "Archive Kant"},
+            {"id": "locke", "name": "John Locke"},
+            {"id": "mill", "name": "John Stuart Mill"},
+        ],
+        "archetypes": {"rationalists": {"examples": ["kant"]}},
+    }))
+    return [ProfileSource(tmp_path / "kant.json"), ProfileSource(tmp_path / "hume.json"),
+            ArchiveSource(archive)]
+
+
+def test_get_many_reads_each_file_once(tmp_path, monkeypatch):
+    sources = _corpus(tmp_path)
+    reads = []
+    for source in sources:
+        original = source.read
+        monkeypatch.setattr(source, "read", lambda s=source, o=original: reads.append(s.path.name) or o())
+
+    loader = PersonalityLoader(sources=sources, lazy=True)
+    assert loader.count() == 4
+    reads.clear()
+
+    names = ["mill", "kant", "locke", "mill", "hume"]
+    records = loader.get_many(names)
+    assert [r["name"] for r in records] == [
+        "John Stuart Mill", "Immanuel Kant", "John Locke", "John Stuart Mill", "David Hume",
+    ]
+    # The archive was already parsed while indexing; profiles are read once
+    assert sorted(reads) == ["hume.json", "kant.json"]
+
+    reads.clear()
+    assert [name for name, _ in loader.iter_many(["hume", "locke"])] == ["hume", "locke"]
+    assert reads == []
+
+
+def test_get_many_reports_missing_in_bulk(tmp_path):
+    loader = PersonalityLoader(sources=_corpus(tmp_path), lazy=True)
+    with pytest.raises(PersonalityNotFoundError) as excinfo:
+        loader.get_many(["kant", "nope", "nada", "nope"])
+    assert excinfo.value.missing == ["nope", "nada"]
+    assert loader.get_many(["kant", "nope"], strict=False)[1] is None
+
+
 if __name__ == "__main__":
     test_python_loader()
\ No newline at end of file
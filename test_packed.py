@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test the compressed per-record pack container."""
+
+import gc
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.packed import PackedCorpus, PackedSource, write_pack
+
+
+def _records(n=60):
+    return [(f"p{i}", {"name": f"p{i}", "ocean": {"openness": i},
+                       "cognitive_style": {"thinking_pattern": ["analytical", "intuitive"][i % 2],
+                                           "learning_style": "visual"},
+                       "quotes": [f"quote number {i} é"]}) for i in range(n)]
+
+
+@pytest.mark.parametrize("block_records", [1, 7])
+def test_roundtrip_and_random_access(tmp_path, block_records):
+    path = tmp_path / "corpus.hpack"
+    stats = write_pack(_records(), path, block_records=block_records, codec="zlib")
+    assert stats["pack_bytes"] < stats["json_bytes"]
+
+    with PackedCorpus.open(path) as corpus:
+        assert len(corpus) == 60 and "p10" in corpus
+        assert corpus.get("p37") == dict(_records())["p37"]
+        assert len(corpus._cache) == 1
+        assert corpus.get("missing") is None
+        assert dict(corpus.records()) == dict(_records())
+        assert list(corpus.get_many(["p5", "p3", "nope"])) == ["p3", "p5"]
+
+
+@pytest.mark.parametrize("count", [0, 1, 5, 60])
+def test_default_codec_with_few_records(tmp_path, count):
+    pytest.importorskip("zstandard")
+    path = tmp_path / "corpus.hpack"
+    assert write_pack(_records(count), path)["records"] == count
+    with PackedCorpus.open(path) as corpus:
+        assert corpus.codec == "zstd"
+        assert dict(corpus.records()) == dict(_records(count))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.hpack"
+    path.write_bytes(b"\0" * 64)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        with pytest.raises(ValueError):
+            PackedCorpus.open(path)
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+def test_records_in_decodes_raw_pack_bytes(tmp_path):
+    path = tmp_path / "corpus.hpack"
+    write_pack(_records(), path, block_records=4, codec="zlib")
+    assert dict(PackedSource(path).records_in(path.read_bytes())) == dict(_records())
+
+
+def test_lazy_loader_decodes_only_requested(tmp_path):
+    path = tmp_path / "corpus.hpack"
+    write_pack(_records(), path, codec="zlib")
+    source = PackedSource(path)
+    loader = PersonalityLoader(sources=[source], lazy=True)
+    assert loader.count() == 60
+    assert loader.get_many(["p2", "p9"])[1]["ocean"] == {"openness": 9}
+    assert sorted(loader._personalities) == ["p2", "p9"]
+    assert len(source.corpus()._cache) == 2
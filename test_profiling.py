@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test the corpus load profiler and the package command line."""
+
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import profiling
+from personalities.__main__ import main as cli
+from personalities.packed import PackedSource, write_pack
+from personalities.profiling import format_table, profile_corpus, sort_profiles, summarize
+from personalities.resource import ResourceSource
+from personalities.sources import ArchiveSource, ProfileSource
+
+
+def _corpus(tmp_path):
+    (tmp_path / "ada.json").write_text(json.dumps({"name": "Ada", "quotes": ["x" * 500]}))
+    (tmp_path / "mega.json").write_text(json.dumps({"people": [
+        {"id": "ada", "name": "Ada"}, {"id": "ken", "name": "Ken"}, {"id": "ken", "name": "Ken 2"},
+    ]}))
+    (tmp_path / "ada.md").write_text("# Ada\n\n## Summary\nFirst programmer.\n\n## Notes\n" + "n\n" * 100)
+    sources = [ProfileSource(tmp_path / "ada.json"), ArchiveSource(tmp_path / "mega.json")]
+    return profile_corpus(sources, markdown=[tmp_path / "ada.md"], top=1)
+
+
+def test_profiles_report_sizes_sections_and_duplicates(tmp_path):
+    ada, mega, markdown = _corpus(tmp_path)
+    assert (ada.records, ada.duplicates, ada.sections[0][0]) == (1, 0, "quotes")
+    assert ada.bytes == (tmp_path / "ada.json").stat().st_size
+    assert (mega.records, mega.duplicates, mega.duplicate_keys) == (3, 2, ["ada", "ken"])
+    assert (markdown.kind, markdown.records, markdown.sections[0][0]) == ("Markdown", 1, "Notes")
+
+
+def test_sorting_summary_and_table(tmp_path):
+    profiles = _corpus(tmp_path)
+    assert [p.records for p in sort_profiles(profiles, "records")] == [3, 1, 1]
+    totals = summarize(profiles)
+    assert (totals["files"], totals["records"], totals["duplicates"]) == (3, 5, 2)
+    table = format_table(profiles, totals).splitlines()
+    assert len(table) == 5 and table[-1].startswith("total (3 files")
+
+
+def test_pack_sources_are_profiled(tmp_path, monkeypatch):
+    pack = tmp_path / "corpus.hpack"
+    write_pack([("ada", {"name": "Ada", "quotes": ["x" * 300]}), ("ken", {"name": "Ken"})], pack, codec="zlib")
+    archive = tmp_path / "app.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.write(pack, "personalities/corpus.hpack")
+    zipped = ResourceSource(zipfile.Path(archive, "personalities/corpus.hpack"))
+
+    plain, resource = profile_corpus([PackedSource(pack), zipped], markdown=[])
+    assert (plain.kind, plain.records, plain.sections[0][0]) == ("PackedSource", 2, "quotes")
+    assert plain.bytes == pack.stat().st_size
+    assert (resource.kind, resource.records, resource.duplicates) == ("ResourceSource", 2, 2)
+
+    # A resource-only install profiles the packed corpus
+    monkeypatch.setattr(profiling, "default_sources", lambda: [])
+    monkeypatch.setattr(profiling, "resource_sources", lambda: [zipped])
+    assert [p.kind for p in profile_corpus(markdown=[])] == ["ResourceSource"]
+
+
+def test_cli_dispatch(capsys):
+    assert cli(["profile", "--json", "--top", "2", "--sort", "bytes"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert len(report["files"]) == 2 and report["summary"]["files"] > 2
+    assert report["files"][0]["bytes"] >= report["files"][1]["bytes"]
+    assert cli(["no-such-command"]) == 2
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Test the query planner."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.query import Query, QueryIndex
+
+
+def _records(n=400):
+    records = []
+    for i in range(n):
+        records.append((f"p{i}", {
+            "name": f"p{i}",
+            "category": "scientist" if i % 10 == 0 else "writer",
+            "tags": ["open-source"] if i % 4 == 0 else [],
+            "tools": {"essential": ["docker", "git"]} if i % 20 == 0 else ["vim"],
+            "description": "works on the kernel" if i % 40 == 0 else "writes prose",
+            "ocean": {"openness": i % 100, "conscientiousness": 50,
+                      "extraversion": (i * 7) % 100, "agreeableness": 50, "neuroticism": 50},
+        }))
+    return records
+
+
+def _expected(records, predicate, key=None, reverse=False, limit=None):
+    matches = [k for k, r in records if predicate(r)]
+    if key:
+        matches.sort(key=lambda k: key(dict(records)[k]), reverse=reverse)
+    return matches[:limit]
+
+
+def test_combined_filter_is_seeded_from_most_selective_index():
+    records = _records()
+    index = QueryIndex.from_records(records)
+    query = Query.parse("category:scientist tag:open-source openness>=80 tool:docker kernel")
+    keys, plan = query.execute(index)
+
+    expected = _expected(records, lambda r: r["category"] == "scientist" and "open-source" in r["tags"]
+                         and r["ocean"]["openness"] >= 80 and "docker" in str(r["tools"])
+                         and "kernel" in r["description"])
+    assert keys == expected
+    assert plan.steps[0].startswith("seed text:kernel")
+    assert plan.examined < len(records) // 4
+
+
+def test_order_by_with_limit_walks_sorted_column():
+    records = _records()
+    index = QueryIndex.from_records(records)
+    query = Query().category("writer").order_by("-extraversion").limit(5)
+    keys, plan = query.execute(index)
+
+    expected = _expected(records, lambda r: r["category"] == "writer",
+                         key=lambda r: r["ocean"]["extraversion"], reverse=True)
+    scores = [dict(records)[k]["ocean"]["extraversion"] for k in keys]
+    assert scores == [dict(records)[k]["ocean"]["extraversion"] for k in expected[:5]]
+    assert plan.steps[0].startswith("walk extraversion desc")
+    assert plan.examined < 20
+
+
+def test_ranges_and_dsl_comparisons():
+    records = _records()
+    index = QueryIndex.from_records(records)
+    keys, _ = Query.parse("o>95 o<=98 e=21").execute(index)
+    assert keys == _expected(records, lambda r: 95 < r["ocean"]["openness"] <= 98
+                             and r["ocean"]["extraversion"] == 21)
+    with pytest.raises(ValueError):
+        Query().ocean("charisma", min=3)
+
+
+def test_loader_query_fetches_only_matches(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps([r for _, r in _records()]))
+    loader = PersonalityLoader(data)
+    results = loader.query("tool:docker sort:-openness limit:2")
+    assert [r["name"] for r in results] == ["p380", "p280"]
+    assert "examined" in repr(loader.explain("tool:docker"))
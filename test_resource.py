@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test the packed corpus resource and its zip/wheel-safe loading."""
+
+import json
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader, personality_loader
+from personalities.resource import (DEFAULT_RESOURCE_NAME, RESOURCES, ResourceSource, build_resource, resource,
+                                    stale_keys)
+from personalities.sources import ProfileSource, RecordListSource
+
+
+def _sources(tmp_path):
+    (tmp_path / "ada.json").write_text(json.dumps({"name": "Ada Lovelace", "tools": ["think"]}))
+    (tmp_path / "all.json").write_text(json.dumps([{"name": "ada", "tools": ["shadowed"]}, {"name": "ken"}]))
+    return [ProfileSource(tmp_path / "ada.json"), RecordListSource(tmp_path / "all.json")]
+
+
+def test_resource_served_from_file_and_zip(tmp_path):
+    sources = _sources(tmp_path)
+    pack = tmp_path / "corpus.hpack"
+    assert build_resource(pack, sources)["records"] == 2
+    archive = tmp_path / "app.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.write(pack, "personalities/corpus.hpack")
+
+    for traversable in (pack, zipfile.Path(archive, "personalities/corpus.hpack")):
+        loader = PersonalityLoader(sources=[ResourceSource(traversable)], lazy=True)
+        assert sorted(loader.get_names()) == ["ada", "ken"]
+        assert loader.get("ada")["tools"] == ["think"]
+    assert stale_keys(ResourceSource(pack), sources) == []
+
+
+def test_stale_keys(tmp_path):
+    sources = _sources(tmp_path)
+    pack = tmp_path / "corpus.hpack"
+    build_resource(pack, sources)
+    (tmp_path / "ada.json").write_text(json.dumps({"name": "Ada Lovelace", "tools": ["loom"]}))
+    assert stale_keys(ResourceSource(pack), sources[1:]) == ["ada"]
+    assert stale_keys(ResourceSource(pack), sources) == ["ada"]
+
+
+def test_from_corpus_falls_back_to_resource(monkeypatch):
+    monkeypatch.setattr(personality_loader, "default_sources", lambda: [])
+    loader = PersonalityLoader.from_corpus()
+    assert isinstance(loader.sources[0], ResourceSource)
+    assert loader.count() > 0
+
+
+def test_shipped_resources_match_loose_files():
+    for name, sources in RESOURCES.items():
+        assert resource(name).is_file()
+        stale = stale_keys(ResourceSource(resource(name)), sources())
+        assert stale == [], "run `python -m personalities.resource build`"
+
+
+def test_convenience_functions_from_a_zip_import(tmp_path):
+    package = Path(__file__).parent / "personalities"
+    archive = tmp_path / "app.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        # What setuptools ships: modules plus top-level package data only
+        for pattern in ("*.py", "*.json", "*.yaml", "*.md", "*.hpack"):
+            for path in package.glob(pattern):
+                z.write(path, f"personalities/{path.name}")
+    script = ("import json, personalities as p; print(json.dumps([p.loader.sources[0].__class__.__name__, "
+              "p.count_personalities(), p.get_personality('linus')['name'], "
+              "len(p.list_personality_names()), len(p.get_all_personalities())]))")
+    out = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env={"PYTHONPATH": str(archive)},
+                         capture_output=True, text=True, check=True).stdout
+    kind, count, name, names, records = json.loads(out)
+    loose = PersonalityLoader()
+    assert kind == "ResourceSource" and name == loose.get("linus")["name"]
+    assert count == names == records == loose.count() == 117
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test task-to-persona routing."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.routing import Router, load_unix_preferences
+
+RECORDS = [
+    ("linus", {"name": "Linus Torvalds", "category": "programmer",
+               "tools": {"essential": ["git", "bash"], "domains": ["version_control"]},
+               "description": "Kernel maintainer"}),
+    ("brian", {"name": "Brian Kernighan", "category": "programmer", "tools": ["awk"],
+               "description": "Co-author of the C book"}),
+    ("guido", {"name": "Guido van Rossum", "category": "programmer",
+               "tools": {"essential": ["python", "pytest"]}, "description": "Python creator"}),
+    ("ada", {"name": "Ada Lovelace", "category": "scientist", "description": "First programmer"}),
+]
+
+UNIX = {
+    "kernighan": {"essential_tools": ["troff", "sed"], "shell": "sh", "editor": "sam"},
+    "ritchie_linus": {"essential_tools": ["gdb"]},
+}
+
+
+def test_routes_by_tools_and_unix_preferences():
+    router = Router.from_records(RECORDS, UNIX)
+    assert router.route("rebase a git branch")[0].key == "linus"
+    top = router.route("typeset docs with troff in sam", k=2)[0]
+    assert top.key == "brian"
+    assert {term for term, _, _ in top.explanation} == {"troff", "sam"}
+    assert dict((t, s) for t, _, s in top.explanation)["troff"] == ("unix",)
+    # Pair keys apply to each person that exists
+    assert router.route("attach gdb")[0].key == "linus"
+    assert router.route("nothing relevant here") == []
+
+
+def test_batch_matches_single_and_is_cached():
+    router = Router.from_records(RECORDS, UNIX)
+    tasks = ["write python tests with pytest", "git bisect", "pytest with python tests"]
+    batch = router.route_many(tasks, k=3)
+    assert batch[0] == batch[2]
+    assert router.cache_info() == {"hits": 0, "misses": 2, "size": 2}
+    assert [router.route(task, k=3) for task in tasks] == batch
+    assert router.cache_info()["hits"] == 3
+    scores = [m.score for m in batch[0]]
+    assert scores == sorted(scores, reverse=True) and batch[0][0].key == "guido"
+
+
+def test_batches_larger_than_the_cache():
+    router = Router.from_records(RECORDS, UNIX, cache_size=1)
+    assert [r[0].key for r in router.route_many(["git", "python"])] == ["linus", "guido"]
+    router = Router.from_records(RECORDS, UNIX, cache_size=2)
+    router.route("git")
+    # The cached "git" entry is evicted by the two misses that follow it
+    batch = router.route_many(["git", "awk", "python pytest awk"])
+    assert [r[0].key for r in batch] == ["linus", "brian", "guido"]
+    assert router.cache_info()["size"] == 2
+
+
+def test_unix_preferences_file_and_loader_route(tmp_path):
+    assert "linus" in load_unix_preferences()
+    assert load_unix_preferences(tmp_path / "missing.yaml") == {}
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps([dict(r, name=k) for k, r in RECORDS]))
+    loader = PersonalityLoader(data)
+    assert loader.route("python packaging", k=1)[0].key == "guido"
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test the JSON backend layer: canonical bytes, fallback and file writes."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import serialization
+from personalities.serialization import BACKENDS, get_backend
+
+RECORD = {"name": "ada", "ocean": {"openness": 90.5, "agreeableness": 3}, "quotes": ["é", "—"], "empty": {}}
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_backends_agree_byte_for_byte(pretty):
+    outputs = {name: get_backend(name).dumps(RECORD, pretty) for name in BACKENDS}
+    assert len(set(outputs.values())) == 1
+    data = outputs["stdlib"]
+    assert data.index(b'"empty"') < data.index(b'"name"') < data.index(b'"ocean"')
+    assert "é".encode("utf-8") in data
+    assert data.endswith(b"\n") == pretty
+
+
+@pytest.mark.parametrize("value", [1e16, -1.5e300, 1e-05, 2.5e-06, 5e-324, 1e-4, 9999999999999998.0, 0.0])
+def test_backends_agree_on_float_spelling(value):
+    record = {"score": value, "text": "re-run 3e-commerce", "scores": [[value]]}
+    for pretty in (True, False):
+        outputs = {get_backend(name).dumps(record, pretty) for name in BACKENDS}
+        assert len(outputs) == 1
+        assert repr(value).encode("ascii") in outputs.pop()
+
+
+def test_unencodable_values_fall_back():
+    assert serialization.dumps({"big": 1 << 70}) == b'{"big":1180591620717411303424}'
+
+
+@pytest.mark.parametrize("name", sorted(BACKENDS))
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_non_finite_floats_are_rejected(name, value):
+    backend = get_backend(name)
+    for pretty in (True, False):
+        with pytest.raises(ValueError):
+            backend.dumps({"ocean": {"openness": value}, "note": None}, pretty)
+    with pytest.raises(ValueError):
+        backend.loads(b'{"openness": NaN}')
+    assert backend.dumps({"note": None}, False) == b'{"note":null}'
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_backend("simdjson-nope")
+
+
+def test_dump_file_skips_identical_content(tmp_path):
+    path = tmp_path / "ada.json"
+    assert serialization.dump_file(RECORD, path)
+    assert not serialization.dump_file(dict(reversed(list(RECORD.items()))), path)
+    assert serialization.load_file(path) == RECORD
+    assert serialization.dump_file(RECORD, path, compact=True)
+    assert b"\n" not in path.read_bytes()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test the local persona server."""
+
+import http.client
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.server import make_server
+from personalities.snapshots import make_delta
+
+RECORDS = [
+    {"name": "ada", "category": "scientist", "tags": ["math"], "ocean": {"openness": 95}},
+    {"name": "linus", "category": "programmer", "tags": ["kernel"], "ocean": {"openness": 75}},
+    {"name": "grace", "category": "programmer", "tags": ["compilers"], "ocean": {"openness": 85}},
+]
+
+
+@pytest.fixture
+def served(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps(RECORDS))
+    loader = PersonalityLoader(data)
+    server = make_server(loader, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    yield loader, connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _get(connection, path, **headers):
+    connection.request("GET", path, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+def test_record_etag_and_keep_alive(served):
+    loader, connection = served
+    response, body = _get(connection, "/personas/ada")
+    assert response.status == 200 and json.loads(body) == RECORDS[0]
+    etag = response.getheader("ETag")
+    assert etag == f'"{loader.snapshot().records["ada"].digest}"'
+
+    # Same connection: conditional GET is answered without a body
+    response, body = _get(connection, "/personas/ada", **{"If-None-Match": etag})
+    assert response.status == 304 and body == b""
+    response, _ = _get(connection, "/personas/nobody")
+    assert response.status == 404
+
+
+def test_batch_and_query_endpoints(served):
+    _, connection = served
+    response, body = _get(connection, "/personas?names=linus,nobody,ada")
+    data = json.loads(body)
+    assert list(data["personas"]) == ["linus", "ada"] and data["missing"] == ["nobody"]
+
+    connection.request("POST", "/batch", body=json.dumps({"names": ["grace"]}),
+                       headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    assert json.loads(response.read())["personas"]["grace"] == RECORDS[2]
+
+    response, body = _get(connection, "/query?category=programmer&sort=-openness")
+    assert json.loads(body)["keys"] == ["grace", "linus"]
+    response, body = _get(connection, "/query?q=openness>=90")
+    assert [p["name"] for p in json.loads(body)["personas"]] == ["ada"]
+    response, _ = _get(connection, "/query?q=sort:charisma")
+    assert response.status == 400
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length_is_rejected(served, length):
+    _, connection = served
+    connection.putrequest("POST", "/batch")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read()) == {"error": "Invalid Content-Length"}
+
+
+def test_applied_delta_changes_etag_and_body(served, tmp_path):
+    loader, connection = served
+    old_etag = _get(connection, "/personas/ada")[0].getheader("ETag")
+    changed = tmp_path / "changed.json"
+    changed.write_text(json.dumps([dict(RECORDS[0], tags=["poetry"])] + RECORDS[1:]))
+    new = PersonalityLoader(changed)
+    loader.apply_delta(make_delta(loader.snapshot(), new.snapshot(), new.get_many))
+
+    response, body = _get(connection, "/personas/ada", **{"If-None-Match": old_etag})
+    assert response.status == 200 and json.loads(body)["tags"] == ["poetry"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_unix_socket(tmp_path):
+    data = tmp_path / "personas.json"
+    data.write_text(json.dumps(RECORDS))
+    path = str(tmp_path / "persona.sock")
+    server = make_server(PersonalityLoader(data), unix_socket=path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        client.sendall(b"GET /health HTTP/1.1\r\nHost: local\r\nConnection: close\r\n\r\n")
+        reply = b""
+        while chunk := client.recv(4096):
+            reply += chunk
+        client.close()
+        assert reply.startswith(b"HTTP/1.1 200") and b'"count": 3' in reply
+    finally:
+        server.shutdown()
+        server.server_close()
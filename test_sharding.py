@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test consistent-hash sharding and the shard router."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityNotFoundError
+from personalities.sharding import HashRing, ShardRouter, build_shards, rebalance_moves
+from personalities.sources import ProfileSource
+
+KEYS = [f"persona_{i}" for i in range(5000)]
+
+
+def test_ring_balances_and_adding_a_node_moves_about_one_nth():
+    ring = HashRing(["a", "b", "c", "d"])
+    sizes = [len(keys) for keys in ring.assign(KEYS).values()]
+    assert min(sizes) > 0.6 * len(KEYS) / 4
+
+    moves = rebalance_moves(ring, KEYS, add=["e"])
+    assert 0.14 < len(moves) / len(KEYS) < 0.26
+    assert {new for _, new in moves.values()} == {"e"}
+
+    moves = rebalance_moves(ring, KEYS, remove=["b"])
+    assert {old for old, _ in moves.values()} == {"b"}
+    assert HashRing(["d", "c", "b", "a"]).node_for("linus") == ring.node_for("linus")
+
+
+def test_router_fetches_from_owning_shards(tmp_path):
+    profiles = tmp_path / "profiles"
+    profiles.mkdir()
+    sources = []
+    for i in range(40):
+        path = profiles / f"p{i}.json"
+        path.write_text(json.dumps({"id": f"p{i}", "name": f"Persona {i}"}))
+        sources.append(ProfileSource(path))
+    manifest = build_shards(["n1", "n2", "n3"], tmp_path / "shards", sources=sources, codec="zlib")
+    assert sum(entry["records"] for entry in manifest["nodes"].values()) == 40
+
+    router = ShardRouter.from_directory(tmp_path / "shards")
+    for node, loader in router.transport.loaders.items():
+        assert all(router.ring.node_for(key) == node for key in loader.get_names())
+
+    names = ["p7", "p3", "p31", "p7"]
+    assert [r["name"] for r in router.get_many(names)] == ["Persona 7", "Persona 3", "Persona 31", "Persona 7"]
+    assert router.transport.requests == len({router.ring.node_for(n) for n in names})
+    assert router.get("p12")["name"] == "Persona 12"
+    with pytest.raises(PersonalityNotFoundError) as excinfo:
+        router.get_many(["p1", "ghost"])
+    assert excinfo.value.missing == ["ghost"]
+    assert router.get_many(["ghost"], strict=False) == [None]
+
+
+def test_empty_shards_with_the_default_codec(tmp_path):
+    path = tmp_path / "ada.json"
+    path.write_text(json.dumps({"id": "ada", "name": "Ada Lovelace"}))
+    manifest = build_shards(["n1", "n2", "n3"], tmp_path / "shards", sources=[ProfileSource(path)])
+    assert sorted(entry["records"] for entry in manifest["nodes"].values()) == [0, 0, 1]
+
+    router = ShardRouter.from_directory(tmp_path / "shards")
+    assert router.get("ada")["name"] == "Ada Lovelace"
+    assert router.get_many(["ghost"], strict=False) == [None]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test the shared-memory corpus used by pre-fork servers."""
+
+import json
+import math
+import multiprocessing
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader, SharedCorpus
+
+RECORDS = [
+    {"name": "linus", "tags": ["kernel"], "ocean": {"openness": 75, "conscientiousness": 88,
+                                                     "extraversion": 28, "agreeableness": 35,
+                                                     "neuroticism": 45}},
+    {"name": "ada", "tags": ["pioneer"], "ocean": {"openness": 95}},
+    {"name": "zoë", "tags": ["kernel", "unicode"]},
+]
+
+
+def _make_loader(tmp_path):
+    path = tmp_path / "personas.json"
+    path.write_text(json.dumps(RECORDS), encoding="utf-8")
+    return PersonalityLoader(path)
+
+
+def _worker_read(name, queue):
+    corpus = SharedCorpus.attach(name)
+    try:
+        queue.put((corpus.count(), corpus.get("linus")["tags"], corpus.ocean("linus")))
+    finally:
+        corpus.close()
+
+
+def test_shared_corpus_roundtrip(tmp_path):
+    loader = _make_loader(tmp_path)
+    with SharedCorpus.create(loader) as corpus:
+        assert corpus.count() == 3
+        assert corpus.get_names() == ["ada", "linus", "zoë"]
+        assert corpus.get("zoë") == RECORDS[2]
+        assert corpus.get("missing") is None
+        assert [p["name"] for p in corpus.filter_by_tags(["kernel"])] == ["linus", "zoë"]
+
+        ada = corpus.ocean("ada")
+        assert ada[0] == 95.0 and all(math.isnan(v) for v in ada[1:])
+        assert len(corpus.ocean_matrix) == 3 * 5
+
+
+def test_shared_corpus_attach_from_worker(tmp_path):
+    loader = _make_loader(tmp_path)
+    ctx = multiprocessing.get_context("spawn")
+    with SharedCorpus.create(loader) as corpus:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_worker_read, args=(corpus.name, queue))
+        proc.start()
+        count, tags, ocean = queue.get(timeout=30)
+        proc.join(timeout=30)
+
+        assert proc.exitcode == 0
+        assert count == 3
+        assert tags == ["kernel"]
+        assert ocean == (75.0, 88.0, 28.0, 35.0, 45.0)
+        # The worker detaching must not have unlinked the parent's block
+        with SharedCorpus.attach(corpus.name) as again:
+            assert again.count() == 3
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test corpus snapshots, deltas and in-place application."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from personalities import PersonalityLoader
+from personalities.snapshots import Snapshot, make_delta
+
+OLD = [
+    {"name": "ada", "ocean": {"openness": 90}, "tools": ["think"], "quotes": ["a"]},
+    {"name": "linus", "ocean": {"openness": 75}, "tools": ["git"]},
+    {"name": "ken", "tools": ["ed"]},
+]
+NEW = [
+    {"name": "ada", "ocean": {"openness": 95}, "tools": ["think"]},
+    {"name": "linus", "ocean": {"openness": 75}, "tools": ["git"]},
+    {"name": "grace", "tools": ["cobol"]},
+]
+
+
+def _loader(tmp_path, records, name):
+    path = tmp_path / name
+    path.write_text(json.dumps(records))
+    return PersonalityLoader(path)
+
+
+def test_version_is_order_independent_and_incremental():
+    pairs = [(r["name"], r) for r in OLD]
+    snapshot = Snapshot.from_records(pairs)
+    assert snapshot.version == Snapshot.from_records(reversed(pairs)).version
+    assert Snapshot.from_dict(json.loads(json.dumps(snapshot.to_dict()))).version == snapshot.version
+
+    changed = Snapshot.from_records(pairs)
+    changed.remove("ken")
+    assert changed.version != snapshot.version
+    assert changed.version == Snapshot.from_records(pairs[:2]).version
+
+
+def test_delta_lists_changed_sections_and_fetches_only_changes(tmp_path):
+    old, new = _loader(tmp_path, OLD, "old.json"), _loader(tmp_path, NEW, "new.json")
+    fetched = []
+    delta = make_delta(old.snapshot(), new.snapshot(), lambda keys: fetched.extend(keys) or new.get_many(keys))
+
+    assert sorted(fetched) == ["ada", "grace"]
+    assert list(delta["added"]) == ["grace"] and delta["removed"] == ["ken"]
+    assert delta["changed"]["ada"]["set"] == {"ocean": {"openness": 95}}
+    assert delta["changed"]["ada"]["unset"] == ["quotes"]
+    assert (delta["from"], delta["to"]) == (old.version(), new.version())
+
+
+def test_apply_delta_in_place(tmp_path):
+    old, new = _loader(tmp_path, OLD, "old.json"), _loader(tmp_path, NEW, "new.json")
+    delta = make_delta(old.snapshot(), new.snapshot(), new.get_many)
+    old.resolve("ken")  # build a derived index that must be refreshed
+
+    assert old.apply_delta(delta) == new.version()
+    assert sorted(old.get_names()) == ["ada", "grace", "linus"]
+    assert old.get("ada") == NEW[0] and old.get("grace") == NEW[2]
+    assert all(match.key != "ken" for match in old.resolve("ken"))
+    assert old.version() == Snapshot.from_records((n, old.get(n)) for n in old.get_names()).version
+
+    with pytest.raises(ValueError, match="applies to version"):
+        old.apply_delta(delta)
+
+
+def test_tampered_delta_changes_nothing(tmp_path):
+    old, new = _loader(tmp_path, OLD, "old.json"), _loader(tmp_path, NEW, "new.json")
+    delta = make_delta(old.snapshot(), new.snapshot(), new.get_many)
+    delta["changed"]["ada"]["set"]["ocean"] = {"openness": 10}
+    before = old.version()
+    with pytest.raises(ValueError, match="does not reproduce"):
+        old.apply_delta(delta)
+    assert old.version() == before and old.get("ada") == OLD[0]